@@ -1,3 +1,24 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import create_petition, create_user
+from petitions.models import Company, Department
+from users.models import User
+
+
+class DashBoardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        company, department = Company.objects.create(name="C1"), Department.objects.create(name="D1")
+        cls.admin = create_user("admin", "Admin", company, department)
+        inactive = create_user("inactive", "Employee", company, department)
+        User.objects.filter(pk=inactive.pk).update(is_active=False)
+        create_petition(cls.admin, company, department)
+
+    def test_user_counts(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["active_users"], 1)
+        self.assertEqual(response.context["new_users_week"], 2)
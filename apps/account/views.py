@@ -2,24 +2,59 @@
 Account views.
 """
 
+# Python
+from datetime import timedelta
+
 # Django imports
-from django.views.generic import ListView
+from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Count, Q
+from django.utils import timezone
 
 # Models
-from petitions.models import Petition
+from petitions.models import Notification, PetitionCounter, PetitionDailyStat
+from users.models import User
+
+
+def percent_change(current, previous):
+    """Variación porcentual (`None` si no hay base de comparación)."""
+    if not previous:
+        return None
+    return round((current - previous) * 100 / previous)
+
+
+class DashBoardView(LoginRequiredMixin, TemplateView):
+    """Dashboard: lee contadores y el resumen diario, no recorre `petitions`.
 
+    Los usuarios activos y nuevos de la semana salen de `users` (una consulta).
+    """
 
-class DashBoardView(ListView, LoginRequiredMixin):
     template_name = "index.html"
-    model = Petition
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = Petition.objects.all()
-        context["petitions"] = queryset
-        context["total_petitions"] = queryset.count()
-        return context
-
-
 
+        today = timezone.localdate()
+        month_start = today.replace(day=1)
+        previous_end = month_start - timedelta(days=1)
+        previous_start = previous_end.replace(day=1)
+
+        month = PetitionDailyStat.objects.summary(month_start, today)
+        previous_month = PetitionDailyStat.objects.summary(previous_start, previous_end)
+
+        context["total_petitions"] = PetitionCounter.objects.total()  # Peticiones activas
+        context["month_stats"] = month
+        context["previous_month_stats"] = previous_month
+        context["created_trend"] = percent_change(month["created"], previous_month["created"])
+
+        # Usuarios: no están en el resumen diario; un solo `COUNT` con filtros
+        users = User.objects.aggregate(
+            active=Count("id", filter=Q(is_active=True)),
+            new_week=Count(
+                "id", filter=Q(date_joined__date__gte=today - timedelta(days=today.weekday()))
+            ),
+        )
+        context["active_users"] = users["active"]
+        context["new_users_week"] = users["new_week"]
+        context["unread_notifications"] = Notification.objects.unread_count(self.request.user)
+        return context
@@ -0,0 +1,122 @@
+"""Muestra el plan (EXPLAIN) de la consulta de cada endpoint de listado."""
+
+# Python
+import re
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Django REST Framework
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+# Views
+from api import views as api
+
+# Models
+from users.models import User
+
+# Roles
+from core.roles import RoleSnapshot
+
+
+# Alcances de ejemplo: los ids solo se usan como valores de filtro
+ROLES = {
+    "admin": RoleSnapshot(user_id=1, groups={"Admin"}, department_id=1, company_id=1),
+    "manager": RoleSnapshot(user_id=1, groups={"Manager"}, department_id=1, company_id=1),
+    "employee": RoleSnapshot(user_id=1, groups={"Employee"}, department_id=1, company_id=1),
+    "client": RoleSnapshot(user_id=1, groups={"Client"}, company_id=1, client_company_ids=(1, 2)),
+}
+
+# (etiqueta, vista, parámetros, roles)
+ENDPOINTS = [
+    ("petitions", api.PetitionListView, {}, ["admin", "manager", "employee", "client"]),
+    ("petitions ?pagination=cursor", api.PetitionListView, {"pagination": "cursor"}, ["admin"]),
+    ("petitions ?status_approval=AP", api.PetitionListView, {"status_approval": "AP"}, ["admin"]),
+    ("petitions ?department=1", api.PetitionListView, {"department": "1"}, ["admin"]),
+    ("petitions ?company=1", api.PetitionListView, {"company": "1"}, ["admin"]),
+    ("petitions ?search=", api.PetitionListView, {"search": "peticion"}, ["admin"]),
+    ("users", api.UserListView, {}, ["admin"]),
+    ("notifications", api.NotificationListView, {}, ["employee", "admin"]),
+    ("notifications ?pagination=cursor", api.NotificationListView, {"pagination": "cursor"}, ["employee"]),
+    ("commissions ?user=1", api.CommissionListView, {"user": "1"}, ["admin"]),
+    ("departments", api.DepartmentListView, {}, ["admin"]),
+    ("companies", api.CompanyListView, {}, ["admin"]),
+]
+
+SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b)"),
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre la consulta principal de cada endpoint de listado "
+        "y reporta si usa un índice o recorre la tabla completa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plan",
+            action="store_true",
+            help="Imprime el plan completo de cada consulta.",
+        )
+        parser.add_argument(
+            "--no-seqscan",
+            action="store_true",
+            help="PostgreSQL: desactiva enable_seqscan (útil con tablas pequeñas de desarrollo).",
+        )
+        parser.add_argument(
+            "--fail-on-scan",
+            action="store_true",
+            help="Termina con error si alguna consulta recorre su tabla completa.",
+        )
+
+    def build_queryset(self, view_class, params, role):
+        """Arma el queryset tal como lo hace la vista para el rol dado."""
+        user = User(id=ROLES[role].user_id, email="explain@example.com")
+        user._role_snapshot = ROLES[role]
+
+        view = view_class()
+        view.args, view.kwargs, view.format_kwarg = (), {}, None
+        view.request = view.initialize_request(APIRequestFactory().get("/", params))
+        view.request.user = user
+
+        queryset = view.get_queryset()
+        if params.get("pagination") == "cursor":
+            queryset = queryset.order_by(*view.keyset_ordering)
+        return queryset[: api_settings.PAGE_SIZE]  # Primera página
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        pattern = SCAN_PATTERNS.get(vendor)
+        if pattern is None:
+            raise CommandError(f"Motor no soportado: {vendor}")
+
+        if options["no_seqscan"] and vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+        scans = 0
+        for label, view_class, params, roles in ENDPOINTS:
+            for role in roles:
+                queryset = self.build_queryset(view_class, params, role)
+                table = queryset.model._meta.db_table
+                plan = queryset.explain()
+
+                scanned = {match for match in pattern.findall(plan)}
+                name = f"{label} [{role}]"
+                if table in scanned:
+                    scans += 1
+                    self.stdout.write(self.style.WARNING(f"SCAN   {name}: recorre `{table}`"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"INDEX  {name}"))
+
+                if options["verbose_plan"] or table in scanned:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"         {line}")
+
+        if scans and options["fail_on_scan"]:
+            raise CommandError(f"{scans} consulta(s) recorren la tabla completa.")
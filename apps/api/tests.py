@@ -1,3 +1,86 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Prefetch
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from commissions.models import Commission
+from core.mixins import build_eager_loading_plan
+from core.testing import api_client, create_petition, create_user
+from petitions.models import Company, Department, Notification, Petition
+from petitions.serializers import NotificationInboxSerializer, PetitionFullDetailserializer, PetitionModelserializer
+
+
+def lookups(prefetch):
+    return {item.prefetch_to if isinstance(item, Prefetch) else item for item in prefetch}
+
+
+class EagerLoadingPlanTests(TestCase):
+    """Plan `select_related` / `prefetch_related` derivado del serializer."""
+
+    def test_nested_serializers(self):
+        select, prefetch = build_eager_loading_plan(PetitionFullDetailserializer(many=True), Petition)
+
+        self.assertEqual(set(select), {"user", "user__human_resource", "company", "department"})
+        self.assertEqual(
+            lookups(prefetch),
+            {"user__human_resource__client_companies", "user__groups", "commissions", "commissions__users"},
+        )
+
+    def test_primary_keys_and_attnames_need_no_join(self):
+        self.assertEqual(build_eager_loading_plan(PetitionModelserializer(), Petition), ([], []))
+        # `petition_id` se lee de la fila; `petition.title` sí necesita el JOIN
+        self.assertEqual(build_eager_loading_plan(NotificationInboxSerializer(), Notification), (["petition"], []))
+
+
+class PetitionListQueriesTests(TestCase):
+    url = reverse("api:petition-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        company, department = Company.objects.create(name="C1"), Department.objects.create(name="D1")
+        cls.admin = create_user("admin", "Admin", company, department)
+        for index in range(5):
+            employee = create_user(f"employee{index}", "Employee", company, department)
+            petition = create_petition(employee, company, department)
+            Commission.objects.create(petition=petition, description="Comisión").users.add(employee)
+
+    def test_queries_do_not_grow_with_rows(self):
+        client = api_client(self.admin)
+        client.get(self.url)  # Token y roles
+        with CaptureQueriesContext(connection) as one:
+            self.assertEqual(len(client.get(f"{self.url}?limit=1").json()["results"]), 1)
+        with CaptureQueriesContext(connection) as five:
+            self.assertEqual(len(client.get(f"{self.url}?limit=5").json()["results"]), 5)
+
+        self.assertEqual(len(five), len(one))
+
+
+class ListIndexTests(TestCase):
+    """Índices de los filtros de listado (ver `manage.py explain_list_queries`)."""
+
+    def test_indexes_exist(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Petition._meta.db_table)
+
+        self.assertTrue(
+            {
+                "petitions_active_created_idx",
+                "petitions_active_dept_idx",
+                "petitions_active_company_idx",
+                "petitions_active_user_idx",
+                "petitions_active_status_idx",
+            }
+            <= set(constraints)
+        )
+
+    def test_list_queries_use_indexes(self):
+        out = StringIO()
+        call_command("explain_list_queries", stdout=out)
 
-# Create your tests here.
+        scans = [line for line in out.getvalue().splitlines() if line.startswith("SCAN")]
+        # Solo los catálogos chicos (departamentos, empresas) recorren la tabla
+        self.assertEqual([line.split()[1] for line in scans], ["departments", "companies"])
@@ -53,6 +53,9 @@ urlpatterns = [
 
     # Petitions
     path("petitions/",                      api.PetitionListView.as_view(),   name="petition-list"),   # GET/POST
+    path("petitions/bulk/",                 api.PetitionBulkView.as_view(),   name="petition-bulk"),   # POST (crear / actualizar en lote)
+    path("petitions/status/",               api.PetitionStatusTransitionView.as_view(), name="petition-status"), # POST (aprobar / rechazar en lote)
+    path("petitions/export/",               api.PetitionExportView.as_view(), name="petition-export"), # GET ?format=csv|ndjson
     path("petitions/<int:pk>/",             api.PetitionDetailView.as_view(), name="petition-detail"), # GET/PUT/PATCH/DELETE
     path("petitions/<int:petition_id>/activate/", api.PetitionActivateView.as_view(), name="petition-activate"),  # POST
 
@@ -64,7 +67,18 @@ urlpatterns = [
     path("companies/",          api.CompanyListView.as_view(),   name="company-list"),   # GET/POST
     path("companies/<int:pk>/", api.CompanyDetailView.as_view(), name="company-detail"), # GET/PUT/PATCH/DELETE
 
+    # Stats
+    path("stats/petitions/", api.PetitionStatsView.as_view(), name="stats-petitions"), # GET
+    path("stats/daily/",     api.DailyStatsView.as_view(),    name="stats-daily"),     # GET ?date_from=&date_until=
+
     # Notifications
     path("notifications/",              api.NotificationListView.as_view(),       name="notification-list"), # GET
     path("notifications/<int:pk>/read/", api.NotificationMarkAsReadView.as_view(), name="notification-read"), # POST/PATCH
+    path("notifications/unread-count/", api.NotificationUnreadCountView.as_view(), name="notification-unread-count"), # GET
+    path("notifications/mark-all-read/", api.NotificationMarkAllReadView.as_view(), name="notification-mark-all-read"), # POST
+    path("notifications/mark-read/",     api.NotificationMarkReadView.as_view(),    name="notification-mark-read"),     # POST ?ids=
+    path("notifications/stream/",        api.NotificationStreamView.as_view(),      name="notification-stream"),        # GET (SSE, ASGI) ?ticket=
+    path("notifications/stream/ticket/", api.NotificationStreamTicketView.as_view(), name="notification-stream-ticket"), # POST
+    path("notifications/archive/",       api.NotificationArchiveListView.as_view(), name="notification-archive"),       # GET
+    path("notifications/preferences/",   api.NotificationPreferenceView.as_view(),  name="notification-preferences"),   # GET/PUT/PATCH
 ]
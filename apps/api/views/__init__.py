@@ -33,10 +33,13 @@ from .comissions import (
 # Petitions
 from .petition_view import (
     PetitionListView,
+    PetitionExportView,
     PetitionDetailView,
     PetitionUpdateView,
     PetitionDeleteView,
     PetitionCreateView,
+    PetitionBulkView,
+    PetitionStatusTransitionView,
     PetitionActivateView,
 )
 
@@ -58,10 +61,23 @@ from .company_view import (
     CompanyCreateView,
 )
 
+# Stats
+from .stats_view import (
+    PetitionStatsView,
+    DailyStatsView,
+)
+
 # Notifications
 from .notification_view import (
     NotificationListView,
     NotificationMarkAsReadView,
+    NotificationUnreadCountView,
+    NotificationMarkAllReadView,
+    NotificationMarkReadView,
+    NotificationStreamTicketView,
+    NotificationStreamView,
+    NotificationArchiveListView,
+    NotificationPreferenceView,
 )
 
 __all__ = [
@@ -79,8 +95,9 @@ __all__ = [
     "CommissionAssignUsersView", "CommissionActivateView",
 
     # Petitions
-    "PetitionListView", "PetitionDetailView", "PetitionUpdateView",
-    "PetitionDeleteView", "PetitionCreateView", "PetitionActivateView",
+    "PetitionListView", "PetitionExportView", "PetitionDetailView", "PetitionUpdateView",
+    "PetitionDeleteView", "PetitionCreateView", "PetitionBulkView",
+    "PetitionStatusTransitionView", "PetitionActivateView",
 
     # Departments
     "DepartmentListView", "DepartmentDetailView", "DepartmentUpdateView",
@@ -90,6 +107,11 @@ __all__ = [
     "CompanyListView", "CompanyDetailView", "CompanyUpdateView",
     "CompanyDeleteView", "CompanyCreateView",
 
+    # Stats
+    "PetitionStatsView", "DailyStatsView",
+
     # Notifications
-    "NotificationListView", "NotificationMarkAsReadView",
+    "NotificationListView", "NotificationMarkAsReadView", "NotificationUnreadCountView",
+    "NotificationMarkAllReadView", "NotificationMarkReadView", "NotificationStreamTicketView",
+    "NotificationStreamView", "NotificationArchiveListView", "NotificationPreferenceView",
 ]
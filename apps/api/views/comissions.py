@@ -1,5 +1,8 @@
 """API comissions view."""
 
+# Django
+from django.db.models import Max
+
 # Django REST Framework
 from rest_framework import status
 from rest_framework.response import Response
@@ -24,13 +27,19 @@ from commissions.serializers import CommissionModelSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Mixins
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin
+
 
-class CommissionListView(ListAPIView):
+class CommissionListView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
     """Vista para listar comisiones activas."""
 
     queryset = Commission.objects.all()
     serializer_class = CommissionModelSerializer
     permission_classes = [IsAuthenticated]
+    conditional_aggregates = {
+        "petition_modified": Max("petition__modified"),  # `petition_title`
+    }
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -106,13 +115,19 @@ class CommissionCreateView(CreateAPIView):
         )
 
 
-class CommissionDetailView(RetrieveAPIView):
+class CommissionDetailView(ConditionalGetMixin, EagerLoadingMixin, RetrieveAPIView):
     """Vista para obtener una comisión por ID."""
 
     queryset = Commission.objects.all()
     serializer_class = CommissionModelSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_object_last_modified(self, obj):
+        return max(obj.modified, obj.petition.modified)  # `petition_title`
+
+    def get_object_fingerprint(self, obj):
+        return sorted(user.pk for user in obj.users.all())
+
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter(
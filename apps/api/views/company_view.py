@@ -23,11 +23,14 @@ from petitions.serializers import CompanySerializer, CompanyCreateSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Mixins
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin
+
 # Custom Permissions
 from core.permissions import IsAdmin, IsManager, IsEmployee, IsClient
 
 
-class CompanyListView(ListAPIView):
+class CompanyListView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
     queryset = Company.active_objects.all()
     serializer_class = CompanySerializer
     permission_classes = [IsAuthenticated, IsAdmin | IsManager | IsEmployee | IsClient]
@@ -49,7 +52,7 @@ class CompanyListView(ListAPIView):
         return super().get_queryset()
 
 
-class CompanyDetailView(RetrieveAPIView):
+class CompanyDetailView(ConditionalGetMixin, EagerLoadingMixin, RetrieveAPIView):
     queryset = Company.active_objects.all()
     serializer_class = CompanySerializer
     permission_classes = [IsAuthenticated, IsAdmin]
@@ -22,10 +22,13 @@ from petitions.serializers import DepartmentSerializer, DepartmentCreateSerializ
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Mixins
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin
+
 # Custom Permissions
 from core.permissions import IsAdmin, IsManager, IsEmployee, IsClient
 
-class DepartmentListView(ListAPIView):
+class DepartmentListView(ConditionalGetMixin, EagerLoadingMixin, ListAPIView):
     queryset = Department.active_objects.all()
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated, IsAdmin | IsManager | IsEmployee | IsClient]
@@ -47,7 +50,7 @@ class DepartmentListView(ListAPIView):
         return super().get_queryset()
 
 
-class DepartmentDetailView(RetrieveAPIView):
+class DepartmentDetailView(ConditionalGetMixin, EagerLoadingMixin, RetrieveAPIView):
     queryset = Department.active_objects.all()
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
@@ -1,16 +1,95 @@
-from rest_framework.generics import ListAPIView, UpdateAPIView
+import asyncio
+import json
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.authtoken.models import Token
+from rest_framework.generics import ListAPIView, RetrieveUpdateAPIView, UpdateAPIView
 from rest_framework.permissions import IsAuthenticated
-from petitions.models import Notification
-from petitions.serializers import NotificationSerializer
+from rest_framework.views import APIView
+from petitions.models import Notification, NotificationArchive, NotificationPreference
+from petitions.serializers import (
+    NotificationSerializer,
+    NotificationInboxSerializer,
+    NotificationArchiveSerializer,
+    NotificationPreferenceSerializer,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework import status
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin
+from core.pagination import KeysetPaginationMixin
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from petitions.stream import (
+    get_ticket_max_age,
+    hub,
+    issue_stream_ticket,
+    notification_event,
+    parse_stream_event_id,
+    read_stream_ticket,
+    stream_event_id,
+)
+from users.models import User
+
+
+MARK_READ_MAX_IDS = 500
+
+AUTHORIZATION_PARAMETER = openapi.Parameter(
+    "Authorization",
+    openapi.IN_HEADER,
+    description="Token de autenticación. Usar el formato 'Token <ACCESS_TOKEN>'",
+    type=openapi.TYPE_STRING,
+    required=True,
+    default="Token <ACCESS_TOKEN>",
+)
+
+MARK_READ_RESPONSE = openapi.Response(
+    "Notificaciones marcadas",
+    openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "updated": openapi.Schema(type=openapi.TYPE_INTEGER),
+            "unread": openapi.Schema(type=openapi.TYPE_INTEGER),
+        },
+    ),
+)
 
-class NotificationListView(ListAPIView):
-    """Lista de notificaciones del usuario autenticado."""
+
+class NotificationListView(ConditionalGetMixin, EagerLoadingMixin, KeysetPaginationMixin, ListAPIView):
+    """Lista de notificaciones del usuario autenticado.
+
+    Mezcla en un solo query las directas y las difusiones de sus audiencias
+    (`Notification.objects.inbox`); `status` es el estado para este usuario.
+
+    Por defecto responde la forma liviana (`NotificationInboxSerializer`:
+    sin `recipient`, con `petition_id` y `petition_title`); `?view=full`
+    devuelve la forma completa (`NotificationSerializer`).
+    """
     
-    serializer_class = NotificationSerializer
+    keyset_ordering = ("-created_at", "id")
+    last_modified_field = "created_at"
+    conditional_aggregates = {
+        # Marcar como leída no tiene timestamp: se cuenta aparte
+        "read": Count("pk", filter=Q(inbox_status=Notification.Status.READ)),
+        "recipient_modified": Max("recipient__modified"),
+        "petition_modified": Max("petition__modified"),  # `petition_title`
+    }
+    serializer_class = NotificationInboxSerializer
+    full_serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_serializer_class(self):
+        if self.filter_params.get("view") == "full":  # Se conserva en el cursor
+            return self.full_serializer_class
+        return self.serializer_class
+
     def get_queryset(self):
         """Filtra notificaciones según el grupo del usuario."""
 
@@ -19,17 +98,308 @@ class NotificationListView(ListAPIView):
         # if user.groups.filter(name="Admin").exists():
         #     return Notification.objects.all()  # 🔥 Admins ven TODO
 
-        return Notification.objects.filter(recipient=user)  # 🔥 Managers y Clients ven solo las suyas
+        return self.apply_eager_loading(
+            Notification.objects.inbox(user)
+        )  # 🔥 Las suyas y las difusiones de su alcance
     
+class NotificationArchiveListView(KeysetPaginationMixin, ListAPIView):
+    """Notificaciones archivadas del usuario (ver `manage.py archive_notifications`).
+
+    Se consultan aparte de la bandeja: la tabla principal solo guarda las
+    recientes y las no leídas. Filtro opcional `?petition=<id>`.
+    """
+
+    keyset_ordering = ("-created_at", "id")
+    serializer_class = NotificationArchiveSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = NotificationArchive.objects.for_user(self.request.user)
+        petition = self.filter_params.get("petition")
+        if petition:
+            if not str(petition).isdigit():
+                raise ValidationError({"petition": "Debe ser un id numérico."})
+            queryset = queryset.filter(petition_id=petition)
+        return queryset.order_by("-created_at", "id")
+
+
 class NotificationMarkAsReadView(UpdateAPIView):
     """Marca una notificación como leída."""
     
-    queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        if self.request.method == "PUT":
+            return Notification.objects.inbox(self.request.user)
+        # 🔥 PATCH edita la fila: solo las directas propias
+        return Notification.objects.filter(recipient=self.request.user)
+
     def put(self, request, *args, **kwargs):
         notification = self.get_object()
-        notification.status = "read"
-        notification.save()
+        Notification.objects.mark_read(request.user, [notification.pk])
         return Response({"message": "Notificación marcada como leída."}, status=status.HTTP_200_OK)
+
+
+class NotificationUnreadCountView(APIView):
+    """Cantidad de notificaciones sin leer del usuario autenticado.
+
+    Sale de `NotificationCounter` (una fila por clave primaria, directas y
+    difusiones): pensado para consultarse cada pocos segundos desde el
+    indicador de la UI.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[AUTHORIZATION_PARAMETER],
+        responses={
+            200: openapi.Response(
+                "Notificaciones sin leer",
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={"unread": openapi.Schema(type=openapi.TYPE_INTEGER)},
+                ),
+            )
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        return Response({"unread": Notification.objects.unread_count(request.user)})
+
+
+class NotificationMarkAllReadView(APIView):
+    """Marca como leídas todas las notificaciones del usuario (un solo `UPDATE`)."""
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[AUTHORIZATION_PARAMETER],
+        responses={200: MARK_READ_RESPONSE},
+    )
+    def post(self, request, *args, **kwargs):
+        updated = Notification.objects.mark_read(request.user)
+        return Response(
+            {"updated": updated, "unread": Notification.objects.unread_count(request.user)},
+            status=status.HTTP_200_OK,
+        )
+
+
+class NotificationMarkReadView(APIView):
+    """Marca como leídas las notificaciones `?ids=1,2,3` del usuario (un solo `UPDATE`).
+
+    Los ids ajenos o ya leídos se ignoran: `updated` cuenta solo las filas
+    que cambiaron.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_ids(self):
+        raw = self.request.query_params.get("ids", "")
+        try:
+            ids = {int(value) for value in raw.split(",") if value.strip()}
+        except ValueError:
+            raise ValidationError({"ids": "Debe ser una lista de ids separados por coma."})
+
+        if not ids:
+            raise ValidationError({"ids": "Este parámetro es requerido."})
+        if len(ids) > MARK_READ_MAX_IDS:
+            raise ValidationError({"ids": f"Máximo {MARK_READ_MAX_IDS} ids por solicitud."})
+        return ids
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            AUTHORIZATION_PARAMETER,
+            openapi.Parameter(
+                "ids",
+                openapi.IN_QUERY,
+                description="Ids de las notificaciones separados por coma.",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+        ],
+        responses={200: MARK_READ_RESPONSE},
+    )
+    def post(self, request, *args, **kwargs):
+        updated = Notification.objects.mark_read(request.user, self.get_ids())
+        return Response(
+            {"updated": updated, "unread": Notification.objects.unread_count(request.user)},
+            status=status.HTTP_200_OK,
+        )
+
+
+class NotificationPreferenceView(RetrieveUpdateAPIView):
+    """Preferencias de correo del usuario: `immediate`, `digest` (cada
+    `digest_interval` minutos) u `off`.
+
+    Un resumen ya programado se envía igual aunque se vuelva a `immediate`.
+    """
+
+    serializer_class = NotificationPreferenceSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        preference, _ = NotificationPreference.objects.get_or_create(user=self.request.user)
+        return preference
+
+    @swagger_auto_schema(manual_parameters=[AUTHORIZATION_PARAMETER])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @swagger_auto_schema(manual_parameters=[AUTHORIZATION_PARAMETER])
+    def put(self, request, *args, **kwargs):
+        return super().put(request, *args, **kwargs)
+
+    @swagger_auto_schema(manual_parameters=[AUTHORIZATION_PARAMETER])
+    def patch(self, request, *args, **kwargs):
+        return super().patch(request, *args, **kwargs)
+
+
+def sse_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class NotificationStreamTicketView(APIView):
+    """Ticket de corta duración para abrir el stream SSE.
+
+    `EventSource` no permite enviar headers: el cliente pide un ticket con
+    su token y abre `/api/v1/notifications/stream/?ticket=<ticket>`. El
+    ticket solo sirve para el stream y vence a los
+    `NOTIFICATION_STREAM_TICKET_MAX_AGE` segundos (solo hace falta para
+    conectar; reconectar pide uno nuevo).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[AUTHORIZATION_PARAMETER],
+        responses={
+            201: openapi.Response(
+                "Ticket del stream",
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "ticket": openapi.Schema(type=openapi.TYPE_STRING),
+                        "expires_in": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    },
+                ),
+            )
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        return Response(
+            {"ticket": issue_stream_ticket(request.user), "expires_in": get_ticket_max_age()},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class NotificationStreamView(View):
+    """Stream SSE (`text/event-stream`) con las notificaciones nuevas del usuario.
+
+    + Autenticación: `Authorization: Token <key>` o `?ticket=<ticket>`
+      (`EventSource` no permite enviar headers, ver
+      `NotificationStreamTicketView`). El token de la API nunca va en la URL.
+    + Al conectar envía `event: unread` con el conteo actual y, si viene
+      `Last-Event-ID` (o `?last_event_id=`), lo que llegó desde entonces
+      (incluidas las agrupadas después, ver `stream_event_id`).
+    + Luego `event: notification` por cada notificación nueva (payload
+      liviano, ver `petitions/stream.py`) y un comentario cada
+      `NOTIFICATION_STREAM_HEARTBEAT` segundos.
+
+    Es una vista async: hay que servir `flow.asgi` (ver Procfile). Cada
+    conexión es una corrutina esperando su cola, sin conexión a la base de
+    datos abierta.
+    """
+
+    max_backlog = 50
+
+    def authenticate(self, request):
+        header = request.headers.get("Authorization", "")
+        try:
+            if header.startswith("Token "):
+                key = header.split(" ", 1)[1].strip()
+                token = Token.objects.select_related("user").filter(key=key).first()
+                user = token.user if token else None
+            else:
+                user_id = read_stream_ticket(request.GET.get("ticket", ""))
+                user = User.objects.filter(pk=user_id).first() if user_id else None
+        finally:
+            connection.close()  # 🔥 No retener una conexión por cliente conectado
+        if user is None or not user.is_active:
+            return None
+        return user
+
+    def prepare(self, user, last_event_id):
+        """Canales, eventos pendientes desde `last_event_id` y no leídas."""
+        try:
+            channels = [f"user:{user.pk}", *Notification.objects.audiences_for(user)]
+            backlog = []
+            if last_event_id is not None:
+                created_at, pk = last_event_id
+                # 🔥 Por `(created_at, id)`: las agrupadas renuevan `created_at`, no el id
+                pending = Notification.objects.inbox(user).filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                )
+                for notification in pending.order_by("created_at", "id")[: self.max_backlog]:
+                    event = notification_event(notification)
+                    event["status"] = notification.inbox_status
+                    backlog.append(event)
+            return channels, backlog, Notification.objects.unread_count(user)
+        finally:
+            connection.close()
+
+    def get_last_event_id(self, request):
+        """`(created_at, id)` del último evento recibido (ver `stream_event_id`)."""
+        value = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        return parse_stream_event_id(value) if value else None
+
+    async def stream(self, user, last_event_id):
+        # 🔥 Suscribirse antes de leer lo pendiente: no se pierde nada en el medio
+        subscription = hub.subscribe([f"user:{user.pk}"])
+        try:
+            channels, backlog, unread = await sync_to_async(self.prepare)(user, last_event_id)
+            subscription.channels = frozenset(channels)
+
+            seen = deque(maxlen=500)
+            yield "retry: 5000\n\n"
+            yield sse_event({"unread": unread}, event="unread")
+            for event in backlog:
+                seen.append((event["id"], event["created_at"]))
+                yield sse_event(event, event="notification", event_id=stream_event_id(event))
+
+            heartbeat = getattr(settings, "NOTIFICATION_STREAM_HEARTBEAT", 15)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                key = (event["id"], event["created_at"])  # Una agrupada vuelve con otro `created_at`
+                if key in seen:
+                    continue  # Publicado en el proceso y encontrado también por el sondeo
+                seen.append(key)
+                yield sse_event(event, event="notification", event_id=stream_event_id(event))
+        finally:
+            hub.unsubscribe(subscription)
+
+    async def get(self, request, *args, **kwargs):
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Las credenciales de autenticación no se proveyeron o son inválidas."},
+                status=401,
+            )
+
+        response = StreamingHttpResponse(
+            self.stream(user, self.get_last_event_id(request)),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # 🔥 nginx: no acumular el stream
+        return response
@@ -1,11 +1,20 @@
 """Petition views."""
 
+# Python
+import csv
+import json
+
 # Django
-from django.db.models import Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.dateparse import parse_date
 
 # Django REST Framework
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import (
@@ -19,29 +28,130 @@ from rest_framework.views import APIView
 
 # Models
 from petitions.models import Petition
+from petitions.search import search_petitions
+from petitions.cache import (
+    build_response_key,
+    get_cache_timeout,
+    response_cache_enabled,
+    scopes_for_user,
+)
 
 # Serializers
 from petitions.serializers import (
     PetitionModelserializer,
     PetitionCreateSerializer,
+    PetitionBulkItemSerializer,
+    PetitionStatusTransitionSerializer,
     PetitionFullDetailserializer,
+    CompanySerializer,
+    DepartmentSerializer,
 )
+from users.serializers import UserModelSerializer
 
 # DRF Yasg
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 # Custom Permissions
-from core.permissions import IsAdmin, CanViewPetition
+from core.permissions import IsAdmin, IsManager, CanViewPetition
 from core.functions import filter_queryset_by_group
+from core.mixins import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    EagerLoadingMixin,
+    SideloadMixin,
+)
+from core.pagination import KeysetPaginationMixin
+from core.renderers import CSVRenderer, NDJSONRenderer
+
+
+class PetitionCacheMixin(CachedResponseMixin):
+    """Cachea la respuesta por alcance de rol (ver `petitions/cache.py`)."""
+
+    def get_response_cache_key(self):
+        if not response_cache_enabled():
+            return None  # 🔥 Caché por proceso: los otros workers no se enterarían de los cambios
+        scopes = scopes_for_user(self.request.user)
+        if not scopes:
+            return None  # 🔥 Sin grupo no ve nada: no vale la pena cachear
+        return build_response_key(scopes, *self.get_request_signature())
+
+    def get_response_cache_timeout(self):
+        return get_cache_timeout()
+
+
+def filter_petitions(queryset, user, params):
+    """Alcance por grupo + filtros del listado (`PetitionListView`, exportación)."""
+
+    queryset = filter_queryset_by_group(queryset, user)  # 🔥 Aplicar filtro por grupo
+
+    # 🔥 Diccionario para aplicar filtros dinámicos
+    filter_kwargs = {}
+
+    # 📌 Filtros directos
+    if params.get("user_email"):
+        filter_kwargs["user__email"] = params["user_email"]
+
+    if params.get("department"):
+        filter_kwargs["department__id"] = params["department"]
+
+    if params.get("company"):
+        filter_kwargs["company__id"] = params["company"]
+
+    if params.get("status_approval"):
+        filter_kwargs["status_approval"] = params["status_approval"]
+
+    # 📌 Filtros con búsqueda parcial
+    title = params.get("title")
+    if title:
+        queryset = queryset.filter(Q(title__icontains=title))  # 🔥 Buscar en el título
+
+    # 📌 Filtros de rango de fechas
+    date_from = params.get("date_from")
+    if date_from:
+        parsed_date = parse_date(date_from)
+        if parsed_date:
+            filter_kwargs["created__gte"] = parsed_date
+
+    date_until = params.get("date_until")
+    if date_until:
+        parsed_date = parse_date(date_until)
+        if parsed_date:
+            filter_kwargs["created__lte"] = parsed_date
 
+    # 🔥 Aplicar todos los filtros en una sola operación
+    queryset = queryset.filter(**filter_kwargs)
 
-class PetitionListView(ListAPIView):
+    # 📌 Búsqueda de texto completo (ordenada por relevancia)
+    search = params.get("search")
+    if search:
+        queryset = search_petitions(queryset, search)
+
+    return queryset
+
+
+class PetitionListView(
+    PetitionCacheMixin,
+    ConditionalGetMixin,
+    SideloadMixin,
+    EagerLoadingMixin,
+    KeysetPaginationMixin,
+    ListAPIView,
+):
     """Vista para listar peticiones con filtros avanzados."""
 
     queryset = Petition.active_objects.all()
     serializer_class = PetitionFullDetailserializer
     permission_classes = [IsAuthenticated, CanViewPetition]
+    sideload_fields = {
+        "user": ("users", UserModelSerializer),
+        "company": ("companies", CompanySerializer),
+        "department": ("departments", DepartmentSerializer),
+    }
+    conditional_aggregates = {
+        # Las comisiones van anidadas en cada petición
+        "commissions_modified": Max("commissions__modified"),
+    }
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -71,6 +181,12 @@ class PetitionListView(ListAPIView):
                 description="Buscar peticiones por título.",
                 type=openapi.TYPE_STRING,
             ),
+            openapi.Parameter(
+                "search",
+                openapi.IN_QUERY,
+                description="Búsqueda de texto completo en título y descripción (ordenada por relevancia).",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "user_id",
                 openapi.IN_QUERY,
@@ -89,61 +205,183 @@ class PetitionListView(ListAPIView):
                 description="Filtrar por empresa específica.",
                 type=openapi.TYPE_INTEGER,
             ),
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Campos a devolver separados por coma (ej. `id,title,status_approval`, `user.email`).",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "expand",
+                openapi.IN_QUERY,
+                description="Relaciones a anidar (ej. `user,user.human_resource`). Las demás se devuelven como ids.",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "compact",
+                openapi.IN_QUERY,
+                description="`true`: usuario, empresa y departamento como ids y cada objeto una sola vez en `included`.",
+                type=openapi.TYPE_BOOLEAN,
+            ),
+            openapi.Parameter(
+                "pagination",
+                openapi.IN_QUERY,
+                description="Usar `cursor` para paginación keyset (sin COUNT ni OFFSET). No se combina con `search`.",
+                type=openapi.TYPE_STRING,
+                enum=["cursor"],
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="Cursor opaco devuelto en `next`/`previous`. Conserva los filtros activos.",
+                type=openapi.TYPE_STRING,
+            ),
         ],
         responses={200: PetitionFullDetailserializer(many=True)},
     )
     def get_queryset(self):
         """Obtiene el queryset de peticiones aplicando filtros avanzados."""
 
-        user = self.request.user  # Obtener usuario autenticado
-        queryset = super().get_queryset()
-
-        queryset = filter_queryset_by_group(super().get_queryset(), user)  # 🔥 Aplicar filtro por grupo
+        # 🔥 El cursor ordena por `(-created, id)`: perdería el orden por relevancia
+        if self.use_keyset_pagination() and self.filter_params.get("search"):
+            raise ValidationError({"search": "No admite paginación por cursor; usar `limit`/`offset`."})
 
-        # 🔥 Diccionario para aplicar filtros dinámicos
-        filter_kwargs = {}
+        # 🔥 Query params (o filtros guardados en el cursor)
+        return filter_petitions(super().get_queryset(), self.request.user, self.filter_params)
 
-        # 📌 Filtros directos
-        if self.request.query_params.get("user_email"):
-            filter_kwargs["user__email"] = self.request.query_params["user_email"]
 
-        if self.request.query_params.get("department"):
-            filter_kwargs["department__id"] = self.request.query_params["department"]
+class PetitionExportView(APIView):
+    """Exporta las peticiones filtradas en CSV o NDJSON (en streaming).
 
-        if self.request.query_params.get("company"):
-            filter_kwargs["company__id"] = self.request.query_params["company"]
+    Acepta los mismos filtros y el mismo alcance por grupo que
+    `PetitionListView`. Las filas se leen con `values_list()` + `iterator()`
+    (cursor del lado del servidor en PostgreSQL) y se escriben a medida que
+    llegan, así la memoria no crece con el tamaño de la exportación.
+    """
 
-        if self.request.query_params.get("status_approval"):
-            filter_kwargs["status_approval"] = self.request.query_params["status_approval"]
+    permission_classes = [IsAuthenticated, CanViewPetition]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+
+    chunk_size = 2000
+
+    # (columna, lookup)
+    columns = [
+        ("id", "id"),
+        ("title", "title"),
+        ("description", "description"),
+        ("is_main", "is_main"),
+        ("priority", "priority"),
+        ("status_approval", "status_approval"),
+        ("department_id", "department_id"),
+        ("department", "department__name"),
+        ("company_id", "company_id"),
+        ("company", "company__name"),
+        ("user_id", "user_id"),
+        ("user_email", "user__email"),
+        ("hours", "hours"),
+        ("start_date", "start_date"),
+        ("end_date", "end_date"),
+        ("created", "created"),
+        ("modified", "modified"),
+    ]
+
+    def get_rows(self):
+        """Tuplas de la exportación, leídas por bloques de `chunk_size`."""
+        queryset = filter_petitions(
+            Petition.active_objects.all(), self.request.user, self.request.query_params
+        )
+        if not self.request.query_params.get("search"):
+            queryset = queryset.order_by("-created", "id")
+
+        lookups = [lookup for _, lookup in self.columns]
+        return queryset.values_list(*lookups).iterator(chunk_size=self.chunk_size)
+
+    def export_value(self, value):
+        if hasattr(value, "tzinfo") and value.tzinfo is not None:
+            return timezone.localtime(value).isoformat()  # 🔥 Misma zona que la API
+        return value
+
+    def stream_csv(self):
+        buffer = _EchoBuffer()
+        writer = csv.writer(buffer)
+        # 🔥 BOM para que Excel abra bien los acentos
+        yield "\ufeff" + writer.writerow([name for name, _ in self.columns])
+        for row in self.get_rows():
+            yield writer.writerow([self.export_value(value) for value in row])
+
+    def stream_ndjson(self):
+        names = [name for name, _ in self.columns]
+        for row in self.get_rows():
+            item = dict(zip(names, (self.export_value(value) for value in row)))
+            yield json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
 
-        # 📌 Filtros con búsqueda parcial
-        title = self.request.query_params.get("title")
-        if title:
-            queryset = queryset.filter(Q(title__icontains=title))  # 🔥 Buscar en el título
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="Token de autenticación. Usar el formato 'Token <ACCESS_TOKEN>'",
+                type=openapi.TYPE_STRING,
+                required=True,
+                default="Token <ACCESS_TOKEN>",
+            ),
+            openapi.Parameter(
+                "format",
+                openapi.IN_QUERY,
+                description="Formato de la exportación.",
+                type=openapi.TYPE_STRING,
+                enum=["csv", "ndjson"],
+                default="csv",
+            ),
+            openapi.Parameter(
+                "search",
+                openapi.IN_QUERY,
+                description="Búsqueda de texto completo (mismos filtros que el listado: `title`, `status_approval`, `department`, `company`, `user_email`, `date_from`, `date_until`).",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={200: "Archivo CSV o NDJSON"},
+    )
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if renderer.format == "ndjson":
+            content = self.stream_ndjson()
+        else:
+            content = self.stream_csv()
+
+        filename = f"peticiones-{timezone.localdate():%Y%m%d}.{renderer.format}"
+        response = StreamingHttpResponse(
+            content, content_type=f"{renderer.media_type}; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
-        # 📌 Filtros de rango de fechas
-        date_from = self.request.query_params.get("date_from")
-        if date_from:
-            parsed_date = parse_date(date_from)
-            if parsed_date:
-                filter_kwargs["created__gte"] = parsed_date
 
-        date_until = self.request.query_params.get("date_until")
-        if date_until:
-            parsed_date = parse_date(date_until)
-            if parsed_date:
-                filter_kwargs["created__lte"] = parsed_date
+class _EchoBuffer:
+    """Pseudo-archivo para `csv.writer`: devuelve la línea en vez de guardarla."""
 
-        # 🔥 Aplicar todos los filtros en una sola operación
-        return queryset.filter(**filter_kwargs)
+    def write(self, value):
+        return value
 
 
-class PetitionDetailView(RetrieveAPIView):
+class PetitionDetailView(
+    PetitionCacheMixin, ConditionalGetMixin, EagerLoadingMixin, RetrieveAPIView
+):
 
     queryset = Petition.active_objects.all()
     serializer_class = PetitionFullDetailserializer
     permission_classes = [IsAuthenticated, CanViewPetition]
 
+    def get_object_last_modified(self, obj):
+        # 🔥 Las comisiones ya vienen del prefetch del EagerLoadingMixin
+        return max([obj.modified, *(commission.modified for commission in obj.commissions.all())])
+
+    def get_object_fingerprint(self, obj):
+        return [
+            sorted(user.pk for user in commission.users.all())
+            for commission in obj.commissions.all()
+        ]
+
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter(
@@ -298,6 +536,142 @@ class PetitionCreateView(CreateAPIView):
         )
 
 
+class PetitionBulkView(APIView):
+    """Crea y/o actualiza (parcialmente) muchas peticiones en un solo request.
+
+    El cuerpo es una lista: los elementos con `id` se actualizan (solo
+    peticiones dentro del alcance del usuario) y los que no tienen `id` se
+    crean. Si un elemento no es válido no se escribe nada y la respuesta
+    trae los errores en la misma posición del elemento.
+    """
+
+    permission_classes = [IsAuthenticated]
+    max_items = 500
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="Token de autenticación. Usar el formato 'Token <access_token>'",
+                type=openapi.TYPE_STRING,
+                required=True,
+                default="Token <ACCESS_TOKEN>",
+            ),
+        ],
+        request_body=PetitionBulkItemSerializer(many=True),
+        responses={
+            201: openapi.Response(
+                "Peticiones creadas / actualizadas",
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "message": openapi.Schema(type=openapi.TYPE_STRING),
+                        "created": openapi.Schema(
+                            type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)
+                        ),
+                        "updated": openapi.Schema(
+                            type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)
+                        ),
+                    },
+                ),
+            ),
+            400: "Errores por elemento (misma posición que en el cuerpo).",
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = PetitionBulkItemSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=self.max_items,
+            context={
+                "request": request,
+                "queryset": filter_queryset_by_group(Petition.active_objects.all(), request.user),
+            },
+        )
+
+        # 🔥 Validación (con bloqueo de las filas a actualizar) y escritura juntas
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        created = [petition.id for petition in serializer.created]
+        updated = [petition.id for petition in serializer.updated]
+        return Response(
+            {
+                "message": f"{len(created)} peticiones creadas, {len(updated)} actualizadas.",
+                "created": created,
+                "updated": updated,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class PetitionStatusTransitionView(APIView):
+    """Aprueba / rechaza / finaliza muchas peticiones en un solo request."""
+
+    permission_classes = [IsAuthenticated, IsAdmin | IsManager]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="Token de autenticación. Usar el formato 'Token <access_token>'",
+                type=openapi.TYPE_STRING,
+                required=True,
+                default="Token <ACCESS_TOKEN>",
+            ),
+        ],
+        request_body=PetitionStatusTransitionSerializer,
+        responses={
+            200: openapi.Response(
+                "Resultado por petición",
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "status_approval": openapi.Schema(type=openapi.TYPE_STRING),
+                        "updated": openapi.Schema(type=openapi.TYPE_INTEGER),
+                        "results": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    "id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                                    "result": openapi.Schema(
+                                        type=openapi.TYPE_STRING,
+                                        enum=["updated", "unchanged", "not_found"],
+                                    ),
+                                },
+                            ),
+                        ),
+                    },
+                ),
+            )
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = PetitionStatusTransitionSerializer(
+            data=request.data,
+            context={
+                "request": request,
+                "queryset": filter_queryset_by_group(Petition.active_objects.all(), request.user),
+            },
+        )
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return Response(
+            {
+                "status_approval": serializer.validated_data["status_approval"],
+                "updated": sum(1 for item in results if item["result"] == "updated"),
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class PetitionActivateView(APIView):
     """Activa una petición previamente eliminada (Soft Delete)."""
 
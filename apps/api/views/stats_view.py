@@ -0,0 +1,257 @@
+"""Stats views."""
+
+# Python
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+# Django
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+# Django REST Framework
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+# Models
+from petitions.models import Petition, PetitionCounter, PetitionDailyStat
+from petitions.models.petition_daily_stat_model import METRICS
+
+# DRF Yasg
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+# Roles
+from core.roles import get_role_snapshot
+
+
+class PetitionStatsView(APIView):
+    """Conteos de peticiones activas por estado y prioridad.
+
+    Lee la tabla de contadores (`PetitionCounter`) filtrada por el alcance
+    del usuario, así el costo no depende de la cantidad de peticiones. Los
+    contadores no tienen usuario: para Employees se cuenta sobre sus propias
+    peticiones (índice `petitions_active_user_idx`).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def employee_summary(self, roles, filters):
+        by_status, by_priority = Counter(), Counter()
+        rows = (
+            Petition.active_objects.filter(user_id=roles.user_id, **filters)
+            .order_by()
+            .values_list("status_approval", "priority")
+        )
+        for status_approval, priority in rows:
+            by_status[status_approval] += 1
+            by_priority[priority] += 1
+        return {
+            "total": sum(by_status.values()),
+            "by_status": dict(by_status),
+            "by_priority": dict(by_priority),
+        }
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="Token de autenticación. Usar el formato 'Token <ACCESS_TOKEN>'",
+                type=openapi.TYPE_STRING,
+                required=True,
+                default="Token <ACCESS_TOKEN>",
+            ),
+            openapi.Parameter(
+                "company",
+                openapi.IN_QUERY,
+                description="Filtrar por empresa.",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "department",
+                openapi.IN_QUERY,
+                description="Filtrar por departamento.",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                "Conteos",
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "total": openapi.Schema(type=openapi.TYPE_INTEGER),
+                        "by_status": openapi.Schema(type=openapi.TYPE_OBJECT),
+                        "by_priority": openapi.Schema(type=openapi.TYPE_OBJECT),
+                    },
+                ),
+            )
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        roles = get_role_snapshot(request.user)
+
+        # 📌 Filtros opcionales
+        filters = {}
+        for name in ("company", "department"):
+            value = request.query_params.get(name)
+            if value and value.isdigit():
+                filters[f"{name}_id"] = int(value)
+
+        # 🔥 Mismo orden de grupos que `filter_queryset_by_group`
+        if roles.is_admin:
+            summary = PetitionCounter.objects.summary(**filters)
+        elif roles.is_manager:
+            filters["department_id"] = roles.department_id  # 🔥 Su departamento, pida lo que pida
+            summary = PetitionCounter.objects.summary(**filters)
+        elif roles.is_employee:
+            summary = self.employee_summary(roles, filters)
+        elif roles.is_client:
+            summary = PetitionCounter.objects.summary(
+                company_id__in=roles.visible_company_ids, **filters
+            )
+        else:
+            summary = {"total": 0, "by_status": {}, "by_priority": {}}
+
+        return Response(summary)
+
+
+class DailyStatsView(APIView):
+    """Serie diaria de peticiones creadas / aprobadas / rechazadas / finalizadas y horas.
+
+    Lee `PetitionDailyStat` (una fila por día, empresa y departamento),
+    filtrado por el alcance del usuario. El resumen no tiene usuario: para
+    Employees se calcula sobre sus propias peticiones del rango.
+    """
+
+    permission_classes = [IsAuthenticated]
+    default_days = 30
+    max_days = 366
+
+    def get_range(self, params):
+        today = timezone.localdate()
+        date_until = parse_date(params.get("date_until") or "") or today
+        date_from = parse_date(params.get("date_from") or "") or (
+            date_until - timedelta(days=self.default_days - 1)
+        )
+
+        if date_from > date_until:
+            raise ValidationError({"date_from": "Debe ser anterior o igual a `date_until`."})
+        if (date_until - date_from).days >= self.max_days:
+            raise ValidationError({"date_from": f"El rango no puede superar {self.max_days} días."})
+        return date_from, date_until
+
+    def employee_series(self, roles, date_from, date_until, filters):
+        """Serie calculada al vuelo sobre las peticiones del empleado."""
+        days = defaultdict(
+            lambda: {metric: timedelta() if metric == "hours" else 0 for metric in METRICS}
+        )
+        stats = PetitionDailyStat.objects.compute(
+            Petition.objects.filter(user_id=roles.user_id, **filters), date_from, date_until
+        )
+        for stat in stats:
+            day = days[stat.day]
+            for metric in METRICS:
+                day[metric] += getattr(stat, metric)
+        return [{"day": day, **values} for day, values in sorted(days.items())]
+
+    def format_row(self, row):
+        hours = row.get("hours") or timedelta()
+        if isinstance(hours, timedelta):
+            hours = round(hours.total_seconds() / 3600, 2)  # 🔥 Horas decimales
+        return {**{metric: row.get(metric) or 0 for metric in METRICS}, "hours": hours}
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="Token de autenticación. Usar el formato 'Token <ACCESS_TOKEN>'",
+                type=openapi.TYPE_STRING,
+                required=True,
+                default="Token <ACCESS_TOKEN>",
+            ),
+            openapi.Parameter(
+                "date_from",
+                openapi.IN_QUERY,
+                description="Primer día (YYYY-MM-DD). Por defecto, 30 días antes de `date_until`.",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "date_until",
+                openapi.IN_QUERY,
+                description="Último día (YYYY-MM-DD). Por defecto hoy.",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "company",
+                openapi.IN_QUERY,
+                description="Filtrar por empresa.",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "department",
+                openapi.IN_QUERY,
+                description="Filtrar por departamento.",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                "Serie diaria",
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "date_from": openapi.Schema(type=openapi.TYPE_STRING),
+                        "date_until": openapi.Schema(type=openapi.TYPE_STRING),
+                        "totals": openapi.Schema(type=openapi.TYPE_OBJECT),
+                        "days": openapi.Schema(
+                            type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)
+                        ),
+                    },
+                ),
+            )
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        date_from, date_until = self.get_range(params)
+        roles = get_role_snapshot(request.user)
+
+        # 📌 Filtros opcionales
+        filters = {}
+        for name in ("company", "department"):
+            value = params.get(name)
+            if value and value.isdigit():
+                filters[f"{name}_id"] = int(value)
+
+        # 🔥 Mismo orden de grupos que `filter_queryset_by_group`
+        if roles.is_admin:
+            scope = {}
+        elif roles.is_manager:
+            scope = {"department_id": roles.department_id}
+        elif roles.is_employee:
+            scope = None
+        elif roles.is_client:
+            scope = {"company_id__in": roles.visible_company_ids}
+        else:
+            scope = {"pk__in": []}
+
+        if scope is None:
+            days = self.employee_series(roles, date_from, date_until, filters)
+        else:
+            # 🔥 El alcance pisa los filtros (`?department=` de un Manager)
+            days = list(PetitionDailyStat.objects.series(date_from, date_until, **{**filters, **scope}))
+
+        rows = [{"day": row["day"], **self.format_row(row)} for row in days]
+        totals = self.format_row(
+            {
+                metric: sum((row[metric] for row in days if row[metric]), timedelta() if metric == "hours" else 0)
+                for metric in METRICS
+            }
+        )
+        return Response(
+            {"date_from": date_from, "date_until": date_until, "totals": totals, "days": rows}
+        )
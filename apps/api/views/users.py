@@ -4,6 +4,7 @@
 from django.core.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import Group
+from django.db.models import Max
 
 # Django REST Framework
 from rest_framework import status
@@ -32,6 +33,10 @@ from users.serializers import (
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Mixins
+from core.mixins import ConditionalGetMixin, EagerLoadingMixin
+from core.pagination import KeysetPaginationMixin
+
 # Custom Permissions
 from core.permissions import IsAdmin, IsManager, IsClient, IsEmployee
 
@@ -99,12 +104,15 @@ class AccountVerificationAPIView(APIView):
 
 
 ### 🔹 1. GET ALL (Lista de usuarios) ###
-class UserListView(ListAPIView):
+class UserListView(ConditionalGetMixin, EagerLoadingMixin, KeysetPaginationMixin, ListAPIView):
     """Lista todos los usuarios con filtros opcionales."""
 
     queryset = User.objects.all()
     serializer_class = UserModelSerializer
     permission_classes = [IsAuthenticated, IsAdmin | IsClient | IsManager | IsEmployee]
+    conditional_aggregates = {
+        "human_resource_modified": Max("human_resource__modified"),
+    }
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -140,12 +148,13 @@ class UserListView(ListAPIView):
     def get_queryset(self):
         """Filtrar usuarios por email, estado activo y verificado."""
         queryset = super().get_queryset()
+        params = self.filter_params
         
-        email = self.request.query_params.get("email")
-        active = self.request.query_params.get("active")
-        verified = self.request.query_params.get("verified")
-        group = self.request.query_params.get("group")
-        exclude_group_name = self.request.query_params.get("exclude_group")
+        email = params.get("email")
+        active = params.get("active")
+        verified = params.get("verified")
+        group = params.get("group")
+        exclude_group_name = params.get("exclude_group")
 
         if email:
             queryset = queryset.filter(email__icontains=email)
@@ -164,13 +173,22 @@ class UserListView(ListAPIView):
 
 
 ### 🔹 2. GET by ID (Detalle de usuario) ###
-class UserDetailView(RetrieveAPIView):
+class UserDetailView(ConditionalGetMixin, EagerLoadingMixin, RetrieveAPIView):
     """Obtiene un usuario por ID."""
 
     queryset = User.objects.all()
     serializer_class = UserModelSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
+    def get_object_last_modified(self, obj):
+        human_resource = getattr(obj, "human_resource", None)
+        if human_resource is None:
+            return obj.modified
+        return max(obj.modified, human_resource.modified)
+
+    def get_object_fingerprint(self, obj):
+        return sorted(group.pk for group in obj.groups.all())
+
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter(
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 12:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0002_remove_commission_commissions_id_b0137d_idx_and_more'),
+        ('petitions', '0007_alter_petition_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commission',
+            index=models.Index(condition=models.Q(('active', True), ('deleted__isnull', True)), fields=['petition', '-created'], name='commissions_active_pet_idx'),
+        ),
+    ]
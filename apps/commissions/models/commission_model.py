@@ -7,7 +7,7 @@ from django.db import models
 from utils.main_model import MainModel
 from users.models.users_model import User
 
-from core.managers import ActiveManager
+from core.managers import ActiveManager, ACTIVE_ROWS
 
 
 class Commission(MainModel, models.Model):
@@ -38,6 +38,12 @@ class Commission(MainModel, models.Model):
         db_table = "commissions"
         indexes = [
             models.Index(fields=["id", "active", "deleted"]),
+            # Comisiones activas de una petición, más recientes primero
+            models.Index(
+                fields=["petition", "-created"],
+                name="commissions_active_pet_idx",
+                condition=ACTIVE_ROWS,
+            ),
         ]
 
     def __str__(self):
@@ -3,6 +3,9 @@
 # Django REST Framework
 from rest_framework import serializers
 
+# Utilities
+from core.serializers import SparseFieldsMixin
+
 # Models
 from .models import Commission
 from petitions.models import Petition
@@ -16,7 +19,7 @@ class CommissionSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class CommissionModelSerializer(serializers.ModelSerializer):
+class CommissionModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     petition_title = serializers.CharField(
         source="petition.title", read_only=True
@@ -1,3 +1,53 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from commissions.models import Commission
+from core.testing import api_client, create_petition, create_user
+from petitions.models import Company, Department
+
+
+class ConditionalGetTests(TestCase):
+    list_url = reverse("api:commission-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        company, department = Company.objects.create(name="C1"), Department.objects.create(name="D1")
+        cls.admin = create_user("admin", "Admin", company, department)
+        cls.users = [create_user(f"employee{index}", "Employee", company, department) for index in range(4)]
+        petition = create_petition(cls.admin, company, department)
+        cls.commission = Commission.objects.create(description="Comisión", petition=petition)
+        cls.commission.users.set([cls.users[0], cls.users[3]])
+
+    def setUp(self):
+        self.client = api_client(self.admin)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_not_modified(self):
+        detail_url = reverse("api:commission-detail", args=[self.commission.pk])
+        for url in (self.list_url, detail_url):
+            etag = self.etag(url)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+
+    def test_membership_swap_changes_the_list_etag(self):
+        etag = self.etag(self.list_url)
+
+        # 🔥 Misma suma de ids (1 + 4 == 2 + 3): no debe dar el mismo ETag
+        self.commission.users.set([self.users[1], self.users[2]])
+
+        self.assertNotEqual(self.etag(self.list_url), etag)
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_reverse_membership_changes_the_list_etag(self):
+        petition_list_url = reverse("api:petition-list")
+        etags = self.etag(self.list_url), self.etag(petition_list_url)
+
+        self.users[0].commission_set.clear()
+
+        self.assertNotEqual(self.etag(self.list_url), etags[0])
+        self.assertNotEqual(self.etag(petition_list_url), etags[1])
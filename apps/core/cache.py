@@ -0,0 +1,16 @@
+"""Utilidades de caché compartidas."""
+
+# Django
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache(alias="default"):
+    """`True` si todos los procesos ven la misma caché (Redis, Memcached, base de datos).
+
+    Con `LocMemCache` (sin `REDIS_URL`) cada worker tiene la suya: una
+    invalidación solo llega al proceso que la hizo, así que lo que depende
+    de invalidar entre procesos no debe cachearse.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
@@ -1,24 +1,26 @@
+from core.roles import get_role_snapshot
+
+
 def filter_queryset_by_group(queryset, user):
-    """Filtra los usuarios según el grupo del usuario autenticado."""
+    """Filtra las peticiones según el grupo del usuario autenticado."""
 
-    if user.groups.filter(name="Admin").exists():
-        return queryset  # 🔥 Admin ve todos los usuarios
+    roles = get_role_snapshot(user)
+
+    if roles.is_admin:
+        return queryset  # 🔥 Admin ve todas las peticiones
 
-    elif user.groups.filter(name="Manager").exists():
+    elif roles.is_manager:
         return queryset.filter(
-            department__id=user.human_resource.department.id
-        )  # 🔥 Managers ven empleados de su departamento
-    
-    elif user.groups.filter(name="Employee").exists():
-        return queryset.filter(id=user.id)  # 🔥 Employees solo ven su propio perfil
+            department__id=roles.department_id
+        )  # 🔥 Managers ven las peticiones de su departamento
 
-    elif user.groups.filter(name="Client").exists():
-        client_companies = user.human_resource.client_companies.values_list("company", flat=True)
-        if client_companies.exists():
-            return queryset.filter(company__in=client_companies)  # 🔥 Múltiples empresas
+    elif roles.is_employee:
+        return queryset.filter(user_id=roles.user_id)  # 🔥 Employees solo ven sus propias peticiones
+
+    elif roles.is_client:
         return queryset.filter(
-            company__id=user.human_resource.company.id
-        )
+            company__in=roles.visible_company_ids
+        )  # 🔥 Una o múltiples empresas
 
     return queryset.none()  # 🔥 Si el usuario no pertenece a un grupo, no ve nada
 
@@ -27,20 +29,22 @@ def filter_queryset_by_group(queryset, user):
 def filter_queryset_user_by_group(queryset, user):
     """Filtra los usuarios según el grupo del usuario autenticado."""
 
-    if user.groups.filter(name="Admin").exists():
+    roles = get_role_snapshot(user)
+
+    if roles.is_admin:
         return queryset  # 🔥 Admin ve todos los usuarios
 
-    elif user.groups.filter(name="Manager").exists():
+    elif roles.is_manager:
         return queryset.filter(
-            human_resource__department=user.human_resource.department
+            human_resource__department_id=roles.department_id
         )  # 🔥 Managers ven empleados de su departamento
 
-    elif user.groups.filter(name="Employee").exists():
+    elif roles.is_employee:
         return queryset.filter(id=user.id)  # 🔥 Employees solo ven su propio perfil
 
-    elif user.groups.filter(name="Client").exists():
+    elif roles.is_client:
         return queryset.filter(
-            human_resource__company=user.human_resource.company
+            human_resource__company_id=roles.company_id
         )  # 🔥 Clients solo ven su perfil y si pertenece a su empresa
 
     return queryset.none()  # 🔥 Si el usuario no pertenece a un grupo, no ve nada
@@ -0,0 +1,101 @@
+"""Envío de correos por lotes.
+
++ `SharedTemplate`: renderiza la plantilla una sola vez por evento y deja
+  marcadores para los campos de cada destinatario, que luego se completan
+  con un simple reemplazo de texto.
++ `send_messages`: envía los mensajes reutilizando una conexión por lote
+  (`EMAIL_BATCH_SIZE` correos) y limita el ritmo a `EMAIL_RATE_LIMIT`
+  correos por segundo.
+
+El backend se elige con `EMAIL_BACKEND` (SMTP, consola o archivos en
+`EMAIL_FILE_PATH` para desarrollo y pruebas).
+"""
+
+# Python
+import time
+
+# Django
+from django.conf import settings
+from django.core.mail import get_connection
+from django.template.loader import render_to_string
+from django.utils.html import conditional_escape
+
+
+MARKER = "[[mail:{}]]"
+
+
+class SharedTemplate:
+    """Plantilla renderizada una vez con marcadores para el destinatario.
+
+    `fields` son los atributos del destinatario que usa la plantilla
+    (`{{ user.first_name }}` → `fields=("first_name",)`). No deben pasar
+    por filtros que alteren el texto del marcador.
+
+        html = SharedTemplate("emails/notification_email.html", context, ("first_name",))
+        html.render(user)  # Por cada destinatario
+    """
+
+    def __init__(self, template_name, context, fields, recipient_name="user"):
+        self.fields = tuple(fields)
+        markers = {field: MARKER.format(field) for field in self.fields}
+        self.content = render_to_string(template_name, {**context, recipient_name: markers})
+
+    def render(self, recipient, escape=True):
+        content = self.content
+        for field in self.fields:
+            value = getattr(recipient, field, "") or ""
+            content = content.replace(
+                MARKER.format(field), conditional_escape(value) if escape else str(value)
+            )
+        return content
+
+
+def get_batch_size():
+    return max(getattr(settings, "EMAIL_BATCH_SIZE", 100), 1)
+
+
+def get_rate_limit():
+    return getattr(settings, "EMAIL_RATE_LIMIT", 0)
+
+
+def send_messages(messages, batch_size=None, rate=None):
+    """Envía `messages` con una conexión por lote. `[(message, error | None), ...]`.
+
+    Cada mensaje se envía por separado sobre la conexión abierta: el costo
+    de la conexión (TLS, login) se paga una vez por lote y los errores
+    quedan asociados a su mensaje. `rate` (correos por segundo, `0` = sin
+    límite) sobrescribe `EMAIL_RATE_LIMIT`.
+    """
+    batch_size = batch_size or get_batch_size()
+    rate = get_rate_limit() if rate is None else rate
+    interval = 1 / rate if rate else 0
+    next_send = time.monotonic()
+
+    results = []
+    for start in range(0, len(messages), batch_size):
+        batch = messages[start : start + batch_size]
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            results.extend((message, error) for message in batch)
+            continue
+
+        try:
+            for message in batch:
+                if interval:
+                    time.sleep(max(next_send - time.monotonic(), 0))
+                    next_send = max(next_send, time.monotonic()) + interval
+
+                message.connection = connection
+                try:
+                    connection.send_messages([message])
+                    results.append((message, None))
+                except Exception as error:
+                    results.append((message, error))
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass  # 🔥 El lote ya se envió: un error al cerrar no lo invalida
+    return results
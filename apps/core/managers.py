@@ -1,12 +1,17 @@
 # Django
 from django.db import models
+from django.db.models import Q
 from django.utils.timezone import now
 
+# Filas que sirve `ActiveManager` (útil como condición de índices parciales)
+ACTIVE_ROWS = Q(active=True, deleted__isnull=True)
+
+
 class ActiveManager(models.Manager):
     """Manager que solo devuelve registros activos."""
 
     def get_queryset(self):
-        return super().get_queryset().filter(active=True, deleted__isnull=True)
+        return super().get_queryset().filter(ACTIVE_ROWS)
 
     def deleted(self):
         """Devuelve los registros eliminados (soft-delete)."""
@@ -14,4 +19,4 @@ class ActiveManager(models.Manager):
 
     def all_with_deleted(self):
         """Devuelve todos los registros, incluyendo eliminados."""
-        return super().get_queryset()
\ No newline at end of file
+        return super().get_queryset()
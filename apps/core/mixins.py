@@ -0,0 +1,419 @@
+"""Mixins reutilizables para las vistas de la API."""
+
+# Python
+import hashlib
+
+# Django
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max, Prefetch
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+# Django REST Framework
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Utilities
+from core.roles import get_role_snapshot
+from core.serializers import (
+    apply_sparse_fieldset,
+    get_query_params,
+    parse_field_tree,
+    primary_key_field_for,
+)
+
+
+def _get_relation(model, name):
+    """Devuelve el campo de relación `name` de `model` o `None`."""
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if name != field.name:
+        return None  # `<fk>_id` (attname): se lee de la misma fila, sin JOIN
+    return field if field.is_relation else None
+
+
+def _is_many(field):
+    return field.many_to_many or field.one_to_many
+
+
+def build_eager_loading_plan(serializer, model):
+    """Recorre los campos de un serializer y arma el plan de carga.
+
+    Devuelve una tupla `(select, prefetch)` con los lookups que necesita
+    el serializer para no disparar consultas por fila:
+
+    + Serializers anidados sobre FK / OneToOne -> `select_related`.
+    + Serializers anidados `many=True`, `ManyRelatedField` y relaciones
+      inversas -> `prefetch_related` (con su propio plan dentro del
+      `Prefetch`).
+    + Fuentes con puntos (`petition.title`) -> `select_related` del camino.
+    """
+
+    select, prefetch = [], []
+
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    if not isinstance(serializer, serializers.Serializer):
+        return select, prefetch
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        # 🔥 Recorrer la fuente (`a.b.c`) mientras los atributos sean relaciones
+        source_attrs = field.source.split(".")
+        current_model, path, many_relation, relation = model, [], None, None
+        for attr in source_attrs:
+            relation = _get_relation(current_model, attr)
+            if relation is None:
+                break
+            if _is_many(relation):
+                many_relation = relation
+                path.append(attr)
+                break
+            path.append(attr)
+            current_model = relation.related_model
+
+        if not path:
+            continue
+
+        lookup = "__".join(path)
+
+        # Relaciones a muchos -> Prefetch con el plan del hijo
+        if many_relation is not None:
+            related_model = many_relation.related_model
+            if isinstance(field, serializers.ManyRelatedField):
+                child_select, child_prefetch = [], []
+            else:
+                child_select, child_prefetch = build_eager_loading_plan(field, related_model)
+            queryset = related_model._default_manager.select_related(*child_select)
+            prefetch.append(Prefetch(lookup, queryset=queryset))
+            prefetch.extend(_prefix(lookup, child_prefetch))
+            continue
+
+        resolved = len(path) == len(source_attrs)
+
+        if resolved and isinstance(field, serializers.BaseSerializer):
+            child_select, child_prefetch = build_eager_loading_plan(field, current_model)
+            select.extend(f"{lookup}__{item}" for item in child_select)
+            prefetch.extend(_prefix(lookup, child_prefetch))
+        elif resolved and isinstance(field, serializers.PrimaryKeyRelatedField) and relation.concrete:
+            # Solo se lee `<campo>_id`, el JOIN del último tramo sobra
+            path.pop()
+            lookup = "__".join(path)
+            if not lookup:
+                continue
+
+        select.append(lookup)
+
+    return list(dict.fromkeys(select)), prefetch
+
+
+def _prefix(lookup, prefetch):
+    """Antepone `lookup` a cada elemento de un plan de prefetch."""
+    prefixed = []
+    for item in prefetch:
+        if isinstance(item, Prefetch):
+            prefixed.append(
+                Prefetch(f"{lookup}__{item.prefetch_through}", queryset=item.queryset)
+            )
+        else:
+            prefixed.append(f"{lookup}__{item}")
+    return prefixed
+
+
+class EagerLoadingMixin:
+    """Aplica `select_related`/`prefetch_related` según el serializer de la vista.
+
+    El plan se deriva del árbol de campos del serializer, así el número de
+    consultas por página se mantiene constante sin importar cuántas filas
+    se devuelvan.
+    """
+
+    def get_eager_loading_serializer(self):
+        """Serializer usado para derivar el plan de carga."""
+        return self.get_serializer()
+
+    def apply_eager_loading(self, queryset):
+        select, prefetch = build_eager_loading_plan(
+            self.get_eager_loading_serializer(), queryset.model
+        )
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def get_queryset(self):
+        return self.apply_eager_loading(super().get_queryset())
+
+
+class SideloadMixin:
+    """Modo compacto (`?compact=true`) al estilo `included` de JSON:API.
+
+    Las filas referencian por id las relaciones de `sideload_fields` y cada
+    objeto relacionado distinto se serializa una sola vez en el mapa
+    `included` de la respuesta::
+
+        sideload_fields = {"user": ("users", UserModelSerializer)}
+
+    `?fields=` / `?expand=` con prefijo (`user.email`) se aplican también a
+    los objetos incluidos.
+    """
+
+    sideload_query_param = "compact"
+    sideload_fields = {}
+
+    def use_sideloading(self):
+        request = getattr(self, "request", None)
+        if request is None:
+            return False
+        value = get_query_params(request, self).get(self.sideload_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.use_sideloading():
+            row = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            for name in self.sideload_fields:
+                field = row.fields.get(name)
+                replacement = None
+                if isinstance(field, serializers.BaseSerializer):
+                    replacement = primary_key_field_for(row, name, field)
+                if replacement is not None:
+                    row.fields[name] = replacement
+        return serializer
+
+    def get_included(self, rows):
+        """Serializa una vez cada objeto relacionado distinto de `rows`."""
+        params = get_query_params(self.request, self)  # 🔥 Con cursor, los guardados en él
+        fields = parse_field_tree(params.get("fields"))
+        expand = parse_field_tree(params.get("expand"))
+        sparse = "fields" in params or "expand" in params
+        context = {**self.get_serializer_context(), "sparse_fieldsets": False}
+
+        included = {key: {} for key, _ in self.sideload_fields.values()}
+        if not rows:
+            return included
+
+        for name, (key, serializer_class) in self.sideload_fields.items():
+            if fields and name not in fields:
+                included.pop(key)
+                continue
+
+            relation = rows[0]._meta.get_field(name)
+            ids = {getattr(row, relation.attname) for row in rows} - {None}
+
+            serializer = serializer_class(context=context)
+            if sparse:
+                apply_sparse_fieldset(
+                    serializer, fields=fields.get(name) or None, expand=expand.get(name, {})
+                )
+
+            select, prefetch = build_eager_loading_plan(serializer, relation.related_model)
+            objects = list(
+                relation.related_model._default_manager.filter(pk__in=ids)
+                .select_related(*select)
+                .prefetch_related(*prefetch)
+            )
+
+            data = serializers.ListSerializer(child=serializer, context=context).to_representation(objects)
+            included[key] = {str(obj.pk): item for obj, item in zip(objects, data)}
+
+        return included
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_sideloading():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+        data = self.get_serializer(rows, many=True).data
+
+        if page is not None:
+            response = self.get_paginated_response(data)
+        else:
+            response = Response({"results": data})
+
+        response.data["included"] = self.get_included(rows)
+        return response
+
+
+class ConditionalGetMixin:
+    """Validadores `ETag` / `Last-Modified` para los GET de la API.
+
+    + Detalle: `ETag` y `Last-Modified` a partir de `modified` del objeto
+      (`get_object_last_modified`).
+    + Listado: solo `ETag`, de un único aggregate (`Max` de
+      `last_modified_field` + `Count`) sobre el queryset ya filtrado por
+      grupo y parámetros. Sin `Last-Modified`: una fila que sale del listado
+      (soft delete, filtro, alcance) no mueve el `Max` y un
+      `If-Modified-Since` respondería 304 con la fila borrada.
+
+    Si el cliente envía `If-None-Match` / `If-Modified-Since` y coinciden se
+    responde 304 sin serializar nada. El ETag incluye el usuario, su alcance y
+    los query params, porque la misma URL devuelve datos distintos por rol.
+
+    `conditional_aggregates` agrega expresiones al aggregate del listado para
+    cambios que no actualizan `last_modified_field` (relaciones anidadas,
+    estados sin timestamp, ...).
+    """
+
+    last_modified_field = "modified"
+    conditional_aggregates = {}
+
+    def get_validator_seed(self):
+        """Parte del ETag que depende de quién pregunta y cómo."""
+        request = self.request
+        user = request.user
+        scope = ()
+        if user.is_authenticated:
+            roles = get_role_snapshot(user)
+            scope = (
+                roles.user_id,
+                sorted(roles.groups),
+                roles.department_id,
+                roles.company_id,
+                roles.client_company_ids,
+            )
+        renderer = getattr(request, "accepted_renderer", None)
+        params = sorted(request.query_params.lists())
+        return [scope, getattr(renderer, "format", None), params]
+
+    def make_etag(self, *parts):
+        raw = repr([*self.get_validator_seed(), *parts]).encode()
+        return quote_etag(hashlib.md5(raw).hexdigest())
+
+    def get_object_last_modified(self, obj):
+        return getattr(obj, self.last_modified_field, None)
+
+    def get_object_fingerprint(self, obj):
+        """Datos extra del objeto que cambian sin tocar su timestamp (m2m)."""
+        return ()
+
+    def get_list_etag(self, queryset):
+        """ETag del listado con un solo query."""
+        aggregates = {
+            "last_modified": Max(self.last_modified_field),
+            # 🔥 Con aggregates sobre relaciones el JOIN duplica filas
+            "count": Count("pk", distinct=bool(self.conditional_aggregates)),
+            **self.conditional_aggregates,
+        }
+        values = queryset.order_by().aggregate(**aggregates)
+        return self.make_etag(sorted(values.items(), key=lambda item: item[0]))
+
+    def conditional_response(self, etag, last_modified):
+        """Devuelve el 304 si el cliente ya tiene la versión actual."""
+        response = get_conditional_response(
+            self.request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if response is not None:
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.get_list_etag(queryset)
+
+        response = self.conditional_response(etag, None)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+            self.set_validators(response, etag, None)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = self.get_object_last_modified(instance)
+        etag = self.make_etag(instance.pk, last_modified, self.get_object_fingerprint(instance))
+
+        response = self.conditional_response(etag, last_modified)
+        if response is None:
+            serializer = self.get_serializer(instance)
+            response = self.set_validators(Response(serializer.data), etag, last_modified)
+        return response
+
+
+class CachedResponseMixin:
+    """Caché de las respuestas 200 de `list` / `retrieve`.
+
+    La vista define `get_response_cache_key()` (`None` = no cachear); la
+    clave debe incluir lo que cambia la respuesta (alcance del usuario,
+    `get_request_signature()`, ...). Se guardan los datos y los validadores
+    (`ETag` / `Last-Modified`), así un acierto responde 200 o 304 sin tocar
+    la base de datos ni serializar.
+    """
+
+    response_cache_timeout = 60
+    cached_headers = ("ETag", "Last-Modified")
+
+    def get_response_cache_key(self):
+        return None
+
+    def get_response_cache_timeout(self):
+        return self.response_cache_timeout
+
+    def get_request_signature(self):
+        """Vista, kwargs, query params normalizados y formato de salida."""
+        request = self.request
+        renderer = getattr(request, "accepted_renderer", None)
+        params = [
+            (name, values)
+            for name, values in sorted(request.query_params.lists())
+            if any(values)  # `?title=` no filtra nada
+        ]
+        return [
+            type(self).__name__,
+            sorted(self.kwargs.items()),
+            params,
+            getattr(renderer, "format", None),
+        ]
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key()
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        entry = cache.get(key)
+        if entry is not None:
+            data, headers = entry
+            response = get_conditional_response(
+                request,
+                etag=headers.get("ETag"),
+                last_modified=parse_http_date_safe(headers.get("Last-Modified")),
+            ) or Response(data)
+            for name, value in headers.items():
+                response.headers[name] = value
+            response.headers["X-Cache"] = "HIT"
+            patch_vary_headers(response, ("Authorization",))
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            headers = {
+                name: response.headers[name]
+                for name in self.cached_headers
+                if name in response.headers
+            }
+            cache.set(key, (response.data, headers), self.get_response_cache_timeout())
+            response.headers["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
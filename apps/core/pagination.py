@@ -0,0 +1,239 @@
+"""Paginación por cursor (keyset) para la API."""
+
+# Python
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+# Django
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+
+# Django REST Framework
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginación keyset sobre `(campo principal, desempate)`.
+
+    En vez de `COUNT(*)` + `OFFSET` filtra con
+    `WHERE (created < c) OR (created = c AND id > i)`, así que la página N
+    cuesta lo mismo que la primera. El cursor es opaco (base64 de JSON) y
+    guarda también los filtros activos, de modo que el enlace `next` solo
+    necesita `?cursor=`.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido."
+
+    # Parámetros que no forman parte de los filtros
+    reserved_params = ("cursor", "limit", "offset", "pagination", "format")
+
+    def __init__(self, ordering=("-created", "id")):
+        self.ordering = ordering
+
+    # Cursor
+
+    def encode_cursor(self, position, reverse, filters):
+        payload = {"p": position, "r": reverse, "f": filters}
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        return urlsafe_b64encode(data).decode().rstrip("=")
+
+    @classmethod
+    def load_cursor(cls, request):
+        """Decodifica el cursor de la petición (`None` si no viene)."""
+        encoded = request.query_params.get(cls.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(padded.encode()))
+            if not isinstance(payload, dict) or not isinstance(payload.get("f", {}), dict):
+                raise ValueError
+        except (TypeError, ValueError, BinasciiError):
+            raise NotFound(cls.invalid_cursor_message)
+        return payload
+
+    def decode_cursor(self, request):
+        """Devuelve `(posición, reverse)` o `(None, False)` si no hay cursor."""
+        payload = self.load_cursor(request)
+        if payload is None:
+            return None, False
+
+        position = payload.get("p")
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get("r", False))
+
+    @classmethod
+    def get_filter_params(cls, request):
+        """Filtros activos: los del cursor, sobreescritos por los explícitos."""
+        params = QueryDict(mutable=True)
+
+        payload = cls.load_cursor(request) or {}
+        for key, values in payload.get("f", {}).items():
+            params.setlist(key, values if isinstance(values, list) else [values])
+
+        for key, values in request.query_params.lists():
+            if key not in cls.reserved_params:
+                params.setlist(key, values)
+
+        return params
+
+    # Ordering helpers
+
+    def _fields(self):
+        return [
+            (name.lstrip("-"), name.startswith("-")) for name in self.ordering
+        ]
+
+    def _position_for(self, obj):
+        position = []
+        for name, _ in self._fields():
+            field = obj._meta.get_field(name)
+            position.append(field.value_to_string(obj))
+        return position
+
+    def _keyset_filter(self, model, position, reverse):
+        """Construye el `Q` de "después de" (o "antes de" si `reverse`)."""
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self._fields(), position)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self._fields(), values):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    # Pagination
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        position, reverse = self.decode_cursor(request)
+        self.filters = dict(self.get_filter_params(request).lists())
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                name[1:] if name.startswith("-") else f"-{name}" for name in ordering
+            ]
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self._keyset_filter(queryset.model, position, reverse)
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def _link(self, position, reverse):
+        url = self.request.build_absolute_uri(self.request.path)
+        cursor = self.encode_cursor(position, reverse, self.filters)
+        url = replace_query_param(url, self.cursor_query_param, cursor)
+        if self.page_size_query_param in self.request.query_params:
+            url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return url
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self._position_for(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self._position_for(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class KeysetPaginationMixin:
+    """Activa la paginación keyset con `?pagination=cursor` (o con `?cursor=`).
+
+    Por defecto se mantiene la paginación global (`LimitOffsetPagination`).
+    Las vistas deben leer sus filtros de `self.filter_params` para que los
+    filtros guardados en el cursor se respeten.
+    """
+
+    keyset_ordering = ("-created", "id")
+
+    def use_keyset_pagination(self):
+        params = self.request.query_params
+        return (
+            params.get("pagination") == "cursor"
+            or KeysetPagination.cursor_query_param in params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if getattr(self, "request", None) is not None and self.use_keyset_pagination():
+                self._paginator = KeysetPagination(ordering=self.keyset_ordering)
+            else:
+                return super().paginator
+        return self._paginator
+
+    @property
+    def filter_params(self):
+        if not hasattr(self, "_filter_params"):
+            if self.use_keyset_pagination():
+                self._filter_params = KeysetPagination.get_filter_params(self.request)
+            else:
+                self._filter_params = self.request.query_params
+        return self._filter_params
@@ -1,32 +1,34 @@
 from rest_framework.permissions import BasePermission
-from petitions.models import Petition
+from core.roles import get_role_snapshot
 
 class CanViewPetition(BasePermission):
     """Permiso para permitir acceso a peticiones según el grupo."""
 
+    def has_permission(self, request, view):
+        """Sin alguno de los grupos no ve ninguna petición: 403 en vez de un listado vacío."""
+        roles = get_role_snapshot(request.user)
+        return roles.is_admin or roles.is_manager or roles.is_employee or roles.is_client
+
     def has_object_permission(self, request, view, obj):
         """Verifica si el usuario tiene acceso a la petición."""
 
-        user = request.user
+        roles = get_role_snapshot(request.user)
 
-        if user.groups.filter(name="Admin").exists():
+        if roles.is_admin:
             return True  # Admins pueden ver todas las peticiones
 
-        if user.groups.filter(name="Manager").exists():
+        if roles.is_manager:
             return (
-                obj.department == user.human_resource.department
+                obj.department_id == roles.department_id
             )  # Managers ven su departamento
 
-        if (user.groups.filter(name="Employee").exists()):
-            return obj.user == user # Employees y Clients solo ven sus propias peticiones
+        if roles.is_employee:
+            return obj.user_id == roles.user_id # Employees y Clients solo ven sus propias peticiones
 
-        if user.groups.filter(name="Client").exists():
+        if roles.is_client:
             # 🔥 Verificar si el cliente tiene varias empresas
-            client_companies = user.human_resource.client_companies.values_list("company", flat=True)
-            if client_companies.exists():
-                return obj.company_id in client_companies
-            return obj.company == user.human_resource.company
-        
+            return obj.company_id in roles.visible_company_ids
+
         return False  # Si no pertenece a un grupo válido, no tiene acceso
 
 
@@ -34,25 +36,25 @@ class IsAdmin(BasePermission):
     """Permiso que permite acceso solo a usuarios del grupo Admin."""
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name="Admin").exists()
+        return get_role_snapshot(request.user).is_admin
 
 
 class IsManager(BasePermission):
     """Permiso que permite acceso solo a usuarios del grupo Manager."""
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name="Manager").exists()
+        return get_role_snapshot(request.user).is_manager
 
 
 class IsEmployee(BasePermission):
     """Permiso que permite acceso solo a usuarios del grupo Employee."""
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name="Employee").exists()
+        return get_role_snapshot(request.user).is_employee
 
 
 class IsClient(BasePermission):
     """Permiso que permite acceso solo a usuarios del grupo Client."""
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name="Client").exists()
+        return get_role_snapshot(request.user).is_client
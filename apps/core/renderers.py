@@ -0,0 +1,53 @@
+"""Renderers para exportaciones (CSV / NDJSON).
+
+Las vistas de exportación devuelven un `StreamingHttpResponse` y no pasan
+por `render()`; estos renderers existen para que DRF acepte
+`?format=csv|ndjson` en la negociación de contenido y para darle formato a
+las respuestas de error (401, 403, ...).
+"""
+
+# Python
+import csv
+import io
+import json
+
+# Django
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Django REST Framework
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        rows = data if isinstance(data, list) else [data]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            if isinstance(row, dict):
+                writer.writerows(row.items())
+            else:
+                writer.writerow([row])
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        rows = data if isinstance(data, list) else [data]
+        return "".join(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n" for row in rows
+        ).encode(self.charset)
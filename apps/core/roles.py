@@ -0,0 +1,120 @@
+"""Snapshot de roles y alcance del usuario autenticado."""
+
+# Django
+from django.core.cache import cache
+
+# Cache
+from core.cache import is_shared_cache
+
+# Models
+from users.models import HumanResource, ClientCompany
+
+
+ROLE_SNAPSHOT_TIMEOUT = 60 * 5
+
+
+class RoleSnapshot:
+    """Grupos y alcance (departamento / empresas) de un usuario.
+
+    Se resuelve una sola vez por request (y se cachea por usuario), así los
+    permisos y los filtros por grupo no repiten `user.groups.filter(...)`.
+    """
+
+    __slots__ = ("user_id", "groups", "department_id", "company_id", "client_company_ids")
+
+    def __init__(self, user_id=None, groups=(), department_id=None, company_id=None, client_company_ids=()):
+        self.user_id = user_id
+        self.groups = frozenset(groups)
+        self.department_id = department_id
+        self.company_id = company_id
+        self.client_company_ids = tuple(client_company_ids)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def has_group(self, name):
+        return name in self.groups
+
+    @property
+    def is_admin(self):
+        return self.has_group("Admin")
+
+    @property
+    def is_manager(self):
+        return self.has_group("Manager")
+
+    @property
+    def is_employee(self):
+        return self.has_group("Employee")
+
+    @property
+    def is_client(self):
+        return self.has_group("Client")
+
+    @property
+    def visible_company_ids(self):
+        """Empresas visibles para un cliente.
+
+        Si tiene varias empresas (`ClientCompany`) se usan esas, si no la
+        empresa de su perfil de recursos humanos.
+        """
+        if self.client_company_ids:
+            return self.client_company_ids
+        return (self.company_id,) if self.company_id else ()
+
+
+def _cache_key(user_id):
+    return f"roles:snapshot:{user_id}"
+
+
+def resolve_role_snapshot(user):
+    """Consulta la base de datos y arma el snapshot del usuario."""
+    groups = user.groups.values_list("name", flat=True)
+    profile = (
+        HumanResource.objects.filter(user_id=user.pk)
+        .values("department_id", "company_id")
+        .first()
+    ) or {}
+    client_company_ids = ClientCompany.objects.filter(
+        human_resource__user_id=user.pk
+    ).values_list("company_id", flat=True)
+
+    return RoleSnapshot(
+        user_id=user.pk,
+        groups=groups,
+        department_id=profile.get("department_id"),
+        company_id=profile.get("company_id"),
+        client_company_ids=client_company_ids,
+    )
+
+
+def get_role_snapshot(user):
+    """Devuelve el snapshot del usuario (memoizado en el objeto y en caché).
+
+    Sin caché compartida solo se memoiza en el objeto (una vez por
+    request): un cambio de grupos debe verse en todos los workers.
+    """
+    if user is None or not user.is_authenticated:
+        return RoleSnapshot()
+
+    snapshot = getattr(user, "_role_snapshot", None)
+    if snapshot is None and not is_shared_cache():
+        snapshot = user._role_snapshot = resolve_role_snapshot(user)
+    if snapshot is None:
+        key = _cache_key(user.pk)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = resolve_role_snapshot(user)
+            cache.set(key, snapshot, ROLE_SNAPSHOT_TIMEOUT)
+        user._role_snapshot = snapshot
+
+    return snapshot
+
+
+def invalidate_role_snapshot(*user_ids):
+    """Descarta los snapshots cacheados (cambio de grupos o de perfil)."""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,122 @@
+"""Utilidades compartidas para serializers de la API."""
+
+# Django
+from django.core.exceptions import FieldDoesNotExist
+
+# Django REST Framework
+from rest_framework import serializers
+
+
+def get_query_params(request, view=None):
+    """Query params de la petición o, con paginación keyset, los activos
+    (`filter_params`: los guardados en el cursor, así `next` los conserva)."""
+    params = getattr(view, "filter_params", None)
+    return params if params is not None else request.query_params
+
+
+def parse_field_tree(value):
+    """Convierte `"id,user.email,user.groups"` en un árbol de dicts.
+
+    >>> parse_field_tree("id,user.email")
+    {'id': {}, 'user': {'email': {}}}
+    """
+    tree = {}
+    for item in (value or "").split(","):
+        node = tree
+        for part in filter(None, item.strip().split(".")):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def primary_key_field_for(serializer, field_name, field):
+    """Reemplazo "solo id" de un serializer anidado (`None` si no es relación)."""
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    source = field.source if field.source != field_name else None
+    kwargs = {"source": source} if source else {}
+
+    try:
+        relation = model._meta.get_field(field.source) if model else None
+    except FieldDoesNotExist:
+        relation = None
+
+    if relation is None or not relation.is_relation:
+        return None
+
+    if relation.many_to_many or relation.one_to_many:
+        return serializers.PrimaryKeyRelatedField(many=True, read_only=True, **kwargs)
+
+    if relation.concrete:
+        return serializers.PrimaryKeyRelatedField(read_only=True, **kwargs)
+
+    # Relación inversa uno a uno (`user.human_resource`): leer el pk del objeto
+    return serializers.ReadOnlyField(source=f"{field.source}.pk")
+
+
+def apply_sparse_fieldset(serializer, fields=None, expand=None):
+    """Recorta los campos de `serializer` y colapsa relaciones a ids.
+
+    + `fields`: árbol de campos a conservar (`None` = todos).
+    + `expand`: árbol de relaciones a anidar; las que no aparecen se
+      devuelven como primary keys (`None` = dejar todo como está).
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    for name, field in list(serializer.fields.items()):
+        if fields and name not in fields:
+            serializer.fields.pop(name)
+            continue
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if not isinstance(nested, serializers.Serializer):
+            continue
+
+        # `?fields=user.email` implica anidar `user`
+        subfields = (fields or {}).get(name) or None
+        if expand is not None and name not in expand and not subfields:
+            replacement = primary_key_field_for(serializer, name, field)
+            if replacement is not None:
+                serializer.fields[name] = replacement
+            continue
+
+        apply_sparse_fieldset(
+            nested,
+            fields=subfields,
+            expand=expand.get(name, {}) if expand is not None else None,
+        )
+
+
+class SparseFieldsMixin:
+    """Soporta `?fields=` y `?expand=` en las respuestas (solo GET).
+
+    + `?fields=id,title,user.email` limita los campos (con puntos para
+      los anidados).
+    + `?expand=user,user.human_resource` indica qué relaciones se anidan;
+      el resto se devuelve como primary keys.
+
+    Sin ninguno de los dos parámetros la representación no cambia. Como
+    el plan de `EagerLoadingMixin` se deriva del serializer ya recortado,
+    solo se hacen los JOIN / prefetch de lo que se pidió.
+    """
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+        if not self.context.get("sparse_fieldsets", True):
+            return  # El llamador aplica el recorte por su cuenta (side-loading)
+
+        params = get_query_params(request, self.context.get("view"))
+        if self.fields_query_param not in params and self.expand_query_param not in params:
+            return
+
+        apply_sparse_fieldset(
+            self,
+            fields=parse_field_tree(params.get(self.fields_query_param)),
+            expand=parse_field_tree(params.get(self.expand_query_param)),
+        )
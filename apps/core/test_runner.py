@@ -0,0 +1,18 @@
+"""Runner de `manage.py test`.
+
+Las apps viven en `apps/` (agregado a `sys.path`, sin paquete `apps`), así
+que el descubrimiento por defecto desde la raíz no encuentra sus
+`tests.py`. Sin etiquetas se corren las pruebas de `LOCAL_APPS`.
+"""
+
+# Django
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class LocalAppsDiscoverRunner(DiscoverRunner):
+
+    def build_suite(self, test_labels=None, **kwargs):
+        if not test_labels:
+            test_labels = [app.split(".")[0] for app in settings.LOCAL_APPS]
+        return super().build_suite(test_labels, **kwargs)
@@ -0,0 +1,47 @@
+"""Datos de prueba compartidos por los `tests.py` de las apps."""
+
+# Django
+from django.contrib.auth.models import Group
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+# Models
+from users.models import User, HumanResource, ClientCompany
+from petitions.models import Petition
+
+
+def create_user(username, group, company, department=None, client_companies=()):
+    """Usuario verificado del grupo `group` con su recurso humano."""
+    user = User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password=None,  # Se autentican con token
+        first_name=username.title(),
+        is_verified=True,
+    )
+    user.groups.add(Group.objects.get_or_create(name=group)[0])
+    human_resource = HumanResource.objects.create(user=user, company=company, department=department)
+    for client_company in client_companies:
+        ClientCompany.objects.create(human_resource=human_resource, company=client_company)
+    return user
+
+
+def create_petition(user, company, department, **extra):
+    return Petition.objects.create(
+        title=extra.pop("title", "Petición"),
+        description=extra.pop("description", "Descripción"),
+        user=user,
+        company=company,
+        department=department,
+        **extra,
+    )
+
+
+def api_client(user):
+    """Cliente autenticado con `Authorization: Token <key>`."""
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
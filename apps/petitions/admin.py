@@ -2,7 +2,7 @@
 from django.contrib import admin
 
 # Models
-from .models import Department, Petition, Company
+from .models import Department, Petition, Company, EmailOutbox
 
 
 @admin.register(Department)
@@ -84,3 +84,11 @@ class PetitionAdmin(admin.ModelAdmin):
     )
 
     readonly_fields = ["created", "modified"]
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ["id", "to_email", "subject", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status", "created_at"]
+    search_fields = ["to_email", "subject"]
+    readonly_fields = ["notification", "locked_at", "locked_by", "last_error", "created_at", "sent_at"]
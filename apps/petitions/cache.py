@@ -0,0 +1,151 @@
+"""Caché de respuestas de la API de peticiones por alcance de rol.
+
+Cada alcance tiene un contador de generación en la caché:
+
++ `admin`: ve todas las peticiones.
++ `dept:<id>`: managers del departamento.
++ `company:<id>`: clientes de la empresa.
++ `user:<id>`: el empleado dueño de la petición.
+
+La clave de una respuesta incluye las generaciones de los alcances del
+usuario, así que invalidar es solo incrementar contadores: las entradas
+viejas dejan de leerse y expiran solas (`PETITION_CACHE_TIMEOUT`).
+
+Los `post_save` / `post_delete` de `Petition`, `Commission`, `Company` y
+`Department` (ver `petitions/signals.py`) incrementan solo los alcances
+afectados, igual que los de `User`, su perfil (`HumanResource`,
+`ClientCompany`) y sus grupos, que van anidados en `user`.
+`QuerySet.update()` no dispara señales: quien lo use debe llamar a
+`invalidate_scopes` (o esperar al timeout).
+
+Los contadores solo sirven si todos los workers leen la misma caché: con
+`LocMemCache` (sin `REDIS_URL`) las respuestas no se cachean
+(`response_cache_enabled`).
+"""
+
+# Python
+import hashlib
+import time
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Roles
+from core.roles import get_role_snapshot
+
+# Cache
+from core.cache import is_shared_cache
+
+
+ADMIN_SCOPE = "admin"
+GENERATION_KEY = "petitions:generation:{}"
+RESPONSE_KEY = "petitions:response:{}"
+
+
+def response_cache_enabled():
+    """Una invalidación en un proceso debe verse en todos (caché compartida)."""
+    return is_shared_cache()
+
+
+def get_cache_timeout():
+    return getattr(settings, "PETITION_CACHE_TIMEOUT", 60)
+
+
+def petition_scopes(department_id=None, company_id=None, user_id=None):
+    """Alcances que pueden ver una petición con esos valores."""
+    scopes = {ADMIN_SCOPE}
+    if department_id:
+        scopes.add(f"dept:{department_id}")
+    if company_id:
+        scopes.add(f"company:{company_id}")
+    if user_id:
+        scopes.add(f"user:{user_id}")
+    return scopes
+
+
+def scopes_for_user(user):
+    """Alcances cuyas peticiones ve `user` (vacío si no tiene grupo)."""
+    roles = get_role_snapshot(user)
+
+    if roles.is_admin:
+        return [ADMIN_SCOPE]
+    if roles.is_manager:
+        return [f"dept:{roles.department_id}"]
+    if roles.is_employee:
+        return [f"user:{roles.user_id}"]
+    if roles.is_client:
+        return [f"company:{company_id}" for company_id in sorted(roles.visible_company_ids)]
+    return []
+
+
+def get_generations(scopes):
+    """Generación actual de cada alcance (una sola lectura a la caché)."""
+    keys = {scope: GENERATION_KEY.format(scope) for scope in scopes}
+    values = cache.get_many(keys.values())
+
+    generations = {}
+    for scope, key in keys.items():
+        if key not in values:
+            # 🔥 Sembrar con la hora: si la caché expulsa el contador no se
+            # reutilizan generaciones viejas
+            cache.add(key, time.time_ns(), timeout=None)
+            values[key] = cache.get(key)
+        generations[scope] = values[key]
+    return generations
+
+
+def invalidate_scopes(scopes):
+    """Incrementa la generación de los alcances (al confirmar la transacción)."""
+    scopes = set(scopes)
+
+    def bump():
+        for scope in scopes:
+            key = GENERATION_KEY.format(scope)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def scopes_for_petition(petition):
+    """Alcances actuales y, si cambiaron, los que tenía al cargarse."""
+    scopes = petition_scopes(petition.department_id, petition.company_id, petition.user_id)
+    loaded = getattr(petition, "_loaded_values", {})
+    if loaded:
+        scopes |= petition_scopes(
+            loaded.get("department_id"), loaded.get("company_id"), loaded.get("user_id")
+        )
+    return scopes
+
+
+def invalidate_petition(petition):
+    invalidate_scopes(scopes_for_petition(petition))
+
+
+def invalidate_petition_batch(petitions):
+    """Para escrituras masivas (`bulk_create` / `bulk_update` no emiten señales)."""
+    scopes = set()
+    for petition in petitions:
+        scopes |= scopes_for_petition(petition)
+    invalidate_scopes(scopes)
+
+
+def invalidate_petitions(queryset):
+    """Alcances de todas las peticiones de `queryset` (nada si no hay ninguna)."""
+    scopes = set()
+    for department_id, company_id, user_id in (
+        queryset.order_by().values_list("department_id", "company_id", "user_id").distinct()
+    ):
+        scopes |= petition_scopes(department_id, company_id, user_id)
+    if scopes:
+        invalidate_scopes(scopes)
+
+
+def build_response_key(scopes, *parts):
+    """Clave de la respuesta para los alcances (con su generación) y `parts`."""
+    raw = repr([sorted(get_generations(scopes).items()), *parts]).encode()
+    return RESPONSE_KEY.format(hashlib.md5(raw).hexdigest())
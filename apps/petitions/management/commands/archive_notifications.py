@@ -0,0 +1,94 @@
+"""Archiva (o elimina) las notificaciones leídas más antiguas que la retención.
+
+Trabaja por lotes cortos, cada uno en su propia transacción, con una pausa
+entre lotes (`--sleep`) para no competir con el tráfico normal. Pensado
+para ejecutarse a diario desde cron:
+
+    python manage.py archive_notifications --days 90 --batch-size 1000 --sleep 0.5
+"""
+
+# Python
+import time
+from datetime import timedelta
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# Models
+from petitions.models import Notification
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a `notification_archive` las notificaciones leídas (y las "
+        "difusiones) más antiguas que `--days`, o las elimina con `--purge`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.NOTIFICATION_RETENTION_DAYS,
+            help="Antigüedad mínima en días (por defecto NOTIFICATION_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Eliminar en vez de archivar.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Notificaciones por lote (una transacción por lote).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Segundos de pausa entre lotes.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Detenerse después de esta cantidad de lotes.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo informa cuántas notificaciones se procesarían.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--days y --batch-size deben ser mayores a 0.")
+
+        before = timezone.now() - timedelta(days=options["days"])
+        action = "eliminadas" if options["purge"] else "archivadas"
+
+        if options["dry_run"]:
+            total = Notification.objects.expired(before).count()
+            self.stdout.write(
+                f"[dry-run] Se procesarían {total} notificaciones anteriores a {before:%Y-%m-%d %H:%M}."
+            )
+            return
+
+        total = batches = 0
+        after_id = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            count, after_id = Notification.objects.archive(
+                before, after_id, options["batch_size"], options["purge"]
+            )
+            if not count:
+                break
+            total += count
+            batches += 1
+            self.stdout.write(f"Lote {batches}: {count} {action} (hasta id {after_id}).")
+            if count < options["batch_size"]:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} notificaciones {action} en {batches} lotes."))
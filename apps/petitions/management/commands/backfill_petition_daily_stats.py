@@ -0,0 +1,61 @@
+"""Llena el resumen diario de peticiones (`petition_daily_stats`) para todo el historial."""
+
+# Python
+from datetime import timedelta
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+# Models
+from petitions.models import Petition, PetitionDailyStat
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula `petition_daily_stats` desde la primera petición (o `--since`) "
+        "hasta hoy (o `--until`), por bloques de días."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Primer día (YYYY-MM-DD).")
+        parser.add_argument("--until", help="Último día (YYYY-MM-DD). Por defecto hoy.")
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=31,
+            help="Días por transacción (por defecto 31).",
+        )
+
+    def parse_day(self, value, name):
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"--{name} debe tener el formato YYYY-MM-DD.")
+        return day
+
+    def handle(self, *args, **options):
+        petitions = Petition.objects.all()
+
+        until = self.parse_day(options["until"], "until") if options["until"] else timezone.localdate()
+        if options["since"]:
+            since = self.parse_day(options["since"], "since")
+        else:
+            first = petitions.aggregate(first=Min("created"))["first"]
+            if first is None:
+                self.stdout.write("No hay peticiones.")
+                return
+            since = timezone.localdate(first)
+
+        chunk = timedelta(days=max(options["chunk_days"], 1))
+        start, rows = since, 0
+        while start <= until:
+            end = min(start + chunk - timedelta(days=1), until)
+            rows += len(PetitionDailyStat.objects.refresh(petitions, start, end))
+            self.stdout.write(f"{start} → {end}")
+            start = end + timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Resumen diario listo: {since} → {until} ({rows} filas).")
+        )
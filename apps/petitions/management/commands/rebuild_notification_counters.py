@@ -0,0 +1,36 @@
+"""Reconstruye los contadores de notificaciones sin leer por usuario."""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from petitions.models import Notification, NotificationCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula la tabla `notification_counters` desde las notificaciones "
+        "(por si quedó desfasada por escrituras fuera del ORM)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Reparar solo este usuario (se puede repetir).",
+        )
+
+    def handle(self, *args, **options):
+        NotificationCounter.objects.rebuild(Notification.objects.all(), options["user_ids"])
+
+        counters = NotificationCounter.objects.all()
+        if options["user_ids"]:
+            counters = counters.filter(user__in=options["user_ids"])
+        total = sum(counters.values_list("unread", flat=True))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Contadores reconstruidos: {counters.count()} usuarios, {total} notificaciones sin leer."
+            )
+        )
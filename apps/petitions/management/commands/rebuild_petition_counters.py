@@ -0,0 +1,24 @@
+"""Reconstruye los contadores de peticiones por empresa, departamento, estado y prioridad."""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from petitions.models import Petition, PetitionCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula la tabla `petition_counters` desde las peticiones activas "
+        "(por si quedó desfasada por escrituras fuera del ORM)."
+    )
+
+    def handle(self, *args, **options):
+        PetitionCounter.objects.rebuild(Petition.active_objects.all())
+
+        total = sum(PetitionCounter.objects.values_list("count", flat=True))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Contadores reconstruidos: {PetitionCounter.objects.count()} filas, {total} peticiones activas."
+            )
+        )
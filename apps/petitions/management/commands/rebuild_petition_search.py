@@ -0,0 +1,24 @@
+"""Reconstruye el índice de búsqueda de texto completo de peticiones."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+# Search
+from petitions.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda (FTS5 en SQLite, tsvector en PostgreSQL)."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+
+        with transaction.atomic():
+            backend.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Índice de búsqueda reconstruido ({connection.vendor}: {type(backend).__name__})."
+            )
+        )
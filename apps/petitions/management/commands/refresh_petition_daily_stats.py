@@ -0,0 +1,38 @@
+"""Recalcula los últimos días del resumen diario de peticiones.
+
+Pensado para ejecutarse periódicamente (cron / scheduler, p. ej. cada 5
+minutos): las creaciones y los cambios de estado se registran con la hora
+actual, así que recalcular hoy y ayer alcanza para mantener el resumen al
+día. Para corregir días anteriores usar `backfill_petition_daily_stats`.
+"""
+
+# Python
+from datetime import timedelta
+
+# Django
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# Models
+from petitions.models import Petition, PetitionDailyStat
+
+
+class Command(BaseCommand):
+    help = "Recalcula los últimos `--days` días de `petition_daily_stats` (por defecto hoy y ayer)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=2,
+            help="Cantidad de días a recalcular, contando hoy (por defecto 2).",
+        )
+
+    def handle(self, *args, **options):
+        until = timezone.localdate()
+        since = until - timedelta(days=max(options["days"], 1) - 1)
+
+        rows = PetitionDailyStat.objects.refresh(Petition.objects.all(), since, until)
+        self.stdout.write(
+            self.style.SUCCESS(f"Resumen diario actualizado: {since} → {until} ({len(rows)} filas).")
+        )
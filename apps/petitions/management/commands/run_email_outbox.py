@@ -0,0 +1,96 @@
+"""Worker de la cola de correos (`email_outbox`).
+
+Se ejecuta como proceso aparte (`worker:` en el Procfile). Vacía la cola
+por lotes y, cuando no queda nada pendiente, espera un `NOTIFY` de
+PostgreSQL o `--poll-interval` segundos. Se pueden levantar varios workers:
+cada lote se reserva con `SKIP LOCKED` (o con un `UPDATE` condicional en
+motores sin soporte).
+
+En cada vuelta también encola los resúmenes de notificaciones vencidos
+(`petitions.notifications.flush_digests`).
+"""
+
+# Python
+import os
+import signal
+import socket
+import uuid
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+# Models
+from petitions.models import EmailOutbox
+
+# Outbox
+from petitions.outbox import deliver, listen, outbox_setting, wait_for_work
+
+# Notifications
+from petitions.notifications import flush_digests
+
+
+class Command(BaseCommand):
+    help = "Envía los correos pendientes de `email_outbox` con reintentos y espera exponencial."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Vacía la cola una vez y termina (útil desde cron).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=outbox_setting("BATCH_SIZE"),
+            help="Correos reservados por lote.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=outbox_setting("CONCURRENCY"),
+            help="Conexiones SMTP simultáneas (hilos) por lote.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=outbox_setting("MAX_ATTEMPTS"),
+            help="Intentos antes de marcar un correo como fallido.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=10,
+            help="Segundos de espera con la cola vacía (máximo, si hay NOTIFY).",
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stdout.write(f"Worker {worker} iniciado.")
+
+        while self.running:
+            close_old_connections()
+            # 🔥 Antes de consultar la cola: un NOTIFY posterior no se pierde
+            listening = False if options["once"] else listen()
+            digests = flush_digests()
+            if digests:
+                self.stdout.write(f"Resúmenes encolados: {digests}.")
+            rows = EmailOutbox.objects.claim(worker, options["batch_size"])
+            if rows:
+                sent, failed = deliver(rows, options["concurrency"], options["max_attempts"])
+                self.stdout.write(f"Lote: {sent} enviados, {failed} con error.")
+                continue  # 🔥 Seguir vaciando mientras haya pendientes
+
+            if options["once"]:
+                break
+            wait_for_work(options["poll_interval"], listening)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker} detenido."))
+
+    def stop(self, signum, frame):
+        """Termina después del lote en curso."""
+        self.running = False
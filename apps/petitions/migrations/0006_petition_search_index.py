@@ -0,0 +1,58 @@
+# Índice de búsqueda de texto completo para peticiones.
+#
+# SQLite: tabla virtual FTS5 `petitions_fts`.
+# PostgreSQL: columna `search_vector` (tsvector) + índice GIN.
+
+from django.db import migrations
+
+
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('spanish', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(description, '')), 'B')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS petitions_fts USING fts5("
+            "title, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO petitions_fts (rowid, title, description) "
+            "SELECT id, title, description FROM petitions"
+        )
+
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE petitions ADD COLUMN IF NOT EXISTS search_vector tsvector"
+        )
+        schema_editor.execute(f"UPDATE petitions SET search_vector = {PG_VECTOR_SQL}")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS petitions_search_vector_gin "
+            "ON petitions USING GIN (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS petitions_fts")
+
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS petitions_search_vector_gin")
+        schema_editor.execute("ALTER TABLE petitions DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("petitions", "0005_notification"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-18 12:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0006_petition_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='petition',
+            options={'ordering': ['-created']},
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at', 'id'], name='notif_recipient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'status'], name='notif_recipient_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petition',
+            index=models.Index(condition=models.Q(('active', True), ('deleted__isnull', True)), fields=['-created', 'id'], name='petitions_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petition',
+            index=models.Index(condition=models.Q(('active', True), ('deleted__isnull', True)), fields=['department', '-created'], name='petitions_active_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petition',
+            index=models.Index(condition=models.Q(('active', True), ('deleted__isnull', True)), fields=['company', '-created'], name='petitions_active_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petition',
+            index=models.Index(condition=models.Q(('active', True), ('deleted__isnull', True)), fields=['user', '-created'], name='petitions_active_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petition',
+            index=models.Index(condition=models.Q(('active', True), ('deleted__isnull', True)), fields=['status_approval', '-created'], name='petitions_active_status_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1 on 2026-10-18 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    """Cuenta las peticiones activas existentes."""
+    Petition = apps.get_model("petitions", "Petition")
+    PetitionCounter = apps.get_model("petitions", "PetitionCounter")
+
+    rows = (
+        Petition.objects.filter(active=True, deleted__isnull=True)
+        .order_by()
+        .values("company_id", "department_id", "status_approval", "priority")
+        .annotate(total=Count("id"))
+    )
+    PetitionCounter.objects.bulk_create(
+        [
+            PetitionCounter(
+                company_id=row["company_id"],
+                department_id=row["department_id"],
+                status_approval=row["status_approval"],
+                priority=row["priority"],
+                count=row["total"],
+            )
+            for row in rows
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0007_alter_petition_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PetitionCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_approval', models.CharField(max_length=2)),
+                ('priority', models.CharField(max_length=2)),
+                ('count', models.IntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='petition_counters', to='petitions.company')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='petition_counters', to='petitions.department')),
+            ],
+            options={
+                'db_table': 'petition_counters',
+                'constraints': [models.UniqueConstraint(fields=('company', 'department', 'status_approval', 'priority'), name='petition_counters_unique_key')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1 on 2026-10-18 12:30
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_status_changed(apps, schema_editor):
+    """Sin historial: se toma `modified` como fecha del último cambio de estado."""
+    Petition = apps.get_model("petitions", "Petition")
+    Petition.objects.exclude(status_approval="WT").update(status_changed=F("modified"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0008_petition_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petition',
+            name='status_changed',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Momento en que la petición llegó a su `status_approval` actual', null=True, verbose_name='último cambio de estado'),
+        ),
+        migrations.CreateModel(
+            name='PetitionDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('done', models.PositiveIntegerField(default=0)),
+                ('hours', models.DurationField(default=datetime.timedelta)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='petitions.company')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='petitions.department')),
+            ],
+            options={
+                'db_table': 'petition_daily_stats',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='petition_daily_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'company', 'department'), name='petition_daily_stats_unique_day')],
+            },
+        ),
+        migrations.RunPython(backfill_status_changed, migrations.RunPython.noop),
+    ]
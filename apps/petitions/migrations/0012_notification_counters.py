@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-18 12:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    """Cuenta las notificaciones sin leer existentes."""
+    Notification = apps.get_model("petitions", "Notification")
+    NotificationCounter = apps.get_model("petitions", "NotificationCounter")
+
+    rows = (
+        Notification.objects.filter(status="unread")
+        .order_by()
+        .values("recipient_id")
+        .annotate(total=Count("id"))
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row["recipient_id"], unread=row["total"]) for row in rows]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0010_email_outbox'),
+        ('users', '0004_humanresource_hr_department_user_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'notification_counters',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
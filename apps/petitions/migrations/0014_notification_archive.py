@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-18 12:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0013_broadcast_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('audience', models.CharField(blank=True, default='', max_length=50)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('petition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to='petitions.petition')),
+                ('recipient', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notification_archive',
+                'indexes': [models.Index(fields=['recipient', '-created_at', 'id'], name='notif_archive_recipient_idx'), models.Index(condition=models.Q(('recipient__isnull', True)), fields=['audience', '-created_at', 'id'], name='notif_archive_audience_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1 on 2026-10-18 12:48
+
+import django.db.models.deletion
+import petitions.models.notification_preference_model
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0014_notification_archive'),
+        ('users', '0004_humanresource_hr_department_user_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='event_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='NotificationPreference',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_preference', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('email_frequency', models.CharField(choices=[('immediate', 'Inmediato'), ('digest', 'Resumen'), ('off', 'Sin correo')], default='immediate', max_length=10)),
+                ('digest_interval', models.PositiveIntegerField(default=petitions.models.notification_preference_model.default_digest_interval)),
+                ('next_digest_at', models.DateTimeField(blank=True, null=True)),
+                ('last_digest_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'notification_preferences',
+                'indexes': [models.Index(fields=['next_digest_at'], name='notif_pref_next_digest_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationDigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_items', to='petitions.notification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_digest_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notification_digest_items',
+                'constraints': [models.UniqueConstraint(fields=('user', 'notification'), name='notification_digest_items_unique_user')],
+            },
+        ),
+    ]
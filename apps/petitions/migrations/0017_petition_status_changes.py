@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-18 13:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_status_changes(apps, schema_editor):
+    """Sin historial previo: una transición por petición, al estado actual."""
+    Petition = apps.get_model("petitions", "Petition")
+    PetitionStatusChange = apps.get_model("petitions", "PetitionStatusChange")
+    petitions = Petition.objects.filter(status_changed__isnull=False).values_list(
+        "id", "status_approval", "status_changed"
+    )
+    PetitionStatusChange.objects.bulk_create(
+        (
+            PetitionStatusChange(petition_id=pk, status_approval=status, changed_at=changed_at)
+            for pk, status, changed_at in petitions.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0016_notification_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PetitionStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_approval', models.CharField(max_length=2)),
+                ('changed_at', models.DateTimeField()),
+                ('petition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='petitions.petition')),
+            ],
+            options={
+                'db_table': 'petition_status_changes',
+                'ordering': ['-changed_at'],
+                'indexes': [models.Index(fields=['changed_at'], name='petition_status_changed_idx')],
+            },
+        ),
+        migrations.RunPython(seed_status_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-18 13:30
+#
+# `search_vector` y su índice GIN ya existen en PostgreSQL (0006, SQL directo):
+# aquí solo pasan al estado del modelo. En los demás motores se agrega la
+# columna (vacía) para que el modelo coincida con la tabla.
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def add_search_vector_column(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.execute("ALTER TABLE petitions ADD COLUMN search_vector text NULL")
+
+
+def drop_search_vector_column(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.execute("ALTER TABLE petitions DROP COLUMN search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0017_petition_status_changes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='petition',
+                    name='search_vector',
+                    field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+                ),
+                migrations.AddIndex(
+                    model_name='petition',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='petitions_search_vector_gin'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_vector_column, drop_search_vector_column),
+            ],
+        ),
+    ]
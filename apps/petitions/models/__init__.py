@@ -2,4 +2,12 @@ from .petition_model import Petition
 from .petition_attachment_model import PetitionsAttachment
 from .department_model import Department
 from .company_model import Company
-from .notification_model import Notification
\ No newline at end of file
+from .notification_model import Notification
+from .petition_counter_model import PetitionCounter
+from .petition_daily_stat_model import PetitionDailyStat
+from .petition_status_change_model import PetitionStatusChange
+from .email_outbox_model import EmailOutbox
+from .notification_counter_model import NotificationCounter
+from .notification_receipt_model import NotificationReceipt
+from .notification_archive_model import NotificationArchive
+from .notification_preference_model import NotificationPreference, NotificationDigestItem
@@ -0,0 +1,150 @@
+"""Email outbox model."""
+
+# Python
+from datetime import timedelta
+
+# Django
+from django.db import connection, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+# Models
+from .notification_model import Notification
+
+
+class EmailOutboxManager(models.Manager):
+
+    def enqueue(self, rows):
+        """Inserta `rows` (sin guardar) y despierta al worker al confirmar.
+
+        Se escribe en la misma transacción que las notificaciones: si la
+        transacción se revierte, no queda ningún correo pendiente.
+        """
+        rows = self.bulk_create(rows)
+        if rows:
+            # Import diferido: `petitions.outbox` importa este modelo
+            from petitions.outbox import wake_worker
+
+            transaction.on_commit(wake_worker)
+        return rows
+
+    def claimable(self, now, stale_after):
+        """Pendientes vencidos y envíos abandonados por un worker caído."""
+        return self.filter(
+            Q(status=self.model.Status.PENDING, next_attempt_at__lte=now)
+            | Q(status=self.model.Status.SENDING, locked_at__lt=now - stale_after)
+        )
+
+    def claim(self, worker, batch_size, stale_after=timedelta(minutes=10)):
+        """Reserva hasta `batch_size` correos para `worker` y los devuelve.
+
+        En PostgreSQL las filas se bloquean con `SKIP LOCKED`, así varios
+        workers reparten la cola sin esperarse. En el resto de motores el
+        `UPDATE` vuelve a comprobar la condición, de modo que una fila
+        nunca queda reservada por dos workers.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            candidates = self.claimable(now, stale_after).order_by("next_attempt_at", "id")
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            ids = list(candidates.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return []
+
+            self.claimable(now, stale_after).filter(id__in=ids).update(
+                status=self.model.Status.SENDING,
+                locked_at=now,
+                locked_by=worker,
+                attempts=F("attempts") + 1,
+            )
+        return list(
+            self.filter(id__in=ids, status=self.model.Status.SENDING, locked_by=worker)
+            .order_by("id")
+        )
+
+    def mark_sent(self, rows):
+        self.filter(id__in=[row.id for row in rows]).update(
+            status=self.model.Status.SENT,
+            sent_at=timezone.now(),
+            locked_at=None,
+            locked_by="",
+            last_error="",
+        )
+
+    def mark_failed(self, failures, max_attempts, backoff):
+        """Reprograma cada fallo (`[(row, error), ...]`) o lo da por perdido.
+
+        `backoff(attempts)` devuelve la espera (segundos) hasta el siguiente
+        intento.
+        """
+        now = timezone.now()
+        rows = []
+        for row, error in failures:
+            if row.attempts >= max_attempts:
+                row.status = self.model.Status.FAILED
+            else:
+                row.status = self.model.Status.PENDING
+                row.next_attempt_at = now + timedelta(seconds=backoff(row.attempts))
+            row.last_error = str(error)[:1000]
+            row.locked_at = None
+            row.locked_by = ""
+            rows.append(row)
+
+        self.bulk_update(
+            rows, ["status", "next_attempt_at", "last_error", "locked_at", "locked_by"]
+        )
+
+
+class EmailOutbox(models.Model):
+    """Correo pendiente de envío (patrón outbox transaccional).
+
+    Las notificaciones no abren conexiones SMTP durante la petición HTTP:
+    se guarda el correo ya renderizado y `manage.py run_email_outbox` lo
+    envía en segundo plano con reintentos.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pendiente"
+        SENDING = "sending", "Enviando"
+        SENT = "sent", "Enviado"
+        FAILED = "failed", "Fallido"
+
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="emails",
+    )
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = EmailOutboxManager()
+
+    class Meta:
+        db_table = "email_outbox"
+        indexes = [
+            # Cola del worker (`status`, vencimiento)
+            models.Index(
+                fields=["status", "next_attempt_at", "id"],
+                name="outbox_status_next_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email}: {self.subject} ({self.status})"
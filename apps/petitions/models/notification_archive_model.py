@@ -0,0 +1,67 @@
+"""Notification archive model."""
+
+# Django
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import Q
+
+User = get_user_model()
+
+
+class NotificationArchiveManager(models.Manager):
+
+    def for_user(self, user):
+        """Archivadas del usuario: directas + difusiones de sus audiencias."""
+        from petitions.models import Notification
+
+        return self.filter(
+            Q(recipient_id=user.pk)
+            | Q(recipient__isnull=True, audience__in=Notification.objects.audiences_for(user))
+        )
+
+
+class NotificationArchive(models.Model):
+    """Notificaciones sacadas de la tabla principal por antigüedad.
+
+    Las mueve `manage.py archive_notifications` (ver
+    `Notification.objects.archive`) para que `notifications` y sus índices
+    por destinatario y estado se mantengan chicos. Conserva el `id`
+    original. Todas cuentan como leídas: solo se archivan directas leídas y
+    difusiones vencidas. Se consultan aparte (`/notifications/archive/`).
+    """
+
+    id = models.BigIntegerField(primary_key=True)  # Mismo id que en `notifications`
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+        null=True,
+        blank=True,
+    )
+    audience = models.CharField(max_length=50, blank=True, default="")
+    petition = models.ForeignKey(
+        "petitions.Petition", on_delete=models.CASCADE, related_name="archived_notifications"
+    )
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = NotificationArchiveManager()
+
+    class Meta:
+        db_table = "notification_archive"
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created_at", "id"],
+                name="notif_archive_recipient_idx",
+            ),
+            models.Index(
+                fields=["audience", "-created_at", "id"],
+                name="notif_archive_audience_idx",
+                condition=Q(recipient__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        target = self.recipient_id or self.audience
+        return f"Notificación archivada para {target}: {self.message}"
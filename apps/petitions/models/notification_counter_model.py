@@ -0,0 +1,120 @@
+"""Notification counters model."""
+
+# Python
+from collections import Counter, defaultdict
+
+# Django
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+
+User = get_user_model()
+
+
+class NotificationCounterManager(models.Manager):
+
+    batch_size = 500
+
+    def apply_deltas(self, deltas):
+        """Suma `deltas` (`{user_id: +n / -n}`) con un `UPDATE` por valor de delta.
+
+        Una difusión a N usuarios suma `+1` a todos: es un solo `UPDATE ...
+        WHERE user_id IN (...)` (por lote de `batch_size`), no uno por usuario.
+        """
+        groups = defaultdict(list)
+        for user_id, delta in deltas.items():
+            if delta:
+                groups[delta].append(user_id)
+
+        for delta, user_ids in sorted(groups.items()):
+            user_ids.sort()  # 🔥 Mismo orden de bloqueo en transacciones concurrentes
+            for start in range(0, len(user_ids), self.batch_size):
+                batch = user_ids[start : start + self.batch_size]
+                if delta > 0:
+                    # 🔥 Filas faltantes en cero (ignora las que otra transacción ya creó)
+                    self.bulk_create([self.model(user_id=user_id) for user_id in batch], ignore_conflicts=True)
+                # Sin fila no hay nada que descontar (p. ej. usuario eliminado)
+                self.filter(user_id__in=batch).update(unread=F("unread") + delta)
+
+    def increment(self, user_ids):
+        """Una notificación no leída más por cada aparición en `user_ids`."""
+        self.apply_deltas(Counter(user_ids))
+
+    def mark_all_read(self, user_id, read_at):
+        """Deja en cero a `user_id` y mueve `broadcasts_read_at`. Devuelve cuántas había."""
+        with transaction.atomic():
+            counter = self.select_for_update().filter(user_id=user_id).first()
+            if counter is None:
+                try:
+                    with transaction.atomic():
+                        self.create(user_id=user_id, broadcasts_read_at=read_at)
+                    return 0
+                except IntegrityError:
+                    return self.mark_all_read(user_id, read_at)  # 🔥 Otra transacción creó la fila
+
+            unread = max(counter.unread, 0)
+            counter.unread = 0
+            counter.broadcasts_read_at = read_at
+            counter.save(update_fields=["unread", "broadcasts_read_at"])
+        return unread
+
+    def rebuild(self, notifications, user_ids=None):
+        """Recalcula los contadores desde `notifications` (todos o `user_ids`).
+
+        Las directas salen de un solo `GROUP BY`; las difusiones se cuentan
+        usuario por usuario (`Notification.objects.unread_broadcasts`), así
+        que es una reparación, no algo para el camino de una request.
+        """
+        from petitions.models import Notification
+
+        unread = notifications.filter(status=Notification.Status.UNREAD, recipient__isnull=False)
+        counters = self.all()
+        users = User.objects.filter(human_resource__isnull=False)  # Solo ellos reciben difusiones
+        if user_ids is not None:
+            unread = unread.filter(recipient__in=user_ids)
+            counters = counters.filter(user__in=user_ids)
+            users = users.filter(pk__in=user_ids)
+
+        rows = unread.order_by().values("recipient").annotate(total=Count("id"))
+        with transaction.atomic():
+            counters.update(unread=0)  # 🔥 Conserva `broadcasts_read_at`
+            self.bulk_create(
+                [self.model(user_id=row["recipient"], unread=row["total"]) for row in rows],
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=["unread"],
+            )
+            self.apply_deltas(
+                {user.pk: Notification.objects.unread_broadcasts(user).count() for user in users.iterator()}
+            )
+
+
+class NotificationCounter(models.Model):
+    """Notificaciones no leídas por usuario.
+
+    Cuenta directas y difusiones. Se mantiene al crear notificaciones
+    (`Notification.objects.bulk_create` las directas, `notify_petitions` una
+    por destinatario de cada difusión), al marcarlas como leídas
+    (`Notification.objects.mark_read`, `Notification.save`) y al
+    eliminarlas (ver `petitions/signals.py`). Se reconstruye con
+    `manage.py rebuild_notification_counters`. Así el contador de la UI
+    lee una fila por clave primaria en vez de contar `Notification`.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread = models.IntegerField(default=0)
+    # Difusiones creadas hasta aquí cuentan como leídas (`null`: `date_joined`)
+    broadcasts_read_at = models.DateTimeField(null=True, blank=True)
+
+    objects = NotificationCounterManager()
+
+    class Meta:
+        db_table = "notification_counters"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread}"
@@ -1,19 +1,244 @@
-from django.db import models
+from collections import Counter, defaultdict
+
+from django.db import models, transaction
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, Value, When
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from petitions.models import Petition
+from .notification_archive_model import NotificationArchive
+from .notification_counter_model import NotificationCounter
+from .notification_receipt_model import NotificationReceipt
 
 User = get_user_model()
 
+
+class NotificationManager(models.Manager):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Inserta y suma las directas no leídas a `NotificationCounter`."""
+        with transaction.atomic():
+            objs = super().bulk_create(objs, *args, **kwargs)
+            NotificationCounter.objects.increment(
+                obj.recipient_id
+                for obj in objs
+                if obj.recipient_id is not None and obj.status == Notification.Status.UNREAD
+            )
+        return objs
+
+    # Difusiones
+
+    def audiences_for(self, user):
+        """Audiencias de difusión del usuario (mismos alcances que la caché)."""
+        from petitions.cache import scopes_for_user
+
+        return [scope for scope in scopes_for_user(user) if not scope.startswith("user:")]
+
+    def broadcasts_read_at(self, user):
+        read_at = (
+            NotificationCounter.objects.filter(user_id=user.pk)
+            .values_list("broadcasts_read_at", flat=True)
+            .first()
+        )
+        return read_at or user.date_joined
+
+    def receipts_for(self, user):
+        return NotificationReceipt.objects.filter(notification=OuterRef("pk"), user_id=user.pk)
+
+    def unread_broadcasts(self, user, read_at=None):
+        """Difusiones de las audiencias del usuario que todavía no leyó."""
+        read_at = read_at or self.broadcasts_read_at(user)
+        return self.filter(
+            recipient__isnull=True,
+            audience__in=self.audiences_for(user),
+            created_at__gt=read_at,
+        ).exclude(Exists(self.receipts_for(user)))
+
+    def audience_members(self, audiences):
+        """`{audience: {user_id, ...}}`: quienes reciben hoy las difusiones de `audiences`."""
+        from petitions.notifications import query_recipients
+
+        pairs = {(None, None)}  # Siempre trae a los admins
+        for audience in audiences:
+            kind, _, value = audience.partition(":")
+            if kind == "dept":
+                pairs.add((int(value), None))
+            elif kind == "company":
+                pairs.add((None, int(value)))
+
+        members = defaultdict(set)
+        for recipients in query_recipients(pairs).values():
+            for recipient in recipients:
+                members[recipient.audience].add(recipient.id)
+        return members
+
+    def read_by(self, broadcasts, user_ids):
+        """`{(user_id, id), ...}` de `broadcasts` (`(id, audience, created_at)`) que
+        `user_ids` ya leyeron (recibo o `broadcasts_read_at` / `date_joined`)."""
+        read_at = dict(User.objects.filter(pk__in=user_ids).values_list("pk", "date_joined"))
+        read_at.update(
+            NotificationCounter.objects.filter(user_id__in=user_ids, broadcasts_read_at__isnull=False)
+            .values_list("user_id", "broadcasts_read_at")
+        )
+        read = set(
+            NotificationReceipt.objects.filter(
+                notification__in=[pk for pk, _, _ in broadcasts], user_id__in=user_ids
+            ).values_list("user_id", "notification_id")
+        )
+        for pk, _, created_at in broadcasts:
+            read.update((user_id, pk) for user_id, at in read_at.items() if created_at <= at)
+        return read
+
+    def unread_deltas(self, broadcasts):
+        """`{user_id: -n}` para descontar `broadcasts` (`(id, audience, created_at)`) de
+        `NotificationCounter` en quienes todavía no las leyeron."""
+        broadcasts = list(broadcasts)
+        if not broadcasts:
+            return {}
+
+        members = self.audience_members({audience for _, audience, _ in broadcasts})
+        read = self.read_by(broadcasts, set().union(*members.values()))
+
+        deltas = Counter()
+        for pk, audience, _ in broadcasts:
+            for user_id in members.get(audience, ()):
+                if (user_id, pk) not in read:
+                    deltas[user_id] -= 1
+        return deltas
+
+    def inbox(self, user):
+        """Notificaciones directas + difusiones de sus audiencias (un solo query).
+
+        `inbox_status` es el estado para este usuario: el de la fila en las
+        directas; en las difusiones, según `broadcasts_read_at` y los recibos.
+        """
+        read_at = self.broadcasts_read_at(user)
+        return self.filter(
+            Q(recipient_id=user.pk)
+            | Q(recipient__isnull=True, audience__in=self.audiences_for(user))
+        ).annotate(
+            inbox_status=Case(
+                When(recipient__isnull=False, then=F("status")),
+                When(
+                    Q(created_at__lte=read_at) | Exists(self.receipts_for(user)),
+                    then=Value(Notification.Status.READ),
+                ),
+                default=Value(Notification.Status.UNREAD),
+                output_field=CharField(),
+            )
+        )
+
+    def unread_count(self, user):
+        """Directas + difusiones sin leer: una fila de `NotificationCounter` por clave primaria."""
+        unread = (
+            NotificationCounter.objects.filter(user_id=user.pk).values_list("unread", flat=True).first()
+        )
+        return max(unread or 0, 0)
+
+    def mark_read(self, user, ids=None):
+        """Marca como leídas las no leídas de `user` (todas o `ids`).
+
+        + Directas: un solo `UPDATE`.
+        + Difusiones: con `ids`, un recibo por notificación; sin `ids`, se
+          mueve `broadcasts_read_at` a ahora y se descartan los recibos.
+
+        `NotificationCounter` se descuenta en la misma transacción (sin
+        `ids` queda en cero). Devuelve la cantidad de notificaciones que
+        cambiaron.
+        """
+        direct = self.filter(recipient_id=user.pk, status=Notification.Status.UNREAD)
+
+        with transaction.atomic():
+            if ids is None:
+                direct.update(status=Notification.Status.READ)
+                NotificationReceipt.objects.filter(user_id=user.pk).delete()
+                # 🔥 Sin contar el historial: lo que había en el contador
+                return NotificationCounter.objects.mark_all_read(user.pk, timezone.now())
+
+            updated = direct.filter(id__in=ids).update(status=Notification.Status.READ)
+            pending = list(self.unread_broadcasts(user).filter(id__in=ids).values_list("id", flat=True))
+            NotificationReceipt.objects.bulk_create(
+                [NotificationReceipt(notification_id=pk, user_id=user.pk) for pk in pending],
+                ignore_conflicts=True,
+            )
+            updated += len(pending)
+            NotificationCounter.objects.apply_deltas({user.pk: -updated})
+        return updated
+
+    # Agrupación
+
+    def coalescible(self, petition_ids, since):
+        """Difusiones desde `since` que un nuevo evento de la misma petición absorbe."""
+        return (
+            self.filter(recipient__isnull=True, petition_id__in=petition_ids, created_at__gte=since)
+            .order_by("created_at")
+            .select_for_update()
+        )
+
+    # Retención
+
+    def expired(self, before):
+        """Candidatas a archivar: directas leídas y difusiones creadas antes de `before`.
+
+        Las directas sin leer se conservan (cuentan en `NotificationCounter`).
+        """
+        return self.filter(created_at__lt=before).filter(
+            Q(recipient__isnull=True) | Q(status=Notification.Status.READ)
+        )
+
+    def archive(self, before, after_id=0, batch_size=1000, purge=False):
+        """Mueve a `NotificationArchive` (o con `purge` elimina) un lote de `expired`.
+
+        Recorre por `id > after_id` para no volver a leer las que se
+        conservan. Devuelve `(cantidad, último id)`.
+        """
+        with transaction.atomic():
+            rows = list(
+                self.expired(before)
+                .filter(id__gt=after_id)
+                .order_by("id")
+                .select_for_update()  # 🔥 Que nadie la marque como no leída mientras tanto
+                .values("id", "recipient_id", "audience", "petition_id", "message", "created_at")[
+                    :batch_size
+                ]
+            )
+            if not rows:
+                return 0, after_id
+
+            if not purge:
+                NotificationArchive.objects.bulk_create(
+                    [NotificationArchive(**row) for row in rows], ignore_conflicts=True
+                )
+            # 🔥 Difusiones sin leer: un solo descuento por lote, no uno por fila
+            NotificationCounter.objects.apply_deltas(
+                self.unread_deltas(
+                    (row["id"], row["audience"], row["created_at"])
+                    for row in rows
+                    if row["recipient_id"] is None
+                )
+            )
+            doomed = self.filter(id__in=[row["id"] for row in rows])
+            doomed.counters_applied = True  # Ver `petitions.signals.discount_broadcast`
+            doomed.delete()  # Recibos en cascada
+        return len(rows), rows[-1]["id"]
+
+
 class Notification(models.Model):
-    """Modelo para gestionar notificaciones."""
+    """Modelo para gestionar notificaciones.
+
+    + Directa: `recipient` es el usuario y `status` su estado.
+    + Difusión: sin `recipient`, con `audience` (`admin`, `dept:<id>`,
+      `company:<id>`); se guarda una vez por evento y audiencia y cada
+      usuario la ve según sus alcances al leer (ver `NotificationManager.inbox`).
+    """
 
     class Status(models.TextChoices):
         UNREAD = "unread", "No Leída"
         READ = "read", "Leída"
 
     recipient = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="notifications"
+        User, on_delete=models.CASCADE, related_name="notifications", null=True, blank=True
     )
+    audience = models.CharField(max_length=50, blank=True, default="")
     petition = models.ForeignKey(
         Petition, on_delete=models.CASCADE, related_name="notifications"
     )
@@ -21,7 +246,54 @@ class Notification(models.Model):
     status = models.CharField(
         max_length=10, choices=Status.choices, default=Status.UNREAD
     )
+    event_count = models.PositiveIntegerField(default=1)  # Eventos agrupados (ver `coalescible`)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = NotificationManager()
+
+    class Meta:
+        indexes = [
+            # Bandeja del usuario (`recipient`, más recientes primero)
+            models.Index(
+                fields=["recipient", "-created_at", "id"],
+                name="notif_recipient_created_idx",
+            ),
+            # Conteo de no leídas
+            models.Index(
+                fields=["recipient", "status"], name="notif_recipient_status_idx"
+            ),
+            # Sondeo del stream SSE (`petitions/stream.py`) y retención
+            models.Index(fields=["created_at", "id"], name="notif_created_idx"),
+            # Difusiones por audiencia (más recientes primero)
+            models.Index(
+                fields=["audience", "-created_at", "id"],
+                name="notif_audience_created_idx",
+                condition=Q(recipient__isnull=True),
+            ),
+        ]
+
     def __str__(self):
-        return f"Notificación para {self.recipient.email}: {self.message}"
\ No newline at end of file
+        target = self.recipient.email if self.recipient_id else self.audience
+        return f"Notificación para {target}: {self.message}"
+
+    def save(self, *args, **kwargs):
+        """Guarda y ajusta `NotificationCounter` en la misma transacción."""
+        was_unread = False
+        if self.pk is not None:
+            loaded = None if self._state.adding else getattr(self, "_loaded_status", None)
+            if loaded is None:  # 🔥 Campo diferido o instancia armada a mano (`pk=...`)
+                loaded = type(self).objects.filter(pk=self.pk).values_list("status", flat=True).first()
+            was_unread = loaded == self.Status.UNREAD
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.recipient_id is not None:  # Las difusiones no cuentan aquí
+                delta = int(self.status == self.Status.UNREAD) - int(was_unread)
+                NotificationCounter.objects.apply_deltas({self.recipient_id: delta})
+        self._loaded_status = self.status
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""Notification preferences model."""
+
+# Python
+from datetime import timedelta
+
+# Django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class NotificationPreferenceManager(models.Manager):
+
+    def for_users(self, user_ids):
+        """`{user_id: NotificationPreference}`; los que no tienen fila reciben al instante."""
+        return {preference.user_id: preference for preference in self.filter(user_id__in=user_ids)}
+
+    def schedule_digests(self, preferences):
+        """Programa el próximo resumen de quienes no tenían uno pendiente."""
+        now = timezone.now()
+        by_interval = {}
+        for preference in preferences:
+            by_interval.setdefault(preference.digest_interval, []).append(preference.user_id)
+        for interval, user_ids in by_interval.items():
+            self.filter(user_id__in=user_ids, next_digest_at__isnull=True).update(
+                next_digest_at=now + timedelta(minutes=interval)
+            )
+
+    def due(self, now=None):
+        """Resúmenes vencidos (aunque el usuario haya vuelto a `immediate`)."""
+        return self.filter(next_digest_at__lte=now or timezone.now())
+
+
+def default_digest_interval():
+    return settings.NOTIFICATION_DIGEST_INTERVAL
+
+
+class NotificationPreference(models.Model):
+    """Cómo recibe el usuario los correos de notificaciones.
+
+    + `immediate`: un correo por notificación (por defecto, también sin fila).
+    + `digest`: las notificaciones se juntan en `NotificationDigestItem` y se
+      envía un solo correo cada `digest_interval` minutos (ver
+      `petitions.notifications.flush_digests`).
+    + `off`: solo la bandeja, sin correo.
+    """
+
+    class EmailFrequency(models.TextChoices):
+        IMMEDIATE = "immediate", "Inmediato"
+        DIGEST = "digest", "Resumen"
+        OFF = "off", "Sin correo"
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_preference",
+    )
+    email_frequency = models.CharField(
+        max_length=10, choices=EmailFrequency.choices, default=EmailFrequency.IMMEDIATE
+    )
+    digest_interval = models.PositiveIntegerField(default=default_digest_interval)  # Minutos
+    next_digest_at = models.DateTimeField(null=True, blank=True)  # `null`: nada pendiente
+    last_digest_at = models.DateTimeField(null=True, blank=True)
+
+    objects = NotificationPreferenceManager()
+
+    class Meta:
+        db_table = "notification_preferences"
+        indexes = [
+            models.Index(fields=["next_digest_at"], name="notif_pref_next_digest_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.email_frequency}"
+
+
+class NotificationDigestItem(models.Model):
+    """Notificación pendiente de incluir en el próximo resumen del usuario."""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notification_digest_items"
+    )
+    notification = models.ForeignKey(
+        "petitions.Notification", on_delete=models.CASCADE, related_name="digest_items"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "notification_digest_items"
+        constraints = [
+            # 🔥 Una notificación agrupada aparece una sola vez en el resumen
+            models.UniqueConstraint(
+                fields=["user", "notification"], name="notification_digest_items_unique_user"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.notification_id}"
@@ -0,0 +1,34 @@
+"""Notification receipts model."""
+
+# Django
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class NotificationReceipt(models.Model):
+    """Lectura de una notificación de difusión por un usuario.
+
+    Solo se guardan las lecturas individuales posteriores a la última vez
+    que el usuario marcó todo como leído (`NotificationCounter.broadcasts_read_at`).
+    """
+
+    notification = models.ForeignKey(
+        "petitions.Notification", on_delete=models.CASCADE, related_name="receipts"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notification_receipts"
+    )
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "notification_receipts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "notification"], name="notification_receipts_unique_user"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} leyó {self.notification_id}"
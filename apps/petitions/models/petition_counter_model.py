@@ -0,0 +1,126 @@
+"""Petition counters model."""
+
+# Python
+from collections import Counter
+
+# Django
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Sum
+
+# Models
+from .department_model import Department
+from .company_model import Company
+
+
+COUNTER_FIELDS = ("company_id", "department_id", "status_approval", "priority")
+
+
+def counter_key(values):
+    """Clave del contador para los valores de una petición (`None` si no cuenta).
+
+    Solo cuentan las filas de `active_objects` (activas y sin `deleted`).
+    """
+    if not values.get("active") or values.get("deleted") is not None:
+        return None
+    return tuple(values[name] for name in COUNTER_FIELDS)
+
+
+class PetitionCounterManager(models.Manager):
+
+    def apply_deltas(self, deltas):
+        """Suma `deltas` (`{clave: +n / -n}`) con `UPDATE count = count + n`."""
+        for key, delta in deltas.items():
+            if key is None or not delta:
+                continue
+
+            lookup = dict(zip(COUNTER_FIELDS, key))
+            if self.filter(**lookup).update(count=F("count") + delta):
+                continue
+
+            try:
+                with transaction.atomic():
+                    self.create(**lookup, count=delta)
+            except IntegrityError:
+                # 🔥 Otra transacción creó la fila primero
+                self.filter(**lookup).update(count=F("count") + delta)
+
+    def apply_changes(self, petitions):
+        """Aplica el cambio de cada petición respecto a sus valores al cargarse.
+
+        `_loaded_values` debe reflejar la fila antes de escribir (ver
+        `Petition.previous_values`); las peticiones nuevas (`{}`) solo suman.
+        """
+        deltas = Counter()
+        for petition in petitions:
+            loaded = petition._loaded_values
+            # 🔥 Los campos diferidos no se guardan: conservan el valor cargado
+            current = {**loaded, **petition.__dict__}
+            deltas[counter_key(loaded)] -= 1
+            deltas[counter_key(current)] += 1
+        self.apply_deltas(deltas)
+
+    def summary(self, **filters):
+        """Total y conteos por estado / prioridad de las filas filtradas."""
+        by_status, by_priority = Counter(), Counter()
+        for status_approval, priority, count in self.filter(**filters).values_list(
+            "status_approval", "priority", "count"
+        ):
+            by_status[status_approval] += count
+            by_priority[priority] += count
+
+        return {
+            "total": sum(by_status.values()),
+            "by_status": dict(by_status),
+            "by_priority": dict(by_priority),
+        }
+
+    def total(self, **filters):
+        return self.filter(**filters).aggregate(total=Sum("count"))["total"] or 0
+
+    def rebuild(self, queryset):
+        """Recalcula todos los contadores desde `queryset` (peticiones activas)."""
+        rows = (
+            queryset.order_by()
+            .values(*COUNTER_FIELDS)
+            .annotate(total=Count("id"))
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                [
+                    self.model(**{name: row[name] for name in COUNTER_FIELDS}, count=row["total"])
+                    for row in rows
+                ]
+            )
+
+
+class PetitionCounter(models.Model):
+    """Cantidad de peticiones activas por empresa, departamento, estado y prioridad.
+
+    Se mantiene de forma incremental al guardar / eliminar peticiones (ver
+    `Petition.save`) y se reconstruye con `manage.py rebuild_petition_counters`.
+    Así los conteos del listado, el dashboard y `/api/v1/stats/petitions/`
+    leen unas pocas filas en vez de recorrer `petitions`.
+    """
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="petition_counters")
+    department = models.ForeignKey(
+        Department, on_delete=models.CASCADE, related_name="petition_counters"
+    )
+    status_approval = models.CharField(max_length=2)
+    priority = models.CharField(max_length=2)
+    count = models.IntegerField(default=0)
+
+    objects = PetitionCounterManager()
+
+    class Meta:
+        db_table = "petition_counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "department", "status_approval", "priority"],
+                name="petition_counters_unique_key",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.company_id}/{self.department_id}/{self.status_approval}/{self.priority}: {self.count}"
@@ -0,0 +1,139 @@
+"""Petition daily stats model."""
+
+# Python
+from datetime import timedelta
+
+# Django
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+# Models
+from .department_model import Department
+from .company_model import Company
+from .petition_status_change_model import PetitionStatusChange
+
+
+# Estados de aprobación que se cuentan el día de cada transición a ellos
+STATUS_COLUMNS = {"AP": "approved", "NP": "rejected", "DN": "done"}
+METRICS = ("created", "approved", "rejected", "done", "hours")
+
+
+class PetitionDailyStatManager(models.Manager):
+
+    def compute(self, petitions, start, end):
+        """Filas (sin guardar) de los días `start`..`end` a partir de `petitions`.
+
+        + `created`: peticiones creadas ese día.
+        + `approved` / `rejected` / `done`: transiciones a ese estado
+          registradas ese día en `PetitionStatusChange` (una petición
+          aprobada el lunes y finalizada el miércoles cuenta en los dos días).
+        + `hours`: horas de las peticiones finalizadas ese día.
+        """
+        rows = {}
+
+        def row(day, company_id, department_id):
+            key = (day, company_id, department_id)
+            if key not in rows:
+                rows[key] = self.model(day=day, company_id=company_id, department_id=department_id)
+            return rows[key]
+
+        created = (
+            petitions.filter(created__date__range=(start, end))
+            .order_by()
+            .annotate(day=TruncDate("created"))
+            .values("day", "company_id", "department_id")
+            .annotate(total=Count("id"))
+        )
+        for item in created:
+            row(item["day"], item["company_id"], item["department_id"]).created = item["total"]
+
+        changed = (
+            PetitionStatusChange.objects.filter(
+                petition__in=petitions,
+                changed_at__date__range=(start, end),
+                status_approval__in=STATUS_COLUMNS,
+            )
+            .order_by()
+            .annotate(
+                day=TruncDate("changed_at"),
+                company_id=F("petition__company_id"),
+                department_id=F("petition__department_id"),
+            )
+            .values("day", "company_id", "department_id")
+            .annotate(
+                **{
+                    column: Count("id", filter=Q(status_approval=status))
+                    for status, column in STATUS_COLUMNS.items()
+                },
+                hours_done=Sum("petition__hours", filter=Q(status_approval="DN")),
+            )
+        )
+        for item in changed:
+            stat = row(item["day"], item["company_id"], item["department_id"])
+            for column in STATUS_COLUMNS.values():
+                setattr(stat, column, item[column])
+            stat.hours = item["hours_done"] or timedelta()
+
+        return list(rows.values())
+
+    def refresh(self, petitions, start, end):
+        """Recalcula y reemplaza los días `start`..`end` (ambos incluidos)."""
+        stats = self.compute(petitions, start, end)
+        with transaction.atomic():
+            self.filter(day__range=(start, end)).delete()
+            self.bulk_create(stats, batch_size=1000)
+        return stats
+
+    def summary(self, start, end, **filters):
+        """Totales del rango (una sola fila agregada)."""
+        totals = self.filter(day__range=(start, end), **filters).aggregate(
+            **{
+                metric: Coalesce(Sum(metric), models.Value(timedelta() if metric == "hours" else 0))
+                for metric in METRICS
+            }
+        )
+        return totals
+
+    def series(self, start, end, **filters):
+        """Totales por día del rango, ordenados por fecha."""
+        return (
+            self.filter(day__range=(start, end), **filters)
+            .values("day")
+            .annotate(**{metric: Sum(metric) for metric in METRICS})
+            .order_by("day")
+        )
+
+
+class PetitionDailyStat(models.Model):
+    """Resumen diario de peticiones por empresa y departamento.
+
+    Se llena con `manage.py backfill_petition_daily_stats` y se mantiene al
+    día con `manage.py refresh_petition_daily_stats` (recalcula los últimos
+    días). El dashboard y `/api/v1/stats/daily/` leen de aquí.
+    """
+
+    day = models.DateField()
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="daily_stats")
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="daily_stats")
+
+    created = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    hours = models.DurationField(default=timedelta)
+
+    objects = PetitionDailyStatManager()
+
+    class Meta:
+        db_table = "petition_daily_stats"
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "company", "department"], name="petition_daily_stats_unique_day"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="petition_daily_stats_day_idx")]
+
+    def __str__(self):
+        return f"{self.day} {self.company_id}/{self.department_id}"
@@ -1,14 +1,20 @@
 """Petitions Model."""
 
 # Django
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.utils import timezone
 
 # Utilities
 from utils.main_model import MainModel
+from core.managers import ACTIVE_ROWS
 
 # Models
 from .department_model import Department
 from .company_model import Company
+from .petition_counter_model import PetitionCounter, COUNTER_FIELDS
+from .petition_status_change_model import PetitionStatusChange
 from users.models.users_model import User
 
 
@@ -59,17 +65,129 @@ class Petition(MainModel, models.Model):
 
     hours = models.DurationField(verbose_name="tiempo invertido", null=True, blank=True)
 
+    status_changed = models.DateTimeField(
+        verbose_name="último cambio de estado",
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Momento en que la petición llegó a su `status_approval` actual",
+    )
+
     start_date = models.DateTimeField(blank=True, null=True)
     end_date = models.DateTimeField(blank=True, null=True)
 
+    # Solo PostgreSQL: lo llena `petitions/search.py` (en SQLite queda vacío y
+    # la búsqueda usa la tabla FTS5 `petitions_fts`)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         db_table = "petitions"
-        indexes = [models.Index(fields=["active", "deleted"])]
         ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["active", "deleted"]),
+            # 🔥 Índices parciales sobre las filas de `active_objects`,
+            # uno por cada filtro de alcance/listado, ordenados por `-created`
+            models.Index(
+                fields=["-created", "id"],
+                name="petitions_active_created_idx",
+                condition=ACTIVE_ROWS,
+            ),  # Admin / paginación keyset
+            models.Index(
+                fields=["department", "-created"],
+                name="petitions_active_dept_idx",
+                condition=ACTIVE_ROWS,
+            ),  # Manager / ?department=
+            models.Index(
+                fields=["company", "-created"],
+                name="petitions_active_company_idx",
+                condition=ACTIVE_ROWS,
+            ),  # Client / ?company=
+            models.Index(
+                fields=["user", "-created"],
+                name="petitions_active_user_idx",
+                condition=ACTIVE_ROWS,
+            ),  # Employee / ?user_email=
+            models.Index(
+                fields=["status_approval", "-created"],
+                name="petitions_active_status_idx",
+                condition=ACTIVE_ROWS,
+            ),  # ?status_approval=
+            GinIndex(fields=["search_vector"], name="petitions_search_vector_gin"),  # ?search=
+        ]
+
+    # Campos cuyo valor al cargar la fila se conserva en `_loaded_values`
+    # (alcance anterior en `petitions/cache.py`, contadores en `PetitionCounter`)
+    TRACKED_FIELDS = (*COUNTER_FIELDS, "user_id", "active", "deleted")
 
     def __str__(self):
         return f"{self.title} by {self.user}"
-    
+
+    def save(self, *args, **kwargs):
+        """Guarda y actualiza `PetitionCounter` y el historial de estados en la misma transacción."""
+        with transaction.atomic():
+            self.previous_values()  # 🔥 Bloquea la fila hasta el commit
+
+            status_changed = self.track_status_change()
+            if status_changed and kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "status_changed"}
+
+            super().save(*args, **kwargs)
+            PetitionCounter.objects.apply_changes([self])
+            if status_changed:
+                PetitionStatusChange.objects.record([self])
+        self.reset_loaded_values()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: instance.__dict__[name]
+            for name in cls.TRACKED_FIELDS
+            if name in instance.__dict__  # Campos diferidos no se cargan
+        }
+        return instance
+
+    def previous_values(self):
+        """Deja en `_loaded_values` los valores actuales de la fila (`{}` si es nueva).
+
+        Llamar dentro de la transacción que escribe: la fila se relee con
+        `select_for_update`, así dos instancias cargadas de la misma fila
+        (dos requests concurrentes) no aplican deltas sobre valores viejos.
+        """
+        if self.pk is None:
+            loaded = {}  # 🔥 También al copiar una fila con `pk = None`
+        else:
+            loaded = (
+                type(self).objects.select_for_update().filter(pk=self.pk)
+                .values(*self.TRACKED_FIELDS).first() or {}
+            )
+        self._loaded_values = loaded
+        return loaded
+
+    def reset_loaded_values(self):
+        """Toma los valores actuales como los "cargados" (después de guardar)."""
+        loaded = getattr(self, "_loaded_values", {})
+        self._loaded_values = {
+            name: self.__dict__.get(name, loaded.get(name)) for name in self.TRACKED_FIELDS
+        }
+
+    def status_transitioned(self):
+        """`True` si `status_approval` cambió desde que se cargó la fila.
+
+        Es válido hasta que termina `save()` (los `post_save` todavía ven el
+        estado anterior en `_loaded_values`).
+        """
+        loaded = getattr(self, "_loaded_values", {})
+        return "status_approval" in loaded and loaded["status_approval"] != self.status_approval
+
+    def track_status_change(self, now=None):
+        """Marca `status_changed` si el estado cambió desde que se cargó."""
+        loaded = getattr(self, "_loaded_values", {})
+        if self.status_approval == loaded.get("status_approval"):
+            return False
+        self.status_changed = now or timezone.now()
+        return True
+
     def restore(self):
         """Evita restaurar peticiones finalizadas."""
         if self.status_approval == self.StatusApproval.DONE:
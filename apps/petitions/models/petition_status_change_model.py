@@ -0,0 +1,48 @@
+"""Petition status change model."""
+
+# Django
+from django.db import models
+
+
+class PetitionStatusChangeManager(models.Manager):
+
+    def record(self, petitions):
+        """Guarda el estado actual de cada petición como una transición.
+
+        Recibe solo las peticiones cuyo estado cambió (`track_status_change`)
+        y ya tienen `pk`.
+        """
+        changes = [
+            self.model(
+                petition_id=petition.pk,
+                status_approval=petition.status_approval,
+                changed_at=petition.status_changed,
+            )
+            for petition in petitions
+        ]
+        return self.bulk_create(changes, batch_size=1000)
+
+
+class PetitionStatusChange(models.Model):
+    """Historial de cambios de `status_approval`: una fila por transición.
+
+    `PetitionDailyStat` cuenta las aprobaciones, rechazos y finalizaciones
+    de cada día a partir de aquí, así una petición aprobada el lunes y
+    finalizada el miércoles sigue contando como aprobada el lunes.
+    """
+
+    petition = models.ForeignKey(
+        "petitions.Petition", on_delete=models.CASCADE, related_name="status_changes"
+    )
+    status_approval = models.CharField(max_length=2)
+    changed_at = models.DateTimeField()
+
+    objects = PetitionStatusChangeManager()
+
+    class Meta:
+        db_table = "petition_status_changes"
+        ordering = ["-changed_at"]
+        indexes = [models.Index(fields=["changed_at"], name="petition_status_changed_idx")]
+
+    def __str__(self):
+        return f"{self.petition_id} → {self.status_approval} ({self.changed_at})"
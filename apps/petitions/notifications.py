@@ -0,0 +1,461 @@
+"""Notificaciones de peticiones (base de datos + correo).
+
+Se usa desde el `post_save` de `Petition` (una petición) y desde las
+operaciones masivas (`/api/v1/petitions/bulk/`), que no disparan señales:
+los destinatarios de todo el lote se resuelven con una sola consulta
+(cacheada por departamento y empresa) y las notificaciones se insertan con
+un solo `bulk_create`.
+
+Cada evento genera una notificación de difusión por audiencia (admins,
+managers del departamento, clientes de la empresa), no una por usuario:
+cada usuario las ve al leer su bandeja (`Notification.objects.inbox`). Lo
+único por destinatario es el contador de no leídas (`NotificationCounter`).
+
+Los eventos de una misma petición se agrupan: dentro del lote queda uno
+por petición y, si ya hay una difusión de la petición más reciente que
+`NOTIFICATION_COALESCE_WINDOW`, se actualiza en vez de crear otra.
+
+Los correos no se envían aquí: se encolan en `email_outbox` dentro de la
+misma transacción y los envía `manage.py run_email_outbox` (ver
+`petitions/outbox.py`). Quien eligió resumen (`NotificationPreference`)
+recibe un solo correo cada `digest_interval` minutos (`flush_digests`).
+"""
+
+# Python
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import NamedTuple
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+# Models
+from petitions.models import (
+    Petition,
+    Notification,
+    EmailOutbox,
+    NotificationCounter,
+    NotificationReceipt,
+    NotificationPreference,
+    NotificationDigestItem,
+)
+from users.models import User
+
+# Mail
+from core.mail import SharedTemplate
+
+# Cache
+from core.cache import is_shared_cache
+from petitions.cache import ADMIN_SCOPE
+
+# Stream
+from petitions.stream import publish_notifications
+
+
+NOTIFY_STATUSES = [
+    Petition.StatusApproval.APPROVED,
+    Petition.StatusApproval.NOT_APPROVED,
+    Petition.StatusApproval.DONE,
+]
+
+RECIPIENTS_VERSION_KEY = "notifications:recipients:version"
+RECIPIENTS_KEY = "notifications:audiences:{}:{}:{}"  # versión, departamento, empresa
+RECIPIENTS_TIMEOUT = 60 * 10
+
+DIGEST_BATCH_SIZE = 100  # Resúmenes por llamada a `flush_digests`
+
+
+def get_event_message(petition, created):
+    """Mensaje de la notificación o `None` si el cambio no se notifica.
+
+    Solo se notifica la creación y una transición real de estado: editar
+    título, horas, borrar (soft delete) o restaurar no genera nada.
+    """
+    if created:
+        return f"Se ha creado una nueva petición: {petition.title}"
+    if petition.status_transitioned() and petition.status_approval in NOTIFY_STATUSES:
+        return f"La petición '{petition.title}' ha cambiado de estado a {petition.get_status_approval_display()}."
+    return None
+
+
+class Recipient(NamedTuple):
+    id: int
+    email: str
+    first_name: str
+    audience: str  # Alcance por el que recibe la notificación (ver `petitions/cache.py`)
+
+
+def _recipients_version():
+    version = cache.get(RECIPIENTS_VERSION_KEY)
+    if version is None:
+        # 🔥 Sembrar con la hora: si la caché expulsa la versión no se
+        # reutilizan listas viejas
+        cache.add(RECIPIENTS_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(RECIPIENTS_VERSION_KEY)
+    return version
+
+
+def invalidate_recipients():
+    """Descarta las listas cacheadas (al confirmar la transacción).
+
+    Se llama cuando cambian grupos, perfiles de recursos humanos, empresas
+    de clientes o datos de contacto (ver `petitions/signals.py`).
+    """
+
+    def bump():
+        try:
+            cache.incr(RECIPIENTS_VERSION_KEY)
+        except ValueError:
+            cache.set(RECIPIENTS_VERSION_KEY, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def query_recipients(pairs):
+    """`{(department_id, company_id): (Recipient, ...)}` con una sola consulta.
+
+    + Admin: todas las peticiones.
+    + Manager: las de su departamento.
+    + Client: las de su empresa (o sus empresas vía `ClientCompany`).
+    """
+    department_ids = {department_id for department_id, _ in pairs}
+    company_ids = {company_id for _, company_id in pairs}
+
+    rows = (
+        User.objects.filter(
+            Q(groups__name="Admin")
+            | Q(groups__name="Manager", human_resource__department__in=department_ids)
+            | Q(groups__name="Client", human_resource__company__in=company_ids)
+            | Q(groups__name="Client", human_resource__client_companies__company__in=company_ids),  # 🔥 Clientes con múltiples empresas
+            human_resource__isnull=False,
+        )
+        .order_by()
+        .values_list(
+            "id",
+            "email",
+            "first_name",
+            "groups__name",
+            "human_resource__department_id",
+            "human_resource__company_id",
+            "human_resource__client_companies__company_id",
+        )
+    )
+
+    admins, managers, clients = {}, defaultdict(dict), defaultdict(dict)
+    profile_clients, multi_company = defaultdict(dict), set()
+    for user_id, email, first_name, group, department_id, company_id, client_company_id in rows:
+        if group == "Admin":
+            admins[user_id] = Recipient(user_id, email, first_name, ADMIN_SCOPE)
+        elif group == "Manager":
+            managers[department_id][user_id] = Recipient(
+                user_id, email, first_name, f"dept:{department_id}"
+            )
+        elif client_company_id is not None:
+            multi_company.add(user_id)
+            clients[client_company_id][user_id] = Recipient(
+                user_id, email, first_name, f"company:{client_company_id}"
+            )
+        elif company_id is not None:
+            profile_clients[company_id][user_id] = Recipient(
+                user_id, email, first_name, f"company:{company_id}"
+            )
+
+    # 🔥 Con `ClientCompany` solo se usan esas empresas (igual que `visible_company_ids`)
+    for company_id, members in profile_clients.items():
+        for user_id, recipient in members.items():
+            if user_id not in multi_company:
+                clients[company_id][user_id] = recipient
+
+    # 🔥 Si tiene varios roles gana el de mayor alcance (igual que `scopes_for_user`)
+    return {
+        (department_id, company_id): tuple(
+            {**clients[company_id], **managers[department_id], **admins}.values()
+        )
+        for department_id, company_id in pairs
+    }
+
+
+def resolve_recipients(petitions):
+    """`{petition.pk: (Recipient, ...)}` para todo el lote.
+
+    Las listas se cachean por (departamento, empresa): solo los pares que
+    no están en la caché se consultan, todos juntos en una consulta. Sin
+    caché compartida se consulta siempre (una consulta por lote).
+    """
+    pairs = {(petition.department_id, petition.company_id) for petition in petitions}
+    if not is_shared_cache():
+        # 🔥 Caché por proceso: `invalidate_recipients` no llegaría a los otros workers
+        resolved = query_recipients(pairs)
+        return {
+            petition.pk: resolved[(petition.department_id, petition.company_id)]
+            for petition in petitions
+        }
+
+    version = _recipients_version()
+    keys = {pair: RECIPIENTS_KEY.format(version, *pair) for pair in pairs}
+    cached = cache.get_many(keys.values())
+    resolved = {pair: cached[key] for pair, key in keys.items() if key in cached}
+
+    missing = pairs - resolved.keys()
+    if missing:
+        fetched = query_recipients(missing)
+        cache.set_many(
+            {keys[pair]: recipients for pair, recipients in fetched.items()},
+            timeout=RECIPIENTS_TIMEOUT,
+        )
+        resolved.update(fetched)
+
+    return {
+        petition.pk: resolved[(petition.department_id, petition.company_id)]
+        for petition in petitions
+    }
+
+
+def get_coalesce_window():
+    return getattr(settings, "NOTIFICATION_COALESCE_WINDOW", 0)
+
+
+def coalesce_events(events):
+    """`[(petition, message, count), ...]`: un evento por petición (el último mensaje)."""
+    merged = {}
+    for petition, message in events:
+        count = merged[petition.pk][2] if petition.pk in merged else 0
+        merged[petition.pk] = (petition, message, count + 1)
+    return list(merged.values())
+
+
+def notify_petitions(events):
+    """Crea las notificaciones de `events` (`[(petition, message), ...]`).
+
+    Una notificación de difusión por petición y audiencia con destinatarios.
+    Los eventos sin mensaje se ignoran. Las difusiones recientes de la
+    misma petición se actualizan (`Notification.objects.coalescible`) y sus
+    recibos se descartan: vuelven a quedar sin leer. Los correos se encolan
+    en la misma transacción; el worker los envía cuando esta se confirma.
+    """
+    events = coalesce_events([(petition, message) for petition, message in events if message])
+    if not events:
+        return []
+
+    petitions = [petition for petition, _, _ in events]
+    recipients = resolve_recipients(petitions)
+
+    now = timezone.now()
+    existing = {}
+    if get_coalesce_window():
+        since = now - timedelta(seconds=get_coalesce_window())
+        for notification in Notification.objects.coalescible([p.pk for p in petitions], since):
+            existing[(notification.petition_id, notification.audience)] = notification
+
+    created, merged, deliveries, previous = [], [], [], {}
+    for petition, message, count in events:
+        broadcasts = {}
+        for recipient in recipients[petition.pk]:
+            audience = recipient.audience
+            if audience not in broadcasts:
+                notification = existing.get((petition.pk, audience))
+                if notification is None:
+                    notification = Notification(
+                        audience=audience, petition=petition, message=message, event_count=count
+                    )
+                    created.append(notification)
+                else:
+                    previous[notification.pk] = notification.created_at
+                    notification.petition = petition
+                    notification.message = message
+                    notification.event_count += count
+                    notification.created_at = now
+                    merged.append(notification)
+                broadcasts[audience] = notification
+            deliveries.append((broadcasts[audience], recipient))
+
+    # 🔥 Una difusión nueva suma uno a cada destinatario (contador de la UI)
+    fanout = [recipient.id for notification, recipient in deliveries if notification.pk is None]
+    Notification.objects.bulk_create(created)
+    NotificationCounter.objects.increment(fanout)
+    if merged:
+        # 🔥 Quien ya la había leído la vuelve a tener sin leer: suma uno
+        read = Notification.objects.read_by(
+            [(n.pk, n.audience, previous[n.pk]) for n in merged],
+            {recipient.id for notification, recipient in deliveries if notification.pk in previous},
+        )
+        NotificationCounter.objects.increment(
+            recipient.id
+            for notification, recipient in deliveries
+            if (recipient.id, notification.pk) in read
+        )
+        Notification.objects.bulk_update(merged, ["message", "event_count", "created_at"])
+        NotificationReceipt.objects.filter(notification__in=merged).delete()
+
+    notifications = created + merged
+    transaction.on_commit(lambda: publish_notifications(notifications))  # Stream SSE
+
+    queue_emails(deliveries, merged)
+    return notifications
+
+
+def queue_emails(deliveries, merged=()):
+    """Encola los correos de `deliveries` según la preferencia de cada destinatario.
+
+    + `immediate`: un correo por notificación. Si la notificación se agrupó
+      y su correo sigue pendiente en la cola, se actualiza ese correo.
+    + `digest`: se anota para el próximo resumen (`flush_digests`).
+    + `off`: nada.
+    """
+    preferences = NotificationPreference.objects.for_users({recipient.id for _, recipient in deliveries})
+    immediate, digest = [], []
+    for notification, recipient in deliveries:
+        preference = preferences.get(recipient.id)
+        frequency = preference.email_frequency if preference else NotificationPreference.EmailFrequency.IMMEDIATE
+        if frequency == NotificationPreference.EmailFrequency.IMMEDIATE:
+            immediate.append((notification, recipient))
+        elif frequency == NotificationPreference.EmailFrequency.DIGEST:
+            digest.append((notification, recipient))
+
+    emails = build_notification_emails(immediate)
+    if merged:
+        emails = refresh_pending_emails(emails, merged)
+    EmailOutbox.objects.enqueue(emails)
+
+    if digest:
+        NotificationDigestItem.objects.bulk_create(
+            [
+                NotificationDigestItem(user_id=recipient.id, notification=notification)
+                for notification, recipient in digest
+            ],
+            ignore_conflicts=True,  # 🔥 La notificación agrupada ya estaba en el resumen
+        )
+        NotificationPreference.objects.schedule_digests(
+            {recipient.id: preferences[recipient.id] for _, recipient in digest}.values()
+        )
+
+
+def refresh_pending_emails(emails, merged):
+    """Reemplaza el contenido de los correos aún pendientes de `merged`.
+
+    Devuelve los correos de `emails` que no tenían uno pendiente (nuevos).
+    """
+    pending = {
+        (row.notification_id, row.to_email): row
+        for row in EmailOutbox.objects.filter(
+            notification__in=merged, status=EmailOutbox.Status.PENDING
+        ).select_for_update()  # 🔥 Que el worker no lo reserve mientras se actualiza
+    }
+
+    fresh, updated = [], []
+    for email in emails:
+        row = pending.get((email.notification_id, email.to_email))
+        if row is None:
+            fresh.append(email)
+            continue
+        row.subject, row.body, row.html_body = email.subject, email.body, email.html_body
+        updated.append(row)
+
+    if updated:
+        EmailOutbox.objects.bulk_update(updated, ["subject", "body", "html_body"])
+    return fresh
+
+
+def build_notification_emails(deliveries):
+    """Un correo (sin guardar) por `(notification, Recipient)` con email.
+
+    La plantilla se renderiza una vez por evento (petición + mensaje); por
+    destinatario solo se completa el nombre.
+    """
+    templates = {}
+    emails = []
+    for notification, user in deliveries:
+        if not user.email:  # 🔥 Solo enviar si tiene email válido
+            continue
+
+        petition = notification.petition
+        event = (petition.pk, notification.message)
+        if event not in templates:
+            petition_url = f"http://localhost/task-flow/views/peticiones_detalle.php?petition_id={petition.id}"  # 🔥 Enlace a la petición
+            context = {
+                "petition": petition,
+                "message": notification.message,
+                "petition_url": petition_url,
+            }
+            templates[event] = (
+                f"{notification.message}\n\nVer más en: {petition_url}",
+                SharedTemplate("emails/notification_email.html", context, ("first_name",)),
+            )
+
+        body, html = templates[event]
+        emails.append(
+            EmailOutbox(
+                notification=notification,
+                to_email=user.email,
+                subject="Nueva Notificación - Peticiones",
+                body=body,
+                html_body=html.render(user),
+            )
+        )
+    return emails
+
+
+def flush_digests(now=None, limit=DIGEST_BATCH_SIZE):
+    """Encola un correo por cada resumen vencido. Devuelve cuántos se encolaron.
+
+    Se llama desde `manage.py run_email_outbox` en cada vuelta. Cada
+    resumen junta las notificaciones anotadas desde el anterior, la más
+    reciente primero.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = NotificationPreference.objects.due(now).select_related("user")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True, of=("self",))
+        preferences = list(due[:limit])
+        if not preferences:
+            return 0
+
+        items = defaultdict(list)
+        for item in (
+            NotificationDigestItem.objects.filter(user__in=[p.user_id for p in preferences])
+            .select_related("notification__petition")
+            .order_by("-notification__created_at")
+        ):
+            items[item.user_id].append(item)
+
+        emails = []
+        for preference in preferences:
+            user = preference.user
+            if user.email and items[user.pk]:
+                emails.append(build_digest_email(user, [item.notification for item in items[user.pk]]))
+
+        EmailOutbox.objects.enqueue(emails)
+        NotificationDigestItem.objects.filter(
+            id__in=[item.id for user_items in items.values() for item in user_items]
+        ).delete()
+        NotificationPreference.objects.filter(
+            user_id__in=[p.user_id for p in preferences]
+        ).update(next_digest_at=None, last_digest_at=now)
+    return len(emails)
+
+
+def build_digest_email(user, notifications):
+    """Un correo (sin guardar) con todas las `notifications` del resumen."""
+    items = [
+        {
+            "petition": notification.petition,
+            "message": notification.message,
+            "event_count": notification.event_count,
+            "petition_url": f"http://localhost/task-flow/views/peticiones_detalle.php?petition_id={notification.petition_id}",
+        }
+        for notification in notifications
+    ]
+    body = "\n\n".join(f"{item['message']}\nVer más en: {item['petition_url']}" for item in items)
+    return EmailOutbox(
+        to_email=user.email,
+        subject=f"Resumen de notificaciones ({len(items)}) - Peticiones",
+        body=body,
+        html_body=render_to_string("emails/notification_digest.html", {"user": user, "items": items}),
+    )
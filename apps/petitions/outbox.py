@@ -0,0 +1,123 @@
+"""Envío en segundo plano de la cola `email_outbox`.
+
++ `notify_petitions` guarda los correos en la misma transacción que las
+  notificaciones (`EmailOutbox.objects.enqueue`) y, al confirmar, despierta
+  al worker con `NOTIFY` (PostgreSQL).
++ `manage.py run_email_outbox` reserva lotes, los envía con un número
+  limitado de hilos (cada uno reutiliza su conexión SMTP, ver
+  `core/mail.py`) y reprograma los fallos con espera exponencial.
++ En otros motores no hay aviso: el worker consulta la cola cada
+  `--poll-interval` segundos.
+"""
+
+# Python
+import random
+import select
+from concurrent.futures import ThreadPoolExecutor
+
+# Django
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection
+
+# Mail
+from core.mail import get_rate_limit, send_messages
+
+# Models
+from petitions.models import EmailOutbox
+
+
+NOTIFY_CHANNEL = "email_outbox"
+
+
+def outbox_setting(name):
+    return getattr(settings, f"EMAIL_OUTBOX_{name}")
+
+
+def wake_worker():
+    """Avisa a los workers que escuchan el canal (solo PostgreSQL)."""
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"NOTIFY {NOTIFY_CHANNEL}")
+
+
+def listen():
+    """Suscribe la conexión del worker al canal. `False` si no hay soporte."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+    return True
+
+
+def wait_for_work(timeout, listening):
+    """Espera un `NOTIFY` o, sin soporte, simplemente `timeout` segundos."""
+    if not listening:
+        select.select([], [], [], timeout)
+        return
+
+    raw = connection.connection  # 🔥 Conexión psycopg2 (autocommit)
+    if select.select([raw], [], [], timeout)[0]:
+        raw.poll()
+        raw.notifies.clear()
+
+
+def backoff_delay(attempts):
+    """Segundos hasta el siguiente intento: `base * 2^(n-1)` con tope y jitter."""
+    delay = min(
+        outbox_setting("BACKOFF_BASE") * 2 ** max(attempts - 1, 0),
+        outbox_setting("BACKOFF_MAX"),
+    )
+    return delay * random.uniform(0.8, 1.2)  # 🔥 Evita reintentos sincronizados
+
+
+def build_message(row):
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[row.to_email],
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, "text/html")
+    return message
+
+
+def send_chunk(rows, rate=None):
+    """Envía `rows` (ver `core.mail.send_messages`). `[(row, error | None), ...]`."""
+    results = send_messages([build_message(row) for row in rows], rate=rate)
+    return [(row, error) for row, (_, error) in zip(rows, results)]
+
+
+def deliver(rows, concurrency, max_attempts=None):
+    """Envía un lote reservado y registra el resultado de cada correo.
+
+    Los hilos solo hablan con el servidor SMTP; las escrituras en la base
+    de datos se hacen desde el hilo principal. `EMAIL_RATE_LIMIT` se
+    reparte entre los hilos.
+    """
+    concurrency = max(1, min(concurrency, len(rows)))
+    chunks = [rows[index::concurrency] for index in range(concurrency)]
+    rate = get_rate_limit() / concurrency
+
+    if concurrency == 1:
+        results = send_chunk(rows, rate)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = [
+                result
+                for chunk in executor.map(lambda chunk: send_chunk(chunk, rate), chunks)
+                for result in chunk
+            ]
+
+    sent = [row for row, error in results if error is None]
+    failures = [(row, error) for row, error in results if error is not None]
+
+    if sent:
+        EmailOutbox.objects.mark_sent(sent)
+    if failures:
+        EmailOutbox.objects.mark_failed(
+            failures, max_attempts or outbox_setting("MAX_ATTEMPTS"), backoff_delay
+        )
+    return len(sent), len(failures)
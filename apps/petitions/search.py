@@ -0,0 +1,170 @@
+"""Búsqueda de texto completo sobre título y descripción de peticiones.
+
++ SQLite: tabla virtual FTS5 `petitions_fts` (rowid = id de la petición).
++ PostgreSQL: campo `Petition.search_vector` (`SearchVectorField`) con
+  índice GIN, consultado con `SearchQuery` / `SearchRank`.
++ Otros motores: `icontains` sobre título y descripción.
+
+El índice se mantiene desde el `post_save` de `Petition`
+(ver `petitions/signals.py`) y se reconstruye con
+`manage.py rebuild_petition_search`.
+"""
+
+# Python
+import re
+
+# Django
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Models
+from petitions.models import Petition
+
+
+FTS_TABLE = "petitions_fts"
+SEARCH_CONFIG = "spanish"
+
+# Pesos de columnas: el título pesa más que la descripción
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def search_vector():
+    """Expresión de `search_vector`: título con peso A y descripción con peso B."""
+    return SearchVector("title", weight="A", config=SEARCH_CONFIG) + SearchVector(
+        "description", weight="B", config=SEARCH_CONFIG
+    )
+
+
+def _tokens(term):
+    return re.findall(r"\w+", term or "")
+
+
+class SearchBackend:
+    """Backend por defecto: búsqueda parcial sin índice."""
+
+    def empty(self, queryset):
+        return queryset.none().annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    def search(self, queryset, term):
+        term = (term or "").strip()
+        return queryset.filter(
+            Q(title__icontains=term) | Q(description__icontains=term)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index(self, petition_ids):
+        """Actualiza el índice para las peticiones dadas."""
+
+    def remove(self, petition_ids):
+        """Elimina las peticiones del índice."""
+
+    def rebuild(self):
+        """Reconstruye el índice completo."""
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 con ranking `bm25`."""
+
+    def match_query(self, term):
+        # 🔥 Cada palabra como prefijo entre comillas: evita errores de sintaxis FTS5
+        return " ".join(f'"{token}"*' for token in _tokens(term))
+
+    def search(self, queryset, term):
+        match = self.match_query(term)
+        if not match:
+            return self.empty(queryset)
+
+        # 🔥 El `MATCH` filtra por el índice FTS5; el ranking solo se calcula
+        # para las filas que coinciden
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    def index(self, petition_ids):
+        petition_ids = list(petition_ids)
+        if not petition_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(petition_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", petition_ids
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                f"SELECT id, title, description FROM petitions WHERE id IN ({placeholders})",
+                petition_ids,
+            )
+
+    def remove(self, petition_ids):
+        petition_ids = list(petition_ids)
+        if not petition_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(petition_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", petition_ids
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "SELECT id, title, description FROM petitions"
+            )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """`SearchVectorField` + GIN con ranking `ts_rank`."""
+
+    def search(self, queryset, term):
+        if not _tokens(term):
+            return self.empty(queryset)
+
+        query = SearchQuery(term, config=SEARCH_CONFIG, search_type="websearch")
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+
+    def index(self, petition_ids):
+        petition_ids = list(petition_ids)
+        if not petition_ids:
+            return
+        Petition.objects.filter(pk__in=petition_ids).update(search_vector=search_vector())
+
+    def rebuild(self):
+        Petition.objects.update(search_vector=search_vector())
+
+
+def get_search_backend():
+    """Backend según el motor de la conexión por defecto."""
+    if connection.vendor == "sqlite":
+        return SQLiteSearchBackend()
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return SearchBackend()
+
+
+def search_petitions(queryset, term):
+    """Filtra `queryset` por `term` y lo ordena por relevancia."""
+    return get_search_backend().search(queryset, term).order_by("-search_rank", "-created")
+
+
+def index_petitions(petition_ids):
+    get_search_backend().index(petition_ids)
+
+
+def remove_petitions(petition_ids):
+    get_search_backend().remove(petition_ids)
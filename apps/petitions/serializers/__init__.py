@@ -1,4 +1,9 @@
 from .petition_serializer import *
 from .department_serializer import DepartmentSerializer, DepartmentCreateSerializer
 from .company_serializer import CompanySerializer, CompanyCreateSerializer
-from .notification_serializer import NotificationSerializer
\ No newline at end of file
+from .notification_serializer import (
+    NotificationSerializer,
+    NotificationInboxSerializer,
+    NotificationArchiveSerializer,
+    NotificationPreferenceSerializer,
+)
\ No newline at end of file
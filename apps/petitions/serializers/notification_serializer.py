@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from users.serializers.users import UserModelSerializer
-from petitions.models import Notification
+from petitions.models import Notification, NotificationArchive, NotificationPreference
+from core.serializers import SparseFieldsMixin
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer para el modelo de Notificaciones."""
 
     recipient = UserModelSerializer(
@@ -11,5 +12,58 @@ class NotificationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Notification
-        fields = ["id", "recipient", "petition", "message", "status", "created_at"]
-        read_only_fields = ["recipient", "created_at"]
+        fields = ["id", "recipient", "audience", "petition", "message", "status", "event_count", "created_at"]
+        read_only_fields = ["recipient", "audience", "event_count", "created_at"]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "status" in data and hasattr(instance, "inbox_status"):
+            data["status"] = instance.inbox_status  # 🔥 Difusiones: estado para quien consulta
+        return data
+
+
+class NotificationInboxSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Representación liviana de la bandeja (listado por defecto).
+
+    Sin `recipient` (siempre es quien consulta): solo el id y el título de
+    la petición, resueltos con un `select_related("petition")`. `status` es
+    el estado para quien consulta (`Notification.objects.inbox`).
+    """
+
+    petition_id = serializers.IntegerField(read_only=True)
+    petition_title = serializers.CharField(source="petition.title", read_only=True)
+    status = serializers.CharField(source="inbox_status", read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = [
+            "id",
+            "petition_id",
+            "petition_title",
+            "message",
+            "audience",
+            "status",
+            "event_count",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class NotificationArchiveSerializer(serializers.ModelSerializer):
+    """Serializer para las notificaciones archivadas (solo lectura)."""
+
+    class Meta:
+        model = NotificationArchive
+        fields = ["id", "recipient", "audience", "petition", "message", "created_at", "archived_at"]
+        read_only_fields = fields
+
+
+class NotificationPreferenceSerializer(serializers.ModelSerializer):
+    """Preferencias de correo del usuario autenticado."""
+
+    digest_interval = serializers.IntegerField(min_value=5, max_value=60 * 24, required=False)
+
+    class Meta:
+        model = NotificationPreference
+        fields = ["email_frequency", "digest_interval", "next_digest_at", "last_digest_at"]
+        read_only_fields = ["next_digest_at", "last_digest_at"]
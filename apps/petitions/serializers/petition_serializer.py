@@ -1,12 +1,22 @@
 """Petitions serializers."""
 
+# Django
+from django.db import transaction
+from django.utils import timezone
+
 # Django REST Framework
 from rest_framework import serializers
 
 # Models
-from petitions.models import Petition, Department, Company
+from petitions.models import Petition, Department, Company, PetitionCounter, PetitionStatusChange
 from users.models import User
 
+# Utilities
+from core.serializers import SparseFieldsMixin
+from petitions.cache import invalidate_petition_batch
+from petitions.notifications import get_event_message, notify_petitions
+from petitions.search import index_petitions
+
 # Serializers
 from users.serializers import UserModelSerializer, ClientCompanySerializer
 from commissions.serializers import CommissionSerializer
@@ -16,7 +26,7 @@ from .company_serializer import CompanySerializer
 from datetime import timedelta
 
 
-class PetitionFullDetailserializer(serializers.ModelSerializer):
+class PetitionFullDetailserializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Petiion model serializer."""
 
     user = UserModelSerializer(read_only=True)
@@ -169,3 +179,211 @@ class PetitionCreateSerializer(serializers.ModelSerializer):
                     "El formato de horas debe ser 'HH:MM'."
                 )
         return None
+
+
+class PetitionBulkListSerializer(serializers.ListSerializer):
+    """Lote de peticiones de `/api/v1/petitions/bulk/`.
+
+    + Las llaves foráneas se validan con una sola consulta `IN` por modelo.
+    + Las peticiones a actualizar se buscan (y bloquean) en un solo query
+      dentro del queryset `context["queryset"]` (alcance del usuario).
+    + `save()` escribe con `bulk_create` / `bulk_update` en una transacción y
+      hace lo que harían las señales (índice de búsqueda, caché,
+      notificaciones) una sola vez para todo el lote.
+    """
+
+    related_fields = {"department": Department, "company": Company, "user": User}
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        items = super().to_internal_value(data)
+
+        # 🔥 Fuera de `validate()` para que DRF no envuelva la lista de
+        # errores en `non_field_errors`: cada error queda en la posición
+        # de su elemento
+        errors = self.validate_batch(items)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def validate_batch(self, items):
+        """Errores por elemento (ids a actualizar y llaves foráneas)."""
+        errors = [{} for _ in items]
+
+        # 📌 Peticiones a actualizar
+        ids = [item["id"] for item in items if "id" in item]
+        queryset = self.context.get("queryset", Petition.active_objects.all())
+        self.instances = queryset.select_for_update().in_bulk(ids)
+
+        seen = set()
+        for index, item in enumerate(items):
+            if "id" not in item:
+                continue
+            if item["id"] not in self.instances:
+                errors[index]["id"] = ["La petición no existe."]
+            elif item["id"] in seen:
+                errors[index]["id"] = ["La petición está repetida en el lote."]
+            seen.add(item["id"])
+
+        # 📌 Llaves foráneas: un `IN` por modelo
+        does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages["does_not_exist"]
+        for name, model in self.related_fields.items():
+            wanted = {item[name] for item in items if name in item}
+            if not wanted:
+                continue
+
+            related = model._default_manager.all()
+            limit_choices_to = Petition._meta.get_field(name).get_limit_choices_to()
+            if limit_choices_to:
+                related = related.complex_filter(limit_choices_to)
+            found = set(related.filter(pk__in=wanted).values_list("pk", flat=True))
+
+            for index, item in enumerate(items):
+                if name in item and item[name] not in found:
+                    errors[index][name] = [does_not_exist.format(pk_value=item[name])]
+
+        return errors
+
+    def save(self, **kwargs):
+        now = timezone.now()
+        to_create, to_update, update_fields = [], [], set()
+        status_changed = []
+
+        for attrs in self.validated_data:
+            attrs = {
+                f"{name}_id" if name in self.related_fields else name: value
+                for name, value in attrs.items()
+            }
+            pk = attrs.pop("id", None)
+            if pk is None:
+                petition = Petition(**attrs)
+                petition.previous_values()  # `{}`: sin fila anterior
+                if petition.track_status_change(now):
+                    status_changed.append(petition)
+                to_create.append(petition)
+                continue
+
+            petition = self.instances[pk]
+            for name, value in attrs.items():
+                setattr(petition, name, value)
+            petition.modified = now  # 🔥 `bulk_update` no aplica `auto_now`
+            update_fields.update(attrs)
+            if petition.track_status_change(now):
+                update_fields.add("status_changed")
+                status_changed.append(petition)
+            to_update.append(petition)
+
+        with transaction.atomic():
+            created = Petition.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                Petition.objects.bulk_update(
+                    to_update, [*sorted(update_fields), "modified"], batch_size=self.batch_size
+                )
+
+            # 🔥 `bulk_create` / `bulk_update` no pasan por `save()` ni emiten `post_save`
+            petitions = [*created, *to_update]
+            PetitionCounter.objects.apply_changes(petitions)
+            PetitionStatusChange.objects.record(status_changed)  # Ya con `pk`
+            index_petitions([petition.pk for petition in petitions])
+            invalidate_petition_batch(petitions)
+            notify_petitions(
+                [(petition, get_event_message(petition, created=True)) for petition in created]
+                + [(petition, get_event_message(petition, created=False)) for petition in to_update]
+            )
+
+        for petition in petitions:
+            petition.reset_loaded_values()
+
+        self.created, self.updated = created, to_update
+        return petitions
+
+
+class PetitionBulkItemSerializer(PetitionCreateSerializer):
+    """Una petición del lote: con `id` es una actualización parcial, sin `id` se crea."""
+
+    id = serializers.IntegerField(required=False)
+    department = serializers.IntegerField(required=False)
+    company = serializers.IntegerField(required=False)
+    user = serializers.IntegerField(required=False)
+
+    create_required_fields = ["title", "description", "department", "company", "user"]
+
+    class Meta(PetitionCreateSerializer.Meta):
+        fields = ["id", *PetitionCreateSerializer.Meta.fields]
+        extra_kwargs = {
+            "title": {"required": False},
+            "description": {"required": False},
+        }
+        list_serializer_class = PetitionBulkListSerializer
+
+    def validate(self, data):
+        data = super().validate(data)
+        if "id" not in data:
+            required = serializers.Field.default_error_messages["required"]
+            missing = {
+                name: [required] for name in self.create_required_fields if name not in data
+            }
+            if missing:
+                raise serializers.ValidationError(missing)
+        return data
+
+
+class PetitionStatusTransitionSerializer(serializers.Serializer):
+    """Cambia el estado de aprobación de muchas peticiones a la vez.
+
+    Un solo `UPDATE ... WHERE status_approval <> nuevo` sobre las peticiones
+    del alcance del usuario (`context["queryset"]`). `save()` devuelve el
+    resultado por id: `updated`, `unchanged` (ya tenía ese estado) o
+    `not_found` (no existe o está fuera del alcance).
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=500
+    )
+    status_approval = serializers.ChoiceField(
+        choices=[
+            (value, label)
+            for value, label in Petition.StatusApproval.choices
+            if value != Petition.StatusApproval.WAITING
+        ]
+    )
+
+    def save(self, **kwargs):
+        ids = list(dict.fromkeys(self.validated_data["ids"]))  # Sin repetidos, mismo orden
+        new_status = self.validated_data["status_approval"]
+        queryset = self.context.get("queryset", Petition.active_objects.all()).filter(pk__in=ids)
+
+        with transaction.atomic():
+            # 🔥 Bloquear las filas: los resultados por id no cambian hasta el commit
+            petitions = {petition.pk: petition for petition in queryset.select_for_update()}
+            changed = [petition for petition in petitions.values() if petition.status_approval != new_status]
+
+            if changed:
+                now = timezone.now()
+                queryset.exclude(status_approval=new_status).update(
+                    status_approval=new_status, modified=now, status_changed=now
+                )
+                for petition in changed:
+                    petition.status_approval = new_status
+                    petition.modified = petition.status_changed = now
+
+                # 🔥 `update()` no pasa por `save()` ni emite `post_save`
+                PetitionCounter.objects.apply_changes(changed)
+                PetitionStatusChange.objects.record(changed)
+                invalidate_petition_batch(changed)
+                notify_petitions(
+                    [(petition, get_event_message(petition, created=False)) for petition in changed]
+                )
+
+        changed_ids = {petition.pk for petition in changed}
+        return [
+            {
+                "id": pk,
+                "result": (
+                    "updated" if pk in changed_ids
+                    else "unchanged" if pk in petitions
+                    else "not_found"
+                ),
+            }
+            for pk in ids
+        ]
@@ -1,78 +1,184 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
+from django.utils import timezone
+from django.contrib.auth.models import Group
 from petitions.models import Petition
-from petitions.models import Notification
-from users.models import HumanResource, ClientCompany
-from django.conf import settings
-from django.core.mail import send_mail
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from petitions.models import Company, Department, PetitionCounter
+from petitions.models import Notification, NotificationCounter
+from petitions.models.petition_counter_model import counter_key
+from commissions.models import Commission
+from users.models import User, HumanResource, ClientCompany
+from petitions.search import index_petitions, remove_petitions
+from petitions.cache import invalidate_petition, invalidate_petitions
+from petitions.notifications import get_event_message, notify_petitions, invalidate_recipients
 
 @receiver(post_save, sender=Petition)
 def create_notification(sender, instance, created, **kwargs):
-    """Crea una notificación y envía un correo cuando se crea o actualiza una petición."""
+    """Notifica la creación o el cambio de estado de una petición (ver `get_event_message`)."""
 
-    recipients = set()  # 🔥 Usamos un `set()` para evitar duplicados
-    message = None
+    notify_petitions([(instance, get_event_message(instance, created))])
 
+
+@receiver(post_save, sender=Petition)
+def update_search_index(sender, instance, **kwargs):
+    """Mantiene sincronizado el índice de texto completo (título y descripción)."""
+    index_petitions([instance.pk])
+
+
+@receiver(post_delete, sender=Petition)
+def delete_search_index(sender, instance, **kwargs):
+    """Elimina la petición del índice de texto completo."""
+    remove_petitions([instance.pk])
+
+
+@receiver(post_save, sender=Petition)
+@receiver(post_delete, sender=Petition)
+def invalidate_petition_cache(sender, instance, **kwargs):
+    """Invalida la caché de respuestas de los alcances que ven la petición."""
+    invalidate_petition(instance)
+
+
+@receiver(post_save, sender=Commission)
+@receiver(post_delete, sender=Commission)
+def invalidate_commission_cache(sender, instance, **kwargs):
+    """Las comisiones van anidadas en la petición."""
+    invalidate_petitions(Petition.objects.filter(pk=instance.petition_id))
+
+
+@receiver(m2m_changed, sender=Commission.users.through)
+def invalidate_commission_users_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    """Asignar / quitar usuarios de una comisión."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:  # `user.commissions.add(...)`
+        petitions = Petition.objects.filter(commissions__pk__in=pk_set or ())
+    else:
+        petitions = Petition.objects.filter(pk=instance.petition_id)
+    invalidate_petitions(petitions)
+
+
+@receiver(m2m_changed, sender=Commission.users.through)
+def touch_commission_on_users_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Marca `modified` de las comisiones afectadas (ETag del listado de comisiones y peticiones)."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        commissions = Commission.objects.filter(pk=instance.pk)
+    elif pk_set:
+        commissions = Commission.objects.filter(pk__in=pk_set)  # 🔥 user.commission_set.add/remove
+    else:
+        commissions = Commission.objects.filter(users=instance)  # user.commission_set.clear()
+    # 🔥 `update` no dispara `post_save`: la caché ya se invalida en el receptor anterior
+    commissions.update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Department)
+def invalidate_related_petitions_cache(sender, instance, created, **kwargs):
+    """Empresa y departamento van anidados en sus peticiones."""
     if created:
-        message = f"Se ha creado una nueva petición: {instance.title}"
-    elif instance.status_approval in ["AP", "NP", "DN"]:
-        message = f"La petición '{instance.title}' ha cambiado de estado a {instance.get_status_approval_display()}."
-
-    if message:
-        # 🔥 1. ADMIN: Ver TODAS las peticiones
-        admin_users = HumanResource.objects.filter(user__groups__name="Admin").values_list("user", flat=True)
-        recipients.update(admin_users)
-
-        # 🔥 2. MANAGER: Solo notificaciones de su departamento
-        if instance.department:
-            manager_users = HumanResource.objects.filter(
-                department=instance.department, user__groups__name="Manager"
-            ).values_list("user", flat=True)
-            recipients.update(manager_users)
-
-        # 🔥 3. CLIENT: Solo notificaciones de su empresa
-        if instance.company:
-            client_users = HumanResource.objects.filter(
-                company=instance.company, user__groups__name="Client"
-            ).values_list("user", flat=True)
-            recipients.update(client_users)
-
-        # 🔥 4. CLIENTS con múltiples empresas
-        client_company_users = ClientCompany.objects.filter(
-            company=instance.company
-        ).values_list("human_resource__user", flat=True)
-        recipients.update(client_company_users)
-
-        # 🔥 Crear Notificaciones en Base de Datos
-        notifications = [
-            Notification(recipient_id=user_id, petition=instance, message=message)
-            for user_id in recipients
-        ]
-        Notification.objects.bulk_create(notifications)
-
-        # 🔥 Enviar Emails a los Usuarios
-        # 🔥 Enviar Emails con Templates HTML
-        for user_id in recipients:
-            user = HumanResource.objects.get(user_id=user_id).user  
-            if user.email:  # 🔥 Solo enviar si tiene email válido
-                context = {
-                    "user": user,
-                    "petition": instance,
-                    "message": message,
-                    "petition_url": f"http://localhost/task-flow/views/peticiones_detalle.php?petition_id={instance.id}",  # 🔥 Enlace a la petición
-                }
-                
-                subject = "Nueva Notificación - Peticiones"
-                text_content = f"{message}\n\nVer más en: {context['petition_url']}"
-                html_content = render_to_string("emails/notification_email.html", context)
-
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=text_content,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=[user.email]
-                )
-                email.attach_alternative(html_content, "text/html")
-                email.send(fail_silently=True)  # 🔥 No detener ejecución si falla el email
+        return  # Todavía no tiene peticiones
+
+    field = "company" if sender is Company else "department"
+    invalidate_petitions(Petition.objects.filter(**{field: instance}))
+
+
+# Campos de `User` que van anidados en la petición (`UserModelSerializer`)
+NESTED_USER_FIELDS = {"first_name", "last_name", "username", "email", "is_staff", "is_active", "is_verified"}
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_petitions_cache(sender, instance, created, update_fields=None, **kwargs):
+    """El usuario va anidado en sus peticiones (`last_login` no lo afecta)."""
+    if created or (update_fields and not NESTED_USER_FIELDS & set(update_fields)):
+        return
+    invalidate_petitions(Petition.objects.filter(user=instance))
+
+
+@receiver(post_save, sender=HumanResource)
+@receiver(post_delete, sender=HumanResource)
+def invalidate_profile_petitions_cache(sender, instance, **kwargs):
+    """El perfil (`user.human_resource`) va anidado con el usuario."""
+    invalidate_petitions(Petition.objects.filter(user_id=instance.user_id))
+
+
+@receiver(post_save, sender=ClientCompany)
+@receiver(post_delete, sender=ClientCompany)
+def invalidate_client_company_petitions_cache(sender, instance, **kwargs):
+    """Las empresas del cliente van en `user.human_resource.client_companies`."""
+    invalidate_petitions(Petition.objects.filter(user__human_resource=instance.human_resource_id))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_group_petitions_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    """Los grupos van en `user.groups`."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        petitions = Petition.objects.filter(user=instance)
+    elif pk_set:
+        petitions = Petition.objects.filter(user__in=pk_set)
+    else:
+        petitions = Petition.objects.filter(user__groups=instance)  # group.user_set.clear()
+    invalidate_petitions(petitions)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_rename_petitions_cache(sender, instance, created, **kwargs):
+    """Renombrar un grupo cambia `user.groups[].name`."""
+    if not created:
+        invalidate_petitions(Petition.objects.filter(user__groups=instance))
+
+
+@receiver(post_delete, sender=Petition)
+def decrement_petition_counter(sender, instance, **kwargs):
+    """Borrado definitivo (el soft delete pasa por `Petition.save`)."""
+    PetitionCounter.objects.apply_deltas({counter_key(instance.__dict__): -1})
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_recipients_on_group_change(sender, action, **kwargs):
+    """Los destinatarios de las notificaciones dependen del grupo."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_recipients()
+
+
+@receiver(post_save, sender=HumanResource)
+@receiver(post_delete, sender=HumanResource)
+@receiver(post_save, sender=ClientCompany)
+@receiver(post_delete, sender=ClientCompany)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_recipients_on_profile_change(sender, instance, **kwargs):
+    """Departamento, empresa(s) y nombre de grupo definen a los destinatarios."""
+    invalidate_recipients()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_recipients_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """Email y nombre van en la lista cacheada (`last_login` no la afecta)."""
+    if update_fields and not {"email", "first_name"} & set(update_fields):
+        return
+    invalidate_recipients()
+
+
+@receiver(post_delete, sender=Notification)
+def decrement_notification_counter(sender, instance, **kwargs):
+    """Una notificación directa sin leer eliminada (o en cascada con su petición)."""
+    if instance.recipient_id is not None and instance.status == Notification.Status.UNREAD:
+        NotificationCounter.objects.apply_deltas({instance.recipient_id: -1})
+
+
+@receiver(pre_delete, sender=Notification)
+def discount_broadcast(sender, instance, **kwargs):
+    """Una difusión eliminada deja de contar para quienes no la leyeron (antes de borrar sus recibos)."""
+    if getattr(kwargs.get("origin"), "counters_applied", False):
+        return  # El borrado por lotes ya descontó (`Notification.objects.archive`)
+    if instance.recipient_id is None:
+        NotificationCounter.objects.apply_deltas(
+            Notification.objects.unread_deltas([(instance.pk, instance.audience, instance.created_at)])
+        )
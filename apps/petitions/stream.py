@@ -0,0 +1,206 @@
+"""Pub/sub en proceso para el stream SSE de notificaciones.
+
++ `notify_petitions` publica las notificaciones nuevas al confirmar la
+  transacción (`publish_notifications`): las conexiones abiertas en el
+  mismo proceso las reciben sin consultar la base de datos.
++ Las creadas (o agrupadas) en otro proceso (otro worker, un comando) las
+  encuentra un único sondeo por proceso (`NotificationHub.poll`) cada
+  `NOTIFICATION_STREAM_POLL_INTERVAL` segundos, solo mientras haya
+  conexiones abiertas.
+
+Cada conexión se suscribe a sus canales: `user:<id>` (directas) y sus
+audiencias de difusión (`admin`, `dept:<id>`, `company:<id>`).
+
+`EventSource` no envía headers: el navegador abre el stream con un ticket
+firmado de corta duración (`issue_stream_ticket`) en vez del token de la API,
+que quedaría en los logs de acceso.
+"""
+
+# Python
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+# Django
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+from django.utils import timezone
+
+# Async
+from asgiref.sync import sync_to_async
+
+# Models
+from petitions.models import Notification
+
+
+# 🔥 Transacciones que confirman fuera de orden: se vuelve a mirar este margen
+POLL_OVERLAP = timedelta(seconds=2)
+
+TICKET_SALT = "petitions.stream.ticket"  # Solo sirve para abrir el stream
+
+
+def get_poll_interval():
+    return getattr(settings, "NOTIFICATION_STREAM_POLL_INTERVAL", 5)
+
+
+def get_ticket_max_age():
+    return getattr(settings, "NOTIFICATION_STREAM_TICKET_MAX_AGE", 60)
+
+
+def issue_stream_ticket(user):
+    """Ticket firmado para `?ticket=` del stream (vence en `get_ticket_max_age()` segundos)."""
+    return signing.dumps(user.pk, salt=TICKET_SALT, compress=True)
+
+
+def read_stream_ticket(ticket):
+    """Id del usuario del ticket, o `None` si es inválido o ya venció."""
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT, max_age=get_ticket_max_age())
+    except signing.BadSignature:  # Incluye `SignatureExpired`
+        return None
+
+
+def notification_channel(notification):
+    """Canal de la notificación: su destinatario o su audiencia."""
+    if notification.recipient_id is not None:
+        return f"user:{notification.recipient_id}"
+    return notification.audience
+
+
+def notification_event(notification):
+    """Payload liviano (sin el usuario anidado del serializer)."""
+    return {
+        "id": notification.pk,
+        "petition": notification.petition_id,
+        "message": notification.message,
+        "audience": notification.audience,
+        "status": Notification.Status.UNREAD,
+        "event_count": notification.event_count,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def stream_event_id(event):
+    """Id SSE del evento: `<created_at en microsegundos>-<id>`.
+
+    Una notificación agrupada conserva su id pero renueva `created_at`: con
+    solo el id, `Last-Event-ID` no la volvería a enviar.
+    """
+    created_at = datetime.fromisoformat(event["created_at"])
+    return f"{(created_at - EPOCH) // timedelta(microseconds=1)}-{event['id']}"
+
+
+def parse_stream_event_id(value):
+    """`(created_at, id)` de un id de `stream_event_id`, o `None` si es inválido."""
+    try:
+        micros, pk = (int(part) for part in value.split("-"))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + timedelta(microseconds=micros), pk
+
+
+class Subscription:
+    """Cola de eventos de una conexión (vive en el event loop del servidor)."""
+
+    def __init__(self, channels, loop):
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=100)
+
+    def push(self, event):
+        if self.queue.full():
+            return  # 🔥 Cliente lento: se pierde el evento, el cliente recarga con `Last-Event-ID`
+        self.queue.put_nowait(event)
+
+
+class NotificationHub:
+    """Suscriptores por canal y un sondeo compartido para lo que llega de afuera."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+        self.poller = None
+        self.since = None
+        self.published = deque(maxlen=2000)  # `(id, created_at)` ya publicados
+
+    def subscribe(self, channels):
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(channels, loop)
+        with self.lock:
+            self.subscriptions.add(subscription)
+            if self.poller is None or self.poller.done():
+                self.poller = loop.create_task(self.poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, events):
+        """`events`: `[(canal, payload), ...]`. Se puede llamar desde cualquier hilo.
+
+        Cada `(id, created_at)` se publica una sola vez: lo publicado en el
+        proceso no se repite cuando lo encuentra el sondeo.
+        """
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+            fresh = []
+            for channel, event in events:
+                key = (event["id"], event["created_at"])
+                if key not in self.published:
+                    self.published.append(key)
+                    fresh.append((channel, event))
+
+        for channel, event in fresh:
+            for subscription in subscriptions:
+                if channel in subscription.channels:
+                    subscription.loop.call_soon_threadsafe(subscription.push, event)
+
+    def fetch_since(self, since):
+        """Notificaciones con `created_at` posterior a `since` (menos `POLL_OVERLAP`).
+
+        Se sigue `created_at` y no el id: una notificación agrupada
+        (`notify_petitions`) conserva su id y renueva `created_at`. Con
+        `since=None` solo se marca el punto de partida.
+        """
+        try:
+            if since is None:
+                return timezone.now(), []
+            notifications = list(
+                Notification.objects.filter(created_at__gt=since - POLL_OVERLAP).order_by(
+                    "created_at", "id"
+                )[:500]
+            )
+            if notifications:
+                since = max(since, notifications[-1].created_at)
+            return since, notifications
+        finally:
+            connection.close()  # 🔥 Hilo del executor, fuera del ciclo request/response
+
+    async def poll(self):
+        """Un solo sondeo por proceso mientras haya conexiones abiertas."""
+        fetch = sync_to_async(self.fetch_since, thread_sensitive=False)
+        while True:
+            with self.lock:
+                if not self.subscriptions:
+                    self.since = None  # Al reabrir se empieza desde lo actual
+                    return
+            self.since, notifications = await fetch(self.since)
+            if notifications:
+                self.publish(
+                    [(notification_channel(n), notification_event(n)) for n in notifications]
+                )
+            await asyncio.sleep(get_poll_interval())
+
+
+hub = NotificationHub()
+
+
+def publish_notifications(notifications):
+    """Publica en el proceso actual (llamar al confirmar la transacción)."""
+    hub.publish([(notification_channel(n), notification_event(n)) for n in notifications])
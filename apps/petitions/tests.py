@@ -1,3 +1,948 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group
+from django.core import mail, signing
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.authtoken.models import Token
+
+from core.testing import api_client, create_petition, create_user
+from petitions.models import (
+    Company,
+    Department,
+    EmailOutbox,
+    Notification,
+    NotificationArchive,
+    NotificationCounter,
+    Petition,
+    PetitionCounter,
+    PetitionDailyStat,
+)
+from petitions.cache import get_generations
+from petitions.notifications import resolve_recipients
+from petitions.outbox import deliver
+from petitions.models.petition_counter_model import COUNTER_FIELDS
+from petitions.stream import (
+    issue_stream_ticket,
+    notification_event,
+    parse_stream_event_id,
+    read_stream_ticket,
+    stream_event_id,
+)
+from api.views.notification_view import NotificationStreamView
+from users.models import User
+
+
+class PetitionTestCase(TestCase):
+    """Dos empresas y dos departamentos con un usuario por rol."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.other_company = Company.objects.create(name="C1"), Company.objects.create(name="C2")
+        cls.department, cls.other_department = Department.objects.create(name="D1"), Department.objects.create(name="D2")
+        cls.admin = create_user("admin", "Admin", cls.company, cls.department)
+        cls.manager = create_user("manager", "Manager", cls.company, cls.department)
+        cls.employee = create_user("employee", "Employee", cls.company, cls.department)
+        cls.client_user = create_user("client", "Client", cls.company, client_companies=[cls.other_company])
+
+    def assertCountersMatch(self):
+        """`PetitionCounter` igual a contar `active_objects` desde cero."""
+        expected = Counter(Petition.active_objects.values_list(*COUNTER_FIELDS))
+        actual = Counter(
+            {
+                key[:-1]: key[-1]
+                for key in PetitionCounter.objects.values_list(*COUNTER_FIELDS, "count")
+                if key[-1]
+            }
+        )
+        self.assertEqual(actual, expected)
+
+
+class KeysetPaginationTests(PetitionTestCase):
+    url = reverse("api:petition-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index in range(7):
+            create_petition(
+                cls.employee,
+                cls.company,
+                cls.department,
+                title=f"Petición {index}",
+                status_approval="AP" if index % 2 else "WT",
+            )
+        # 🔥 Empates en `created`: el desempate por `id` no debe saltar ni repetir filas
+        first = Petition.objects.order_by("id").first()
+        Petition.objects.filter(id__lte=first.id + 2).update(created=first.created)
+
+    def walk(self, url):
+        client, ids, pages = api_client(self.admin), [], []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            ids += [row["id"] for row in pages[-1]["results"]]
+            url = pages[-1]["next"]
+        return ids, pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids, pages = self.walk(f"{self.url}?pagination=cursor&limit=2")
+
+        expected = list(Petition.active_objects.order_by("-created", "id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 4)
+
+    def test_filters_are_kept_in_the_cursor(self):
+        ids, pages = self.walk(f"{self.url}?pagination=cursor&limit=2&status_approval=AP")
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(set(ids), set(Petition.objects.filter(status_approval="AP").values_list("id", flat=True)))
+
+    def test_previous_link_returns_the_previous_page(self):
+        _, pages = self.walk(f"{self.url}?pagination=cursor&limit=3")
+
+        response = api_client(self.admin).get(pages[1]["previous"])
+        self.assertEqual(response.json()["results"], pages[0]["results"])
+
+    def test_invalid_cursor(self):
+        response = api_client(self.admin).get(f"{self.url}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_sparse_fields_and_expand_on_every_page(self):
+        _, pages = self.walk(f"{self.url}?pagination=cursor&limit=3&fields=id,title,user.email&expand=user")
+
+        for page in pages:
+            for row in page["results"]:
+                self.assertEqual(set(row), {"id", "title", "user"})
+                self.assertEqual(row["user"], {"email": self.employee.email})
+
+    def test_compact_on_every_page(self):
+        _, pages = self.walk(f"{self.url}?pagination=cursor&limit=3&compact=true&fields=id,user")
+
+        for page in pages:
+            self.assertEqual(list(page["included"]["users"]), [str(self.employee.pk)])
+            for row in page["results"]:
+                self.assertEqual(row, {"id": row["id"], "user": self.employee.pk})
+
+
+
+class PetitionConditionalGetTests(PetitionTestCase):
+    url = reverse("api:petition-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.petitions = [create_petition(cls.employee, cls.company, cls.department) for _ in range(2)]
+
+    def test_removed_row_is_not_a_304(self):
+        client = api_client(self.manager)
+        response = client.get(self.url)
+        self.assertNotIn("Last-Modified", response)  # Solo `ETag` en listados
+        etag = response["ETag"]
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.petitions[0].soft_delete()
+
+        future = http_date((timezone.now() + timedelta(days=1)).timestamp())
+        response = client.get(self.url, HTTP_IF_MODIFIED_SINCE=future)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_keeps_last_modified(self):
+        url = reverse("api:petition-detail", args=[self.petitions[0].pk])
+        response = api_client(self.manager).get(url)
+        response = api_client(self.manager).get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+
+class PetitionSearchTests(PetitionTestCase):
+    url = reverse("api:petition-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.in_description = create_petition(
+            cls.employee, cls.company, cls.department, title="Pantalla", description="La impresora no imprime"
+        )
+        cls.in_title = create_petition(
+            cls.employee, cls.company, cls.department, title="Impresora rota", description="Sin tinta",
+            status_approval="AP",
+        )
+        cls.other_department = create_petition(
+            cls.admin, cls.other_company, cls.other_department, title="Impresora nueva", description="Pedido"
+        )
+        create_petition(cls.employee, cls.company, cls.department, title="Teclado", description="Tecla suelta")
+
+    def ids(self, user, query):
+        response = api_client(user).get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_title_matches_rank_first(self):
+        ids = self.ids(self.manager, "?search=impresora")
+        self.assertEqual(ids, [self.in_title.pk, self.in_description.pk])
+
+    def test_prefix_and_filters(self):
+        self.assertEqual(self.ids(self.manager, "?search=impres&status_approval=AP"), [self.in_title.pk])
+        self.assertEqual(len(self.ids(self.admin, "?search=impresora")), 3)
+        self.assertEqual(self.ids(self.admin, "?search=!!"), [])
+
+    def test_index_follows_updates(self):
+        self.in_description.title = "Escáner"
+        self.in_description.description = "No escanea"
+        self.in_description.save()
+
+        self.assertEqual(self.ids(self.manager, "?search=impresora"), [self.in_title.pk])
+        self.assertEqual(self.ids(self.manager, "?search=escanea"), [self.in_description.pk])
+
+    def test_cursor_is_rejected(self):
+        client = api_client(self.manager)
+        next_url = client.get(self.url + "?pagination=cursor&limit=1").json()["next"]
+        for url in (self.url + "?search=impresora&pagination=cursor", next_url + "&search=impresora"):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("search", response.json())
+
+
+class PetitionCacheInvalidationTests(PetitionTestCase):
+    """El usuario anidado en la petición invalida la caché de sus alcances."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        create_petition(cls.employee, cls.company, cls.department)
+
+    def assertInvalidates(self, scopes, change, expected=True):
+        before = get_generations(scopes)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        changed = {scope for scope, value in get_generations(scopes).items() if value != before[scope]}
+        self.assertEqual(changed, set(scopes) if expected else set())
+
+    def test_user_profile_and_groups(self):
+        scopes = ["admin", f"dept:{self.department.pk}", f"user:{self.employee.pk}"]
+        human_resource = self.employee.human_resource
+
+        def rename():
+            self.employee.first_name = "Otro"
+            self.employee.save()
+
+        def change_profile():
+            human_resource.phone_number = "555"
+            human_resource.save()
+
+        self.assertInvalidates(scopes, rename)
+        self.assertInvalidates(scopes, change_profile)
+        self.assertInvalidates(scopes, lambda: self.employee.groups.add(Group.objects.create(name="Extra")))
+
+    def test_unrelated_changes(self):
+        self.assertInvalidates(
+            ["admin", f"user:{self.employee.pk}"],
+            lambda: self.employee.save(update_fields=["last_login"]),
+            expected=False,
+        )
+        # Sin peticiones: no hay respuestas cacheadas que lo incluyan
+        self.manager.first_name = "Otro"
+        self.assertInvalidates(["admin", f"dept:{self.department.pk}"], self.manager.save, expected=False)
+
+
+class BulkPetitionTests(PetitionTestCase):
+    url = reverse("api:petition-bulk")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.petition = create_petition(cls.employee, cls.company, cls.department)
+        cls.other_petition = create_petition(cls.employee, cls.company, cls.other_department)
+
+    def new_item(self, **extra):
+        return {
+            "title": "Nueva",
+            "description": "Desde el lote",
+            "company": self.company.pk,
+            "department": self.department.pk,
+            "user": self.employee.pk,
+            **extra,
+        }
+
+    def test_create_and_update(self):
+        response = api_client(self.admin).post(
+            self.url,
+            [self.new_item(), self.new_item(priority="HG"), {"id": self.petition.pk, "status_approval": "AP"}],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["created"]), 2)
+        self.assertEqual(response.json()["updated"], [self.petition.pk])
+        self.petition.refresh_from_db()
+        self.assertEqual(self.petition.status_approval, "AP")
+        self.assertIsNotNone(self.petition.status_changed)
+        self.assertCountersMatch()
+
+    def test_errors_by_position_and_nothing_written(self):
+        response = api_client(self.admin).post(
+            self.url,
+            [self.new_item(), {"id": 0, "title": "x"}, self.new_item(department=0)],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn("id", errors[1])
+        self.assertIn("department", errors[2])
+        self.assertEqual(Petition.objects.count(), 2)
+        self.assertCountersMatch()
+
+    def test_update_outside_scope(self):
+        response = api_client(self.manager).post(
+            self.url, [{"id": self.other_petition.pk, "title": "x"}], format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("id", response.json()[0])
+
+
+class StatusTransitionTests(PetitionTestCase):
+    url = reverse("api:petition-status")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.waiting = create_petition(cls.employee, cls.company, cls.department)
+        cls.approved = create_petition(cls.employee, cls.company, cls.department, status_approval="AP")
+        cls.other_department = create_petition(cls.employee, cls.company, cls.other_department)
+
+    def test_results_by_id(self):
+        ids = [self.waiting.pk, self.approved.pk, 0, self.waiting.pk]
+        response = api_client(self.admin).post(self.url, {"ids": ids, "status_approval": "AP"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 1)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"id": self.waiting.pk, "result": "updated"},
+                {"id": self.approved.pk, "result": "unchanged"},
+                {"id": 0, "result": "not_found"},
+            ],
+        )
+        self.waiting.refresh_from_db()
+        self.assertEqual(self.waiting.status_approval, "AP")
+        self.assertIsNotNone(self.waiting.status_changed)
+        self.assertCountersMatch()
+
+    def test_manager_scope(self):
+        response = api_client(self.manager).post(
+            self.url, {"ids": [self.waiting.pk, self.other_department.pk], "status_approval": "NP"}, format="json"
+        )
+
+        self.assertEqual(
+            [item["result"] for item in response.json()["results"]], ["updated", "not_found"]
+        )
+        self.other_department.refresh_from_db()
+        self.assertEqual(self.other_department.status_approval, "WT")
+
+    def test_employee_forbidden(self):
+        response = api_client(self.employee).post(
+            self.url, {"ids": [self.waiting.pk], "status_approval": "AP"}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class PetitionStatsTests(PetitionTestCase):
+    url = reverse("api:stats-petitions")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        create_petition(cls.employee, cls.company, cls.department)
+        create_petition(cls.employee, cls.company, cls.department, status_approval="AP")
+        create_petition(cls.manager, cls.company, cls.department, priority="HG")
+        create_petition(cls.admin, cls.other_company, cls.other_department)
+        create_petition(cls.admin, cls.other_company, cls.department).soft_delete()
+
+    def stats(self, user, query=""):
+        response = api_client(user).get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_admin(self):
+        self.assertEqual(self.stats(self.admin)["total"], 4)
+        self.assertEqual(self.stats(self.admin, f"?department={self.other_department.pk}")["total"], 1)
+
+    def test_manager_sees_only_their_department(self):
+        stats = self.stats(self.manager)
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["by_status"], {"WT": 2, "AP": 1})
+        self.assertEqual(stats["by_priority"], {"LW": 2, "HG": 1})
+
+        # 🔥 `?department=` no amplía (ni rompe) el alcance del Manager
+        self.assertEqual(self.stats(self.manager, f"?department={self.other_department.pk}"), stats)
+        self.assertEqual(self.stats(self.manager, f"?department={self.department.pk}"), stats)
+
+    def test_employee_sees_only_their_petitions(self):
+        self.assertEqual(self.stats(self.employee)["by_status"], {"WT": 1, "AP": 1})
+
+    def test_client_sees_only_their_companies(self):
+        self.assertEqual(self.stats(self.client_user)["total"], 1)
+
+
+class PetitionCounterTests(PetitionTestCase):
+
+    def setUp(self):
+        self.petition = create_petition(self.employee, self.company, self.department)
+
+    def test_status_and_scope_changes(self):
+        self.petition.status_approval = "AP"
+        self.petition.department = self.other_department
+        self.petition.save()
+        self.assertCountersMatch()
+
+        self.petition.soft_delete()
+        self.assertCountersMatch()
+
+        self.petition.restore()
+        self.assertCountersMatch()
+
+        self.petition.delete()
+        self.assertCountersMatch()
+
+    def test_save_with_deferred_fields(self):
+        petition = Petition.objects.only("id", "title").get(pk=self.petition.pk)
+        petition.title = "Otra"
+        petition.save(update_fields=["title"])
+        self.assertCountersMatch()
+
+    def test_save_unloaded_instance_with_existing_pk(self):
+        values = {field.attname: getattr(self.petition, field.attname) for field in Petition._meta.concrete_fields}
+        petition = Petition(**{**values, "status_approval": "DN"})
+        petition.save()
+
+        self.assertEqual(PetitionCounter.objects.total(), 1)
+        self.assertCountersMatch()
+
+    def test_copy_with_pk_none(self):
+        self.petition.pk = None
+        self.petition._state.adding = True
+        self.petition.save()
+
+        self.assertEqual(PetitionCounter.objects.total(), 2)
+        self.assertCountersMatch()
+
+    def test_stale_instances(self):
+        first, second = Petition.objects.get(pk=self.petition.pk), Petition.objects.get(pk=self.petition.pk)
+        first.status_approval = "AP"
+        first.save()
+        second.status_approval = "NP"  # Cargada antes de que `first` guardara
+        second.save()
+
+        self.assertCountersMatch()
+        self.assertFalse(PetitionCounter.objects.filter(count__lt=0).exists())
+
+    def test_double_soft_delete(self):
+        first, second = Petition.objects.get(pk=self.petition.pk), Petition.objects.get(pk=self.petition.pk)
+        first.soft_delete()
+        second.soft_delete()  # Dos DELETE concurrentes
+
+        self.assertEqual(PetitionCounter.objects.total(), 0)
+        self.assertFalse(PetitionCounter.objects.filter(count__lt=0).exists())
+        self.assertCountersMatch()
+
+    def test_rebuild(self):
+        Petition.objects.filter(pk=self.petition.pk).update(priority="UG")  # Sin pasar por `save()`
+        PetitionCounter.objects.rebuild(Petition.active_objects.all())
+        self.assertCountersMatch()
+
+
+class DailyStatsTests(PetitionTestCase):
+    url = reverse("api:stats-daily")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        create_petition(cls.employee, cls.company, cls.department)
+        create_petition(cls.employee, cls.company, cls.department, status_approval="AP")
+        create_petition(cls.admin, cls.other_company, cls.other_department)
+        call_command("refresh_petition_daily_stats", stdout=StringIO())
+
+    def totals(self, user, query=""):
+        response = api_client(user).get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["totals"]
+
+    def test_admin_filters(self):
+        self.assertEqual(self.totals(self.admin)["created"], 3)
+        self.assertEqual(self.totals(self.admin, f"?department={self.other_department.pk}")["created"], 1)
+
+    def test_manager_department_param(self):
+        totals = self.totals(self.manager)
+        self.assertEqual((totals["created"], totals["approved"]), (2, 1))
+
+        # 🔥 `?department=` de un Manager no duplica `department_id` ni amplía el alcance
+        self.assertEqual(self.totals(self.manager, f"?department={self.other_department.pk}"), totals)
+
+    def test_invalid_range(self):
+        response = api_client(self.admin).get(self.url + "?date_from=2025-02-01&date_until=2025-01-01")
+        self.assertEqual(response.status_code, 400)
+
+    def test_each_transition_counts_on_its_day(self):
+        """Aprobada el día 1 y finalizada el día 3: el recálculo conserva la aprobación."""
+        day_one = timezone.now() - timedelta(days=2)
+        petition = create_petition(self.employee, self.company, self.department)
+        with mock.patch("django.utils.timezone.now", return_value=day_one):
+            petition.status_approval = "AP"
+            petition.save()
+        petition.status_approval = "DN"
+        petition.hours = timedelta(hours=3)
+        petition.save()
+
+        today = timezone.localdate()
+        PetitionDailyStat.objects.refresh(Petition.objects.all(), today - timedelta(days=2), today)
+        first = PetitionDailyStat.objects.summary(timezone.localdate(day_one), timezone.localdate(day_one))
+        last = PetitionDailyStat.objects.summary(today, today)
+        self.assertEqual((first["approved"], first["done"]), (1, 0))
+        self.assertEqual((last["approved"], last["done"], last["hours"]), (1, 1, timedelta(hours=3)))
+
+
+@override_settings(NOTIFICATION_COALESCE_WINDOW=0)
+class NotificationTriggerTests(PetitionTestCase):
+    """Solo la creación y una transición real de estado notifican."""
+
+    def setUp(self):
+        self.petition = create_petition(self.employee, self.company, self.department)
+        self.petition.refresh_from_db()
+
+    def assertNotifies(self, change, expected):
+        before = Notification.objects.count(), EmailOutbox.objects.count()
+        change()
+        created = Notification.objects.count() - before[0]
+        self.assertEqual(created, expected)
+        if not expected:
+            self.assertEqual(EmailOutbox.objects.count(), before[1])
+
+    def test_no_op_saves(self):
+        def edit():
+            self.petition.title = "Otro título"
+            self.petition.hours = timedelta(hours=1)
+            self.petition.save()
+
+        self.assertNotifies(edit, 0)
+        self.assertNotifies(self.petition.save, 0)  # Mismo estado
+        self.assertNotifies(self.petition.soft_delete, 0)
+        self.assertNotifies(self.petition.restore, 0)
+
+    def test_status_transition(self):
+        audiences = Notification.objects.filter(petition=self.petition).count()
+
+        def approve():
+            self.petition.status_approval = "AP"
+            self.petition.save()
+
+        self.assertNotifies(approve, audiences)
+        self.assertNotifies(approve, 0)  # Ya estaba aprobada
+
+    def test_status_endpoint_unchanged_rows(self):
+        url = reverse("api:petition-status")
+        payload = {"ids": [self.petition.pk], "status_approval": "AP"}
+        audiences = Notification.objects.filter(petition=self.petition).count()
+
+        self.assertNotifies(lambda: api_client(self.admin).post(url, payload, format="json"), audiences)
+        self.assertNotifies(lambda: api_client(self.admin).post(url, payload, format="json"), 0)
+
+
+class UnreadCounterTests(PetitionTestCase):
+    """El contador de no leídas (`NotificationCounter`) contra la bandeja real."""
+
+    unread_url = reverse("api:notification-unread-count")
+
+    def assertUnreadMatchesInbox(self):
+        for user in (self.admin, self.manager, self.employee, self.client_user):
+            expected = Notification.objects.inbox(user).filter(inbox_status=Notification.Status.UNREAD).count()
+            response = api_client(user).get(self.unread_url)
+            self.assertEqual(response.json(), {"unread": expected}, user.username)
+
+    def test_broadcast_fan_out(self):
+        create_petition(self.employee, self.company, self.department)
+        create_petition(self.employee, self.other_company, self.other_department)
+
+        self.assertUnreadMatchesInbox()
+        self.assertEqual(Notification.objects.unread_count(self.admin), 2)
+        self.assertEqual(Notification.objects.unread_count(self.manager), 1)
+        self.assertEqual(Notification.objects.unread_count(self.client_user), 1)
+
+    def test_fan_out_is_one_update_per_delta(self):
+        managers = [create_user(f"manager{index}", "Manager", self.company, self.department) for index in range(5)]
+        ids = [user.pk for user in managers]
+        NotificationCounter.objects.bulk_create([NotificationCounter(user_id=pk, unread=3) for pk in ids[:2]])
+
+        with self.assertNumQueries(2):  # `INSERT ... ON CONFLICT DO NOTHING` + `UPDATE`
+            NotificationCounter.objects.increment(ids)
+        with self.assertNumQueries(1):
+            NotificationCounter.objects.apply_deltas(dict.fromkeys(ids, -1))
+
+        self.assertEqual(
+            dict(NotificationCounter.objects.filter(user_id__in=ids).values_list("user_id", "unread")),
+            {user_id: 3 if user_id in ids[:2] else 0 for user_id in ids},
+        )
+        create_petition(self.employee, self.company, self.department)
+        self.assertUnreadMatchesInbox()
+
+    def test_mark_read(self):
+        first = create_petition(self.employee, self.company, self.department)
+        create_petition(self.employee, self.company, self.department)
+        notification = Notification.objects.get(petition=first, audience="admin")
+
+        url = reverse("api:notification-mark-read")
+        response = api_client(self.admin).post(f"{url}?ids={notification.pk},{notification.pk}")
+        self.assertEqual(response.json(), {"updated": 1, "unread": 1})
+        response = api_client(self.admin).post(f"{url}?ids={notification.pk}")  # Ya leída
+        self.assertEqual(response.json(), {"updated": 0, "unread": 1})
+        self.assertUnreadMatchesInbox()
+
+        response = api_client(self.manager).post(reverse("api:notification-mark-all-read"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Notification.objects.unread_count(self.manager), 0)
+        self.assertUnreadMatchesInbox()
+
+    def test_deleted_broadcast_is_discounted(self):
+        petition = create_petition(self.employee, self.company, self.department)
+        create_petition(self.employee, self.company, self.department)
+
+        petition.delete()  # Sus notificaciones en cascada
+
+        self.assertEqual(Notification.objects.unread_count(self.admin), 1)
+        self.assertUnreadMatchesInbox()
+
+    def test_archive_keeps_counters(self):
+        for _ in range(3):
+            create_petition(self.employee, self.company, self.department)
+        Notification.objects.mark_read(self.manager)
+        # 🔥 Antes de `date_joined` las difusiones cuentan como leídas
+        User.objects.update(date_joined=timezone.now() - timedelta(days=60))
+        Notification.objects.update(created_at=timezone.now() - timedelta(days=30))
+        total = Notification.objects.count()
+
+        call_command("archive_notifications", days=7, stdout=StringIO())
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(NotificationArchive.objects.count(), total)
+        self.assertEqual(Notification.objects.unread_count(self.admin), 0)
+        self.assertUnreadMatchesInbox()
+
+    def test_coalesced_event_is_unread_again(self):
+        petition = create_petition(self.employee, self.company, self.department)
+        other = create_petition(self.employee, self.other_company, self.other_department)
+        Notification.objects.mark_read(self.admin)  # Todas
+        receipt = Notification.objects.get(petition=other, audience=f"company:{self.other_company.pk}")
+        Notification.objects.mark_read(self.client_user, [receipt.pk])  # Recibo
+
+        for instance in (petition, other):
+            instance.status_approval = Petition.StatusApproval.APPROVED
+            instance.save()
+
+        # Se agrupan en las difusiones existentes (sin filas nuevas)
+        self.assertEqual(Notification.objects.count(), 4)
+        self.assertEqual(set(Notification.objects.values_list("event_count", flat=True)), {2})
+        self.assertEqual(Notification.objects.unread_count(self.admin), 2)
+        self.assertEqual(Notification.objects.unread_count(self.manager), 1)  # No suma dos veces
+        self.assertEqual(Notification.objects.unread_count(self.client_user), 1)
+        self.assertUnreadMatchesInbox()
+
+
+class StreamTicketTests(PetitionTestCase):
+    stream_url = reverse("api:notification-stream")
+
+    def test_ticket_opens_only_the_stream(self):
+        response = api_client(self.employee).post(reverse("api:notification-stream-ticket"))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(read_stream_ticket(response.json()["ticket"]), self.employee.pk)
+        self.assertIsNone(read_stream_ticket("not-a-ticket"))
+        with self.assertRaises(signing.BadSignature):
+            signing.loads(response.json()["ticket"])  # Otro `salt`: no sirve fuera del stream
+
+    @override_settings(NOTIFICATION_STREAM_TICKET_MAX_AGE=-1)
+    def test_expired_ticket(self):
+        self.assertIsNone(read_stream_ticket(issue_stream_ticket(self.employee)))
+
+    def test_api_token_in_the_url_is_rejected(self):
+        token = Token.objects.create(user=self.employee)
+        response = self.client.get(f"{self.stream_url}?token={token.key}")
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(NOTIFICATION_COALESCE_WINDOW=120)
+class StreamReplayTests(PetitionTestCase):
+    """`Last-Event-ID` reenvía también las difusiones agrupadas después."""
+
+    def inbox_events(self, last_event_id):
+        _, backlog, _ = NotificationStreamView().prepare(self.manager, parse_stream_event_id(last_event_id))
+        return [event["id"] for event in backlog]
+
+    def test_coalesced_broadcast_is_replayed(self):
+        first = create_petition(self.employee, self.company, self.department)
+        create_petition(self.employee, self.company, self.department)
+        first_notification, last_notification = Notification.objects.filter(
+            audience=f"dept:{self.department.pk}"
+        ).order_by("id")
+        last_event_id = stream_event_id(notification_event(last_notification))
+        self.assertEqual(self.inbox_events(last_event_id), [])
+
+        first.status_approval = "AP"
+        first.save()  # Se agrupa en la difusión anterior: mismo id, `created_at` nuevo
+
+        self.assertEqual(self.inbox_events(last_event_id), [first_notification.pk])
+
+    def test_event_id_round_trip(self):
+        create_petition(self.employee, self.company, self.department)
+        notification = Notification.objects.first()
+        event_id = stream_event_id(notification_event(notification))
+
+        self.assertEqual(parse_stream_event_id(event_id), (notification.created_at, notification.pk))
+        self.assertIsNone(parse_stream_event_id("not-an-id"))
+
+
+class PetitionExportTests(PetitionTestCase):
+    url = reverse("api:petition-export")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.first = create_petition(cls.employee, cls.company, cls.department, title="Técnica, con coma")
+        cls.second = create_petition(cls.employee, cls.company, cls.department, status_approval="AP")
+        cls.other = create_petition(cls.admin, cls.other_company, cls.other_department)
+
+    def export(self, user, query=""):
+        response = api_client(user).get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content).decode("utf-8")
+
+    def test_csv(self):
+        response, content = self.export(self.admin, "?format=csv")
+
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        self.assertIn("attachment;", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(content.removeprefix("\ufeff"))))
+        self.assertEqual(rows[0][:2], ["id", "title"])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [self.other.pk, self.second.pk, self.first.pk])
+        self.assertEqual(rows[-1][1], "Técnica, con coma")
+
+    def test_ndjson(self):
+        _, content = self.export(self.admin, "?format=ndjson")
+
+        items = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(items), 3)
+        self.assertEqual(items[-1]["user_email"], self.employee.email)
+
+    def test_scope_and_filters(self):
+        _, content = self.export(self.manager, "?format=ndjson")
+        self.assertEqual({json.loads(line)["id"] for line in content.splitlines()}, {self.first.pk, self.second.pk})
+
+        _, content = self.export(self.admin, "?format=ndjson&status_approval=AP")
+        self.assertEqual([json.loads(line)["id"] for line in content.splitlines()], [self.second.pk])
+
+        _, content = self.export(self.client_user, "?format=ndjson")
+        self.assertEqual([json.loads(line)["id"] for line in content.splitlines()], [self.other.pk])
+
+    def test_user_without_group(self):
+        user = create_user("nobody", "Admin", self.company, self.department)
+        user.groups.clear()
+        self.assertEqual(api_client(user).get(self.url + "?format=csv").status_code, 403)
+
+    def test_unknown_format(self):
+        self.assertEqual(api_client(self.admin).get(self.url + "?format=xml").status_code, 404)
+
+
+class EmailOutboxTests(PetitionTestCase):
+    """Cola `email_outbox`: encolado transaccional, reserva y reintentos."""
+
+    def setUp(self):
+        self.petition = create_petition(self.employee, self.company, self.department)
+        self.rows = list(EmailOutbox.objects.order_by("id"))
+
+    def test_enqueued_with_the_notification(self):
+        self.assertTrue(self.rows)
+        self.assertEqual({row.status for row in self.rows}, {EmailOutbox.Status.PENDING})
+        self.assertIn(self.manager.email, {row.to_email for row in self.rows})
+        self.assertNotIn(self.employee.email, {row.to_email for row in self.rows})
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            create_petition(self.employee, self.company, self.department)
+            raise RuntimeError
+        self.assertEqual(EmailOutbox.objects.count(), len(self.rows))  # Nada de la transacción revertida
+
+    def test_claim_once(self):
+        claimed = EmailOutbox.objects.claim("worker-1", batch_size=100)
+
+        self.assertEqual([row.pk for row in claimed], [row.pk for row in self.rows])
+        self.assertEqual({(row.status, row.attempts) for row in claimed}, {(EmailOutbox.Status.SENDING, 1)})
+        self.assertEqual(EmailOutbox.objects.claim("worker-2", batch_size=100), [])
+
+        # 🔥 Un worker caído: sus filas se vuelven a reservar pasado `stale_after`
+        EmailOutbox.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(len(EmailOutbox.objects.claim("worker-2", batch_size=100)), len(self.rows))
+
+    def test_deliver(self):
+        rows = EmailOutbox.objects.claim("worker", batch_size=100)
+
+        self.assertEqual(deliver(rows, concurrency=2), (len(rows), 0))
+        self.assertEqual(len(mail.outbox), len(rows))
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.Status.SENT).exists())
+
+    def test_retry_then_fail(self):
+        def fail(messages, rate=None):
+            return [(message, ConnectionError("SMTP caído")) for message in messages]
+
+        with mock.patch("petitions.outbox.send_messages", side_effect=fail):
+            rows = EmailOutbox.objects.claim("worker", batch_size=100)
+            self.assertEqual(deliver(rows, concurrency=1, max_attempts=2), (0, len(rows)))
+
+            row = EmailOutbox.objects.get(pk=rows[0].pk)
+            self.assertEqual(row.status, EmailOutbox.Status.PENDING)
+            self.assertGreater(row.next_attempt_at, timezone.now())
+            self.assertIn("SMTP caído", row.last_error)
+            self.assertEqual(EmailOutbox.objects.claim("worker", batch_size=100), [])  # Todavía no vence
+
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            deliver(EmailOutbox.objects.claim("worker", batch_size=100), concurrency=1, max_attempts=2)
+
+        self.assertEqual(
+            set(EmailOutbox.objects.values_list("status", "attempts")), {(EmailOutbox.Status.FAILED, 2)}
+        )
+
+
+class NotificationRecipientTests(PetitionTestCase):
+    """Destinatarios por petición según grupo y perfil, en una sola consulta."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.profile_client = create_user("profile_client", "Client", cls.company)
+        cls.petition = create_petition(cls.employee, cls.company, cls.department)
+        cls.other_petition = create_petition(cls.employee, cls.other_company, cls.other_department)
+
+    def resolve(self):
+        resolved = resolve_recipients([self.petition, self.other_petition])
+        return {
+            pk: {(recipient.id, recipient.audience) for recipient in recipients}
+            for pk, recipients in resolved.items()
+        }
+
+    def test_recipients_by_role(self):
+        with self.assertNumQueries(1):  # Todo el lote
+            resolved = self.resolve()
+
+        self.assertEqual(
+            resolved[self.petition.pk],
+            {
+                (self.admin.pk, "admin"),
+                (self.manager.pk, f"dept:{self.department.pk}"),
+                (self.profile_client.pk, f"company:{self.company.pk}"),
+            },
+        )
+        # 🔥 Con `ClientCompany` solo cuentan esas empresas, no la del perfil
+        self.assertEqual(
+            resolved[self.other_petition.pk],
+            {(self.admin.pk, "admin"), (self.client_user.pk, f"company:{self.other_company.pk}")},
+        )
+
+    def test_widest_role_wins(self):
+        self.manager.groups.add(Group.objects.get(name="Admin"))
+
+        recipients = [r for r in resolve_recipients([self.petition])[self.petition.pk] if r.id == self.manager.pk]
+        self.assertEqual([recipient.audience for recipient in recipients], ["admin"])
+
+
+class NotificationMarkReadTests(PetitionTestCase):
+    url = reverse("api:notification-mark-read")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for _ in range(3):
+            create_petition(cls.employee, cls.company, cls.department)
+        other = create_petition(cls.employee, cls.other_company, cls.other_department)
+        cls.dept_ids = list(
+            Notification.objects.filter(audience=f"dept:{cls.department.pk}").values_list("id", flat=True)
+        )
+        cls.admin_only_id = Notification.objects.get(petition=other, audience="admin").pk
+
+    def test_invalid_ids(self):
+        client = api_client(self.manager)
+        for query in ("", "?ids=", "?ids=1,x", "?ids=" + ",".join(map(str, range(1, 502)))):
+            response = client.post(self.url + query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn("ids", response.json())
+
+    def test_ids_outside_the_inbox_are_ignored(self):
+        response = api_client(self.manager).post(f"{self.url}?ids={self.admin_only_id},{self.dept_ids[0]}")
+
+        self.assertEqual(response.json(), {"updated": 1, "unread": 2})
+        self.assertEqual(Notification.objects.unread_count(self.admin), 4)
+
+    def test_queries_do_not_grow_with_ids(self):
+        Notification.objects.audiences_for(self.manager)  # Roles ya resueltos en la instancia
+        with CaptureQueriesContext(connection) as one:
+            Notification.objects.mark_read(self.manager, self.dept_ids[:1])
+        with CaptureQueriesContext(connection) as many:
+            Notification.objects.mark_read(self.manager, self.dept_ids[1:])
+
+        self.assertEqual(len(many), len(one))
+        self.assertEqual(Notification.objects.unread_count(self.manager), 0)
+
+
+class NotificationInboxTests(PetitionTestCase):
+    url = reverse("api:notification-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.petitions = [
+            create_petition(cls.employee, cls.company, cls.department, title=f"Petición {index}")
+            for index in range(3)
+        ]
+
+    def test_lite_by_default(self):
+        response = api_client(self.manager).get(self.url)
+
+        row = response.json()["results"][0]
+        self.assertEqual(
+            set(row),
+            {"id", "petition_id", "petition_title", "message", "audience", "status", "event_count", "created_at"},
+        )
+        self.assertEqual(row["petition_title"], "Petición 2")
+        self.assertEqual(row["status"], Notification.Status.UNREAD)
+
+    def test_full_view_is_kept_in_the_cursor(self):
+        client = api_client(self.manager)
+        response = client.get(f"{self.url}?view=full&pagination=cursor&limit=2")
+        self.assertIn("recipient", response.json()["results"][0])
+
+        response = client.get(response.json()["next"])
+        self.assertEqual(len(response.json()["results"]), 1)
+        self.assertIn("recipient", response.json()["results"][0])
+
+    def test_queries_do_not_grow_with_rows(self):
+        client = api_client(self.manager)
+        client.get(self.url)  # Token y roles
+        with CaptureQueriesContext(connection) as one:
+            client.get(f"{self.url}?limit=1")
+        with CaptureQueriesContext(connection) as three:
+            client.get(f"{self.url}?limit=3")
+
+        self.assertEqual(len(three), len(one))
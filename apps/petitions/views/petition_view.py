@@ -1,10 +1,10 @@
 # apps/petitions/views/petition_view.py
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, CreateView
-from django.db.models import Count, Q
 from django.utils.functional import cached_property
 
-from petitions.models import Petition
+from petitions.models import Petition, PetitionCounter
+from petitions.search import search_petitions
 
 class PetitionListView(LoginRequiredMixin, ListView):
     template_name = "petitions/list.html"
@@ -14,7 +14,7 @@ class PetitionListView(LoginRequiredMixin, ListView):
     # Helpers para filtros
     @cached_property
     def q(self):
-        return self.request.GET.get("q", "").strip()
+        return (self.request.GET.get("search") or self.request.GET.get("q", "")).strip()
 
     @cached_property
     def priority(self):
@@ -38,9 +38,7 @@ class PetitionListView(LoginRequiredMixin, ListView):
         qs = Petition.active_objects.select_related("company", "department", "user")
 
         if self.q:
-            qs = qs.filter(
-                Q(title__icontains=self.q) | Q(description__icontains=self.q)
-            )
+            qs = search_petitions(qs, self.q)  # Texto completo, ordenado por relevancia
         
         if self.priority:
             qs = qs.filter(priority=self.priority)
@@ -58,10 +56,16 @@ class PetitionListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        base_qs = Petition.active_objects.all()
+        summary = PetitionCounter.objects.summary()  # 🔥 Contadores precalculados
 
-        ctx['counts_by_status'] = base_qs.values('status_approval').annotate(count=Count('id'))
-        ctx['counts_by_priority'] = base_qs.values('priority').annotate(count=Count('id'))
+        ctx['counts_by_status'] = [
+            {'status_approval': status, 'count': count}
+            for status, count in summary['by_status'].items()
+        ]
+        ctx['counts_by_priority'] = [
+            {'priority': priority, 'count': count}
+            for priority, count in summary['by_priority'].items()
+        ]
 
         # Filtros activos
         ctx['filters'] = {
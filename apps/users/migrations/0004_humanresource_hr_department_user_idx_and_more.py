@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petitions', '0007_alter_petition_options_and_more'),
+        ('users', '0003_clientcompany'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='humanresource',
+            index=models.Index(fields=['department', 'user'], name='hr_department_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='humanresource',
+            index=models.Index(fields=['company', 'user'], name='hr_company_user_idx'),
+        ),
+    ]
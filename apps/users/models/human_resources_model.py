@@ -63,6 +63,10 @@ class HumanResource(MainModel, models.Model):
         indexes = [
             models.Index(fields=["-created"]),
             models.Index(fields=["active"]),
+            # Alcance por departamento / empresa (managers, clientes y
+            # destinatarios de notificaciones) resuelto solo con el índice
+            models.Index(fields=["department", "user"], name="hr_department_user_idx"),
+            models.Index(fields=["company", "user"], name="hr_company_user_idx"),
         ]
         db_table = "human_resources"
 
@@ -21,6 +21,10 @@ from users.models import User
 import jwt
 from datetime import timedelta
 
+# Utilities
+from core.mail import send_messages
+from core.serializers import SparseFieldsMixin
+
 # Serializers
 from .human_resourse import HumanResourceModelSerializer
 
@@ -33,7 +37,7 @@ class GroupSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
-class UserModelSerializer(serializers.ModelSerializer):
+class UserModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """User model serializer."""
 
     human_resource = HumanResourceModelSerializer(
@@ -112,9 +116,11 @@ class UserSingUpSerializer(serializers.Serializer):
         )
         msg = EmailMultiAlternatives(subject, content, from_email, [user.email])
         msg.attach_alternative(content, "text/html")
-        msg.send()
-
-        print("Sending email.")
+        # 🔥 Envío directo (sin `email_outbox`): la verificación de la cuenta no
+        # depende del worker. Mismo despachador que el resto de los correos.
+        [(_, error)] = send_messages([msg])
+        if error is not None:
+            raise error
 
     def get_verification_token(self, user):
         """Create JWT token that the user can use to verify its account."""
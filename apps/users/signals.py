@@ -0,0 +1,56 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import User, HumanResource, ClientCompany
+from core.roles import invalidate_role_snapshot
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Descarta el snapshot de roles cuando cambian los grupos del usuario."""
+
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+
+    if not reverse:
+        invalidate_role_snapshot(instance.pk)  # 🔥 user.groups.add/remove
+    elif pk_set:
+        invalidate_role_snapshot(*pk_set)  # 🔥 group.user_set.add/remove
+    else:
+        invalidate_role_snapshot(*instance.user_set.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def touch_user_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Marca `modified` de los usuarios afectados (ETag del listado de usuarios)."""
+
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        user_ids = [instance.pk]
+    elif pk_set:
+        user_ids = list(pk_set)
+    else:
+        user_ids = list(instance.user_set.values_list("id", flat=True))
+    User.objects.filter(pk__in=user_ids).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=HumanResource)
+@receiver(post_delete, sender=HumanResource)
+def invalidate_roles_on_profile_change(sender, instance, **kwargs):
+    """El departamento y la empresa forman parte del snapshot."""
+    invalidate_role_snapshot(instance.user_id)
+
+
+@receiver(post_save, sender=ClientCompany)
+@receiver(post_delete, sender=ClientCompany)
+def invalidate_roles_on_client_company_change(sender, instance, **kwargs):
+    """Las empresas de un cliente forman parte del snapshot."""
+    user_id = (
+        HumanResource.objects.filter(pk=instance.human_resource_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id:
+        invalidate_role_snapshot(user_id)
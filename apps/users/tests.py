@@ -1,3 +1,109 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.roles import get_role_snapshot
+from core.testing import api_client, create_user
+from petitions.models import Company, Department, EmailOutbox
+from users.models import User
+
+
+class ConditionalGetTests(TestCase):
+    url = reverse("api:user-list")
+
+    @classmethod
+    def setUpTestData(cls):
+        company, department = Company.objects.create(name="C1"), Department.objects.create(name="D1")
+        cls.admin = create_user("admin", "Admin", company, department)
+        cls.employee = create_user("employee", "Employee", company, department)
+
+    def setUp(self):
+        self.client = api_client(self.admin)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_group_change_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.employee.groups.set([Group.objects.create(name="Manager")])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class SignUpTests(TestCase):
+
+    def test_verification_email_is_sent_without_the_outbox(self):
+        response = self.client.post(
+            reverse("api:signup"),
+            {
+                "email": "new@example.com",
+                "username": "newuser",
+                "password": "Str0ng-pass!",
+                "password_confirmation": "Str0ng-pass!",
+                "first_name": "New",
+                "last_name": "User",
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["new@example.com"])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+class RoleSnapshotTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.other_company = Company.objects.create(name="C1"), Company.objects.create(name="C2")
+        cls.department = Department.objects.create(name="D1")
+        cls.manager = create_user("manager", "Manager", cls.company, cls.department)
+        cls.client_user = create_user("client", "Client", cls.company, client_companies=[cls.other_company])
+
+    def fresh(self, user):
+        return User.objects.get(pk=user.pk)  # Sin el snapshot memoizado en la instancia
+
+    def test_snapshot(self):
+        roles = get_role_snapshot(self.fresh(self.manager))
+        self.assertTrue(roles.is_manager)
+        self.assertFalse(roles.is_admin)
+        self.assertEqual(roles.department_id, self.department.pk)
+
+        roles = get_role_snapshot(self.fresh(self.client_user))
+        self.assertTrue(roles.is_client)
+        self.assertEqual(roles.visible_company_ids, (self.other_company.pk,))  # No la del perfil
+
+    def test_resolved_once_per_instance(self):
+        user = self.fresh(self.manager)
+        with self.assertNumQueries(3):
+            get_role_snapshot(user)
+        with self.assertNumQueries(0):
+            get_role_snapshot(user)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    def test_process_local_cache_is_not_used_across_requests(self):
+        get_role_snapshot(self.fresh(self.manager))
+        user = self.fresh(self.manager)
+        with self.assertNumQueries(3):
+            get_role_snapshot(user)
+
+    def test_shared_cache_and_invalidation(self):
+        cache.clear()
+        with mock.patch("core.roles.is_shared_cache", return_value=True):
+            get_role_snapshot(self.fresh(self.manager))
+            user = self.fresh(self.manager)
+            with self.assertNumQueries(0):
+                self.assertTrue(get_role_snapshot(user).is_manager)
+
+            self.manager.groups.add(Group.objects.get_or_create(name="Admin")[0])
+            self.assertTrue(get_role_snapshot(self.fresh(self.manager)).is_admin)
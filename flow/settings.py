@@ -116,6 +116,48 @@ DATABASES = {
     }
 }
 
+# Pruebas: `manage.py test` corre los `tests.py` de `LOCAL_APPS`
+TEST_RUNNER = "core.test_runner.LocalAppsDiscoverRunner"
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+REDIS_URL = os.environ.get("REDIS_URL")  # 🔥 Compartida entre workers en producción
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    # 🔥 Por proceso: lo que necesita invalidarse entre workers no se cachea
+    # (roles, respuestas de peticiones; ver `core/cache.py`)
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "flow",
+        }
+    }
+
+# Stream SSE de notificaciones (`/api/v1/notifications/stream/`)
+NOTIFICATION_STREAM_POLL_INTERVAL = int(os.environ.get("NOTIFICATION_STREAM_POLL_INTERVAL", 5))  # Sondeo por proceso
+NOTIFICATION_STREAM_HEARTBEAT = int(os.environ.get("NOTIFICATION_STREAM_HEARTBEAT", 15))
+NOTIFICATION_STREAM_TICKET_MAX_AGE = int(os.environ.get("NOTIFICATION_STREAM_TICKET_MAX_AGE", 60))  # Segundos para abrir el stream
+
+# Eventos de una misma petición dentro de esta ventana (segundos) se agrupan en una notificación
+NOTIFICATION_COALESCE_WINDOW = int(os.environ.get("NOTIFICATION_COALESCE_WINDOW", 120))
+# Minutos entre resúmenes por defecto (`NotificationPreference.digest_interval`)
+NOTIFICATION_DIGEST_INTERVAL = int(os.environ.get("NOTIFICATION_DIGEST_INTERVAL", 60))
+
+# Días que una notificación leída queda en la tabla principal (`manage.py archive_notifications`)
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 90))
+
+# Segundos que se guarda una respuesta del listado / detalle de peticiones
+PETITION_CACHE_TIMEOUT = int(os.environ.get("PETITION_CACHE_TIMEOUT", 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -145,6 +187,18 @@ EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "true").lower() in ("true", "1",
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER  # Usar el mismo email para enviar
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", BASE_DIR / "tmp" / "emails")  # Backend `filebased`
+
+# Envío por lotes (`core/mail.py`)
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", 100))  # Correos por conexión SMTP
+EMAIL_RATE_LIMIT = float(os.environ.get("EMAIL_RATE_LIMIT", 0))  # Correos por segundo (0 = sin límite)
+
+# Cola de correos (`manage.py run_email_outbox`)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 50))
+EMAIL_OUTBOX_CONCURRENCY = int(os.environ.get("EMAIL_OUTBOX_CONCURRENCY", 4))  # Conexiones SMTP simultáneas
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 8))
+EMAIL_OUTBOX_BACKOFF_BASE = int(os.environ.get("EMAIL_OUTBOX_BACKOFF_BASE", 30))  # Segundos
+EMAIL_OUTBOX_BACKOFF_MAX = int(os.environ.get("EMAIL_OUTBOX_BACKOFF_MAX", 3600))
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/